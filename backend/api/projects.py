@@ -3,6 +3,8 @@ from database.db_manager import DatabaseManager
 from services.preview_generator import PreviewGenerator
 from services.keyword_extractor import KeywordExtractor
 from services.replicate_image_service import ReplicateImageService
+from services.render_quality import QUALITY_TIERS
+from services.ffmpeg_scheduler import get_scheduler
 import os
 import sys
 
@@ -277,18 +279,11 @@ def generate_preview(project_id):
         if not project:
             return jsonify({'error': 'Project not found'}), 404
 
-        # Get all scenes - ALWAYS fresh from database to ensure sound effects are included
-        scenes = db.get_project_scenes(project_id)
-        if not scenes:
+        if not db.count_project_scenes(project_id):
             return jsonify({'error': 'No scenes to preview'}), 400
 
-        # DEBUG: Log sound effect info
-        import sys
-        for scene in scenes:
-            if scene.get('sound_effect_path'):
-                print(f"✓ Scene {scene['id']} HAS sound effect: {scene.get('sound_effect_path')} (Volume: {scene.get('sound_effect_volume', 50)}%)", file=sys.stderr, flush=True)
-            else:
-                print(f"  Scene {scene['id']} has NO sound effect", file=sys.stderr, flush=True)
+        # Stream scenes fresh from the database (sound effects included); long projects are never loaded at once
+        scenes = db.iter_project_scenes(project_id)
 
         # Get TTS voice from project (default to German voice)
         tts_voice = project.get('tts_voice', 'de-DE-KatjaNeural')
@@ -312,8 +307,13 @@ def generate_preview(project_id):
         request_data = request.get_json(force=True, silent=True) or {}
         font_size = request_data.get('fontSize', 30)
 
+        # Optional quality tier ('draft' for fast pacing checks; default: preview tier)
+        quality = request_data.get('quality')
+        if quality and quality not in QUALITY_TIERS:
+            return jsonify({'error': f'Unknown quality tier: {quality}'}), 400
+
         # Generate preview
-        result = preview_gen.generate_preview(project_id, scenes, tts_voice=tts_voice, background_music_path=background_music_path, background_music_volume=background_music_volume, target_language=target_language, video_speed=video_speed, ai_image_model=ai_image_model, font_size=font_size)
+        result = preview_gen.generate_preview(project_id, scenes, tts_voice=tts_voice, background_music_path=background_music_path, background_music_volume=background_music_volume, target_language=target_language, video_speed=video_speed, ai_image_model=ai_image_model, font_size=font_size, quality=quality)
 
         # Update scene durations in database with actual timings from video generation
         if 'scene_timings' in result:
@@ -328,6 +328,16 @@ def generate_preview(project_id):
                     db.update_scene(scene_id, {'duration': actual_duration})
             print(f"✓ Database sync complete\n", file=sys.stderr, flush=True)
 
+        # Remember each scene's clip fingerprint so the next preview only re-renders changed scenes
+        for scene_render in result.pop('scene_renders', []):
+            if scene_render['id'] and not scene_render['stored']:
+                try:
+                    db.update_scene_render(scene_render['id'], scene_render['fingerprint'], scene_render['clip_path'], scene_render['clip_duration'])
+                except Exception as e:
+                    print(f"⚠️  Failed to save render fingerprint for scene {scene_render['id']}: {e}", file=sys.stderr, flush=True)
+        if 'scenes_reused' in result:
+            print(f"♻️  Preview reused {result['scenes_reused']} scenes, rendered {result['scenes_rendered']}", file=sys.stderr, flush=True)
+
         # CRITICAL: Return updated scenes with actual durations so frontend can sync
         updated_scenes = db.get_project_scenes(project_id)
         result['updated_scenes'] = updated_scenes
@@ -348,11 +358,12 @@ def export_video(project_id):
         if not project:
             return jsonify({'error': 'Project not found'}), 404
 
-        # Get all scenes
-        scenes = db.get_project_scenes(project_id)
-        if not scenes:
+        if not db.count_project_scenes(project_id):
             return jsonify({'error': 'No scenes to export'}), 400
 
+        # Stream scenes from the database
+        scenes = db.iter_project_scenes(project_id)
+
         data = request.get_json() or {}
         resolution = data.get('resolution', '1080p')
 
@@ -367,6 +378,11 @@ def export_video(project_id):
         # Get fontSize from request body (default 30)
         font_size = data.get('fontSize', 30)
 
+        # Optional quality tier (default: final tier for 1080p)
+        quality = data.get('quality')
+        if quality and quality not in QUALITY_TIERS:
+            return jsonify({'error': f'Unknown quality tier: {quality}'}), 400
+
         # Generate export video (full resolution) - save to temp location for download only
         result = preview_gen.generate_preview(
             project_id,
@@ -379,7 +395,8 @@ def export_video(project_id):
             ai_image_model=ai_image_model,
             font_size=font_size,
             resolution=resolution,
-            temp_export=True  # Save to temp_exports folder, not previews
+            temp_export=True,  # Save to temp_exports folder, not previews
+            quality=quality
         )
 
         return jsonify({
@@ -500,6 +517,15 @@ def upload_to_queue(project_id):
         print(f"Upload to queue error: {traceback.format_exc()}", file=sys.stderr)
         return jsonify({'error': str(e)}), 500
 
+@projects_bp.route('/render/scheduler', methods=['GET'])
+def get_render_scheduler():
+    """Machine-wide ffmpeg load: slots, running and queued commands, CPU budget"""
+    try:
+        return jsonify(get_scheduler().stats())
+    except Exception as e:
+        print(f"Error reading scheduler stats: {e}", file=sys.stderr)
+        return jsonify({'error': str(e)}), 500
+
 @projects_bp.route('/thumbnails/<path:keyword>', methods=['GET'])
 def get_thumbnail(keyword):
     """Generate and serve thumbnail for keyword"""
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from database.db_manager import DatabaseManager
 from services.replicate_image_service import ReplicateImageService
+from services.transitions import TRANSITION_TYPES
 import random
 import sys
 import traceback
@@ -37,6 +38,9 @@ def update_scene(scene_id):
         if not data:
             return jsonify({'error': 'No data provided'}), 400
 
+        if 'transition_type' in data and data['transition_type'] not in TRANSITION_TYPES:
+            return jsonify({'error': f"Unknown transition_type: {data['transition_type']}"}), 400
+
         # DEBUG: Log effect values if any are being updated
         effect_keys = ['effect_vignette', 'effect_color_temp', 'effect_saturation']
         effect_updates = {k: v for k, v in data.items() if k in effect_keys}
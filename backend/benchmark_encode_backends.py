@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ffmpeg subprocess vs. in-process PyAV encode backend
+Runs the per-scene work (audio probe, sound effect mix, scene encode, clip probe) of a
+30-scene project with both backends
+
+Usage: python benchmark_encode_backends.py [--scenes 30] [--quality preview]
+"""
+import sys
+import time
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+from PIL import Image, ImageDraw
+
+from services.video_effects import VideoEffects
+from services.render_quality import get_quality_tier
+from services.segment_format import SegmentFormat
+from services.encode_backends import SceneEncodeJob, get_encode_backend, AV_AVAILABLE
+
+# Effect mix of a typical project: mostly plain scenes, some color looks and motion
+SCENE_EFFECTS = [
+    {},
+    {},
+    {'effect_vignette': 'dark', 'effect_color_temp': 'warm'},
+    {'effect_zoom': 'zoom_in', 'effect_intensity': 0.5},
+    {'effect_saturation': 1.3, 'effect_fade': 'in'},
+]
+
+
+def make_test_image(width, height, idx):
+    img = Image.new('RGB', (width, height), (20 + idx * 7 % 200, 40, 90))
+    draw = ImageDraw.Draw(img)
+    draw.text((width // 4, height // 2), f"SCENE {idx + 1}", fill=(255, 255, 255))
+    return img
+
+
+def make_tone(path, seconds, frequency):
+    """Mono 24 kHz MP3 like the TTS services produce"""
+    cmd = [
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f"sine=frequency={frequency}:duration={seconds}:sample_rate=24000",
+        '-c:a', 'libmp3lame', '-b:a', '64k',
+        str(path)
+    ]
+    subprocess.run(cmd, check=True)
+    return path
+
+
+def run_backend(backend, scenes, tier, work_dir):
+    """Per-scene pipeline as in SimpleVideoGenerator._create_scene_video (returns seconds)"""
+    width, height, fps = tier['width'], tier['height'], tier['fps']
+    segment_format = SegmentFormat(width, height, tier)
+    start = time.perf_counter()
+
+    for idx, (scene, img, tts_path, sfx_path) in enumerate(scenes):
+        duration = backend.probe_duration(tts_path)
+
+        audio_path = tts_path
+        if sfx_path:
+            audio_path = work_dir / f"{backend.name}_mixed_{idx}.mp3"
+            backend.mix_audio(tts_path, sfx_path, audio_path, duration, 50, 25)
+
+        graph = VideoEffects.build_effect_graph(scene, width, height, duration, fps, tier['supersample'])
+        graph.append(segment_format.video_filter())
+        if not VideoEffects.has_motion_source(scene):
+            graph.prepend(VideoEffects.still_loop_filter(fps))
+        compiled = graph.compile(width, height, duration, fps, still_input=True, first_input_index=2)
+
+        video_path = work_dir / f"{backend.name}_scene_{idx}.mp4"
+        backend.encode_scene(SceneEncodeJob(img, audio_path, video_path, duration, segment_format, compiled))
+        backend.probe_duration(video_path)
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark encode backends')
+    parser.add_argument('--scenes', type=int, default=30, help='Number of scenes')
+    parser.add_argument('--quality', default='preview', help='Quality tier (draft, preview, final)')
+    args = parser.parse_args()
+
+    if not AV_AVAILABLE:
+        print("❌ PyAV is not installed (pip install av)")
+        sys.exit(1)
+
+    tier = get_quality_tier(args.quality)
+    work_dir = Path(tempfile.mkdtemp(prefix='encode_benchmark_'))
+
+    print("=" * 60)
+    print(f"🎬 Encode backends: {args.scenes} scenes, {tier['name']} tier ({tier['width']}x{tier['height']} @ {tier['fps']}fps)")
+    print("=" * 60)
+
+    sfx_path = make_tone(work_dir / "sfx.mp3", 1.0, 880)
+    scenes = []
+    for idx in range(args.scenes):
+        tts_path = make_tone(work_dir / f"tts_{idx}.mp3", 2 + idx % 4, 220 + idx * 10)
+        scenes.append((
+            SCENE_EFFECTS[idx % len(SCENE_EFFECTS)],
+            make_test_image(tier['width'], tier['height'], idx),
+            tts_path,
+            # Every third scene has a sound effect
+            sfx_path if idx % 3 == 0 else None,
+        ))
+
+    results = {}
+    for name in ('subprocess', 'pyav'):
+        backend = get_encode_backend(name)
+        results[name] = run_backend(backend, scenes, tier, work_dir)
+        print(f"\n⚙️  {name}: {results[name]:6.2f}s ({results[name] / args.scenes * 1000:.0f} ms/scene)")
+
+    print(f"\n📊 pyav vs subprocess: {results['subprocess'] / results['pyav']:.2f}x")
+    print(f"📂 Output clips: {work_dir}")
+
+
+if __name__ == '__main__':
+    main()
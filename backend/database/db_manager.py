@@ -9,7 +9,7 @@ SQLite dient nur als Notfall-Fallback für lokale Entwicklung.
 """
 import os
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, TIMESTAMP, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Text, Float, TIMESTAMP, ForeignKey, and_, or_
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.sql import func
@@ -73,6 +73,13 @@ class Scene(Base):
     sound_effect_path = Column(Text)
     sound_effect_volume = Column(Integer, default=100)
     sound_effect_offset = Column(Float, default=0.0)
+    # Transition from this scene into the next one (xfade name, see services/transitions.py)
+    transition_type = Column(String(50), default='none')
+    transition_duration = Column(Float, default=0.5)
+    # Last rendered clip (for incremental previews)
+    render_fingerprint = Column(String(64))
+    render_clip_path = Column(Text)
+    render_clip_duration = Column(Float)
     created_at = Column(TIMESTAMP, default=func.now())
     updated_at = Column(TIMESTAMP, default=func.now(), onupdate=func.now())
 
@@ -147,6 +154,11 @@ class DatabaseManager:
                 ("sound_effect_path", "TEXT", "NULL"),
                 ("sound_effect_volume", "INTEGER", "100"),
                 ("sound_effect_offset", "REAL", "0.0"),
+                ("transition_type", "VARCHAR(50)", "'none'"),
+                ("transition_duration", "REAL", "0.5"),
+                ("render_fingerprint", "VARCHAR(64)", "NULL"),
+                ("render_clip_path", "TEXT", "NULL"),
+                ("render_clip_duration", "REAL", "NULL"),
             ]
 
             added_columns = []
@@ -302,6 +314,40 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def iter_project_scenes(self, project_id, batch_size=200):
+        """Stream a project's scenes in timeline order, loading batch_size rows at a time (see SceneStream)"""
+        return SceneStream(self, project_id, batch_size)
+
+    def get_project_scene_page(self, project_id, after=None, limit=200):
+        """
+        One page of a project's scenes in timeline order, read in its own short session
+
+        Args:
+            after: (scene_order, id) of the last scene of the previous page, None for the first page
+            limit: Page size
+        """
+        session = self.Session()
+        try:
+            query = session.query(Scene).filter(Scene.project_id == project_id)
+            if after is not None:
+                # Keyset paging: stable even if scenes of other projects change meanwhile
+                scene_order, scene_id = after
+                query = query.filter(or_(
+                    Scene.scene_order > scene_order,
+                    and_(Scene.scene_order == scene_order, Scene.id > scene_id)
+                ))
+            scenes = query.order_by(Scene.scene_order, Scene.id).limit(limit).all()
+            return [self._scene_to_dict(s) for s in scenes]
+        finally:
+            session.close()
+
+    def count_project_scenes(self, project_id):
+        session = self.Session()
+        try:
+            return session.query(Scene).filter(Scene.project_id == project_id).count()
+        finally:
+            session.close()
+
     def update_scene(self, scene_id, scene_data):
         session = self.Session()
         try:
@@ -318,7 +364,9 @@ class DatabaseManager:
                         'effect_film_grain', 'effect_glitch', 'effect_chromatic', 'effect_blur',
                         'effect_light_leaks', 'effect_lens_flare', 'effect_kaleidoscope',
                         # Sound effects
-                        'sound_effect_path', 'sound_effect_volume', 'sound_effect_offset']:
+                        'sound_effect_path', 'sound_effect_volume', 'sound_effect_offset',
+                        # Transition into the next scene
+                        'transition_type', 'transition_duration']:
                 if key in scene_data:
                     setattr(scene, key, scene_data[key])
 
@@ -336,6 +384,24 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def update_scene_render(self, scene_id, fingerprint, clip_path, clip_duration):
+        """Store the fingerprint and clip of a scene's last render (does not count as an edit)"""
+        session = self.Session()
+        try:
+            session.query(Scene).filter(Scene.id == scene_id).update({
+                Scene.render_fingerprint: fingerprint,
+                Scene.render_clip_path: clip_path,
+                Scene.render_clip_duration: clip_duration,
+                # Keep updated_at unchanged (would otherwise be bumped by onupdate)
+                Scene.updated_at: Scene.updated_at
+            }, synchronize_session=False)
+            session.commit()
+        except:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
     def delete_scene(self, scene_id):
         session = self.Session()
         try:
@@ -500,6 +566,13 @@ class DatabaseManager:
             'sound_effect_path': getattr(scene, 'sound_effect_path', None),
             'sound_effect_volume': getattr(scene, 'sound_effect_volume', 100),
             'sound_effect_offset': getattr(scene, 'sound_effect_offset', 0.0),
+            # Transition into the next scene
+            'transition_type': getattr(scene, 'transition_type', 'none'),
+            'transition_duration': getattr(scene, 'transition_duration', 0.5),
+            # Last rendered clip
+            'render_fingerprint': getattr(scene, 'render_fingerprint', None),
+            'render_clip_path': getattr(scene, 'render_clip_path', None),
+            'render_clip_duration': getattr(scene, 'render_clip_duration', None),
             'created_at': scene.created_at.strftime('%Y-%m-%d %H:%M:%S') if scene.created_at else None,
             'updated_at': scene.updated_at.strftime('%Y-%m-%d %H:%M:%S') if scene.updated_at else None
         }
@@ -512,3 +585,30 @@ class DatabaseManager:
             'is_default': folder.is_default,
             'created_at': folder.created_at.strftime('%Y-%m-%d %H:%M:%S') if folder.created_at else None
         }
+
+
+class SceneStream:
+    """
+    A project's scenes in timeline order, read page by page
+
+    Every page uses its own short session, so no transaction or cursor stays open while a render
+    runs (render threads write scenes through update_scene meanwhile). Iterating again reads the
+    scenes again, e.g. for the manifest of a failed preview.
+    """
+
+    def __init__(self, db, project_id, batch_size=200):
+        self.db = db
+        self.project_id = project_id
+        self.batch_size = batch_size
+
+    def __len__(self):
+        return self.db.count_project_scenes(self.project_id)
+
+    def __iter__(self):
+        after = None
+        while True:
+            page = self.db.get_project_scene_page(self.project_id, after=after, limit=self.batch_size)
+            yield from page
+            if len(page) < self.batch_size:
+                return
+            after = (page[-1]['scene_order'], page[-1]['id'])
@@ -0,0 +1,63 @@
+"""
+Asset Prefetch
+Runs the network-bound part of scene rendering (TTS calls, AI image generation) ahead of the
+CPU-bound encodes through a bounded queue, so the network and the encoder work at the same time
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class AssetPrefetcher:
+    """Producer side of the render pipeline: fetches scene assets a bounded number of scenes ahead"""
+
+    def __init__(self, fetch, max_workers=None, depth=None):
+        """
+        Args:
+            fetch: Callable (idx, scene) -> scene with its assets attached
+            max_workers: Concurrent fetches (default: ASSET_FETCH_WORKERS env or 4)
+            depth: Scenes fetched but not yet taken by the encoder, at most (default: ASSET_PREFETCH_DEPTH env or 8)
+        """
+        self.fetch = fetch
+        if max_workers is None:
+            max_workers = int(os.getenv('ASSET_FETCH_WORKERS', 4))
+        if depth is None:
+            depth = int(os.getenv('ASSET_PREFETCH_DEPTH', 8))
+        self.max_workers = max(1, max_workers)
+        self.depth = max(1, depth)
+
+    def _fetch(self, idx, scene):
+        try:
+            return idx, self.fetch(idx, scene)
+        except Exception as e:
+            # The scene render fetches again and reports the error for this scene
+            print(f"   ⚠️ Prefetch of scene {idx + 1} failed: {e}", file=sys.stderr, flush=True)
+            return idx, scene
+
+    def iterate(self, jobs):
+        """
+        Yield (idx, scene) jobs with their assets fetched, in the order the fetches finish
+
+        Only `depth` jobs are fetched ahead of the consumer, so a slow encoder never lets the
+        fetchers run through the whole chunk (disk space, API rate limits).
+        """
+        jobs = iter(jobs)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = set()
+            ready = []
+
+            def fill():
+                while len(pending) + len(ready) < self.depth:
+                    job = next(jobs, None)
+                    if job is None:
+                        return
+                    pending.add(pool.submit(self._fetch, *job))
+
+            fill()
+            while pending or ready:
+                if not ready:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    pending.difference_update(done)
+                    ready.extend(future.result() for future in done)
+                yield ready.pop(0)
+                fill()
@@ -0,0 +1,142 @@
+"""
+Color LUT Generator
+Bakes a run of eq/hue color filters into one .cube 3D LUT (applied with FFmpeg's lut3d)
+"""
+import os
+import sys
+import json
+import math
+import hashlib
+import tempfile
+from pathlib import Path
+
+# NumPy evaluates the filters on the LUT grid (optional, color ops stay as eq/hue without it)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Bump when the color math changes, so cached LUTs are regenerated
+LUT_VERSION = 1
+
+
+def _rgb_to_yuv(rgb):
+    """RGB (0-1) to 8-bit BT.601 limited range YUV, as swscale feeds eq/hue"""
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    y = 16 + 65.481 * r + 128.553 * g + 24.966 * b
+    u = 128 - 37.797 * r - 74.203 * g + 112.0 * b
+    v = 128 + 112.0 * r - 93.786 * g - 18.214 * b
+    return y, u, v
+
+
+def _yuv_to_rgb(y, u, v):
+    r = 1.164 * (y - 16) + 1.596 * (v - 128)
+    g = 1.164 * (y - 16) - 0.392 * (u - 128) - 0.813 * (v - 128)
+    b = 1.164 * (y - 16) + 2.017 * (u - 128)
+    return np.clip(np.stack([r, g, b], axis=-1) / 255.0, 0.0, 1.0)
+
+
+def _eq_plane(x, contrast=1.0, brightness=0.0, gamma=1.0, gamma_weight=1.0):
+    """FFmpeg eq's per-plane curve: contrast, brightness, then weighted gamma"""
+    value = contrast * (x / 255.0 - 0.5) + 0.5 + brightness
+    value = np.clip(value, 0.0, None)
+    value = value * (1.0 - gamma_weight) + np.power(value, 1.0 / gamma) * gamma_weight
+    return np.clip(value * 255.0, 0.0, 255.0)
+
+
+def _apply_eq(y, u, v, params):
+    gamma_g = params.get('gamma_g', 1.0)
+    gamma_weight = params.get('gamma_weight', 1.0)
+    saturation = params.get('saturation', 1.0)
+    y = _eq_plane(y, params.get('contrast', 1.0), params.get('brightness', 0.0),
+                  params.get('gamma', 1.0) * gamma_g, gamma_weight)
+    u = _eq_plane(u, saturation, 0.0, math.sqrt(params.get('gamma_b', 1.0) / gamma_g), gamma_weight)
+    v = _eq_plane(v, saturation, 0.0, math.sqrt(params.get('gamma_r', 1.0) / gamma_g), gamma_weight)
+    return y, u, v
+
+
+def _apply_hue(y, u, v, params):
+    """FFmpeg hue: rotate the chroma vector by h degrees and scale it by s"""
+    angle = math.radians(params.get('h', 0.0))
+    saturation = params.get('s', 1.0)
+    cos_s, sin_s = math.cos(angle) * saturation, math.sin(angle) * saturation
+    du, dv = u - 128, v - 128
+    return y, np.clip(du * cos_s - dv * sin_s + 128, 0, 255), np.clip(du * sin_s + dv * cos_s + 128, 0, 255)
+
+
+def apply_color_ops(rgb, ops):
+    """
+    Apply eq/hue ops to RGB values
+
+    Args:
+        rgb: Array (..., 3) with values 0-1
+        ops: List of (filter name, {param: float}) in application order
+
+    Returns:
+        Array (..., 3) with values 0-1
+    """
+    y, u, v = _rgb_to_yuv(rgb)
+    for name, params in ops:
+        if name == 'eq':
+            y, u, v = _apply_eq(y, u, v, params)
+        elif name == 'hue':
+            y, u, v = _apply_hue(y, u, v, params)
+        else:
+            raise ValueError(f"Cannot bake '{name}' into a LUT")
+    return _yuv_to_rgb(y, u, v)
+
+
+class ColorLUT:
+    """Builds and caches .cube LUTs keyed by a hash of the color ops"""
+
+    def __init__(self, lut_dir=None, size=33):
+        """
+        Args:
+            lut_dir: Cache directory (default: COLOR_LUT_DIR env or <tmp>/video_editor_luts)
+            size: Grid points per axis
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy is required to generate color LUTs")
+        if lut_dir is None:
+            lut_dir = os.getenv('COLOR_LUT_DIR') or Path(tempfile.gettempdir()) / 'video_editor_luts'
+        self.lut_dir = Path(lut_dir)
+        self.lut_dir.mkdir(parents=True, exist_ok=True)
+        self.size = size
+
+    def bake(self, ops):
+        """
+        Get the LUT file for a run of color ops, generating it on first use
+
+        Args:
+            ops: List of (filter name, {param: float}) in application order
+
+        Returns:
+            Path: .cube file
+        """
+        payload = json.dumps({'version': LUT_VERSION, 'size': self.size, 'ops': ops}, sort_keys=True)
+        key = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+        lut_path = self.lut_dir / f"{key}.cube"
+        if lut_path.exists():
+            return lut_path
+
+        levels = np.linspace(0.0, 1.0, self.size)
+        # .cube order: red changes fastest, then green, then blue
+        b, g, r = np.meshgrid(levels, levels, levels, indexing='ij')
+        grid = np.stack([r, g, b], axis=-1).reshape(-1, 3)
+        table = apply_color_ops(grid, ops)
+
+        lines = [
+            f'TITLE "video_editor {key}"',
+            f"LUT_3D_SIZE {self.size}",
+            "DOMAIN_MIN 0.0 0.0 0.0",
+            "DOMAIN_MAX 1.0 1.0 1.0",
+        ]
+        lines.extend(f"{row[0]:.6f} {row[1]:.6f} {row[2]:.6f}" for row in table)
+
+        # Write to a temp name and rename, so concurrent scene renders never read a partial LUT
+        tmp_path = self.lut_dir / f".{key}.{os.getpid()}.cube.tmp"
+        tmp_path.write_text('\n'.join(lines) + '\n')
+        os.replace(tmp_path, lut_path)
+        print(f"🎨 Baked color LUT {lut_path.name} from {len(ops)} filters", file=sys.stderr, flush=True)
+        return lut_path
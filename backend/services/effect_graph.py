@@ -0,0 +1,493 @@
+"""
+Effect Graph
+Intermediate representation of a scene's FFmpeg effect stack and a small optimizing compiler
+
+VideoEffects appends its filter strings to an EffectGraph; compile() then
+  1. moves position-independent color ops (eq, hue, ...) to where they touch the fewest pixels:
+     before the still image is repeated, or after the supersampled motion is scaled back down
+  2. fuses adjacent eq/hue ops into one eq where the result is the same per pixel
+  3. renames branch labels so they are unique and emits -filter_complex when branches exist
+  4. bakes runs of color ops that could not be fused into one lut3d (see color_lut)
+  5. estimates the per-pixel work of the graph
+"""
+import os
+import re
+import sys
+import math
+from services.color_lut import ColorLUT, NUMPY_AVAILABLE
+
+# Position-independent per-pixel color ops (output pixel depends only on the same input pixel)
+COLOR_OPS = {'eq', 'hue', 'lutrgb', 'lut3d', 'colorbalance', 'curves'}
+
+# Ops that only move, resample or retime pixels (no fill colors), so color ops may cross them
+RESAMPLE_OPS = {'scale', 'zoompan', 'crop', 'setsar', 'loop', 'setpts', 'fps'}
+
+# Ops whose output frame has the size of their input frame (rotate keeps ow=iw/oh=ih by default)
+SIZE_PRESERVING_OPS = COLOR_OPS | {
+    'setsar', 'loop', 'setpts', 'fps', 'format', 'null', 'fade', 'noise', 'gblur', 'boxblur', 'vignette',
+    'rotate', 'perspective', 'hflip', 'vflip', 'chromashift', 'rgbashift',
+}
+
+# Relative work per output pixel (eq = 1.0), used by the cost estimate
+OP_COSTS = {
+    'eq': 1.0, 'hue': 1.5, 'lutrgb': 1.0, 'lut3d': 1.2, 'colorbalance': 1.0, 'curves': 1.0,
+    'scale': 3.0, 'zoompan': 3.0, 'crop': 0.1, 'setsar': 0.0, 'setpts': 0.0, 'loop': 0.1, 'fps': 0.0,
+    'noise': 2.5, 'gblur': 5.0, 'boxblur': 3.0, 'vignette': 2.0, 'rotate': 3.0, 'perspective': 4.0,
+    'fade': 0.5, 'split': 0.2, 'blend': 1.0, 'hflip': 0.3, 'vflip': 0.3, 'hstack': 0.3, 'vstack': 0.3,
+}
+
+# eq parameters -> (plane, stage); eq applies contrast (0), brightness (1), gamma (2) per plane.
+# Saturation is the chroma planes' contrast, gamma_r/g/b feed the per-plane gamma.
+EQ_STAGES = {
+    'contrast': (('y', 0),),
+    'brightness': (('y', 1),),
+    'gamma': (('y', 2),),
+    'gamma_weight': (('y', 2),),
+    'saturation': (('u', 0), ('v', 0)),
+    'gamma_g': (('y', 2), ('u', 2), ('v', 2)),
+    'gamma_b': (('u', 2),),
+    'gamma_r': (('v', 2),),
+}
+
+# Label a branch uses for the running video stream when it also reads extra inputs (see add_input)
+MAIN_LABEL = 'main'
+
+_LABEL_RE = re.compile(r'^((?:\[[^\]]*\])*)(.*?)((?:\[[^\]]*\])*)$', re.S)
+
+
+def _split_top(text, sep):
+    """Split on sep outside of quotes, brackets and parentheses"""
+    parts, current, depth, quoted = [], [], 0, False
+    for char in text:
+        if char == "'":
+            quoted = not quoted
+        elif not quoted and char in '([':
+            depth += 1
+        elif not quoted and char in ')]':
+            depth -= 1
+        elif char == sep and not quoted and depth == 0:
+            parts.append(''.join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append(''.join(current))
+    return parts
+
+
+def _num(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fmt(value):
+    return f"{value:.6g}"
+
+
+class FilterOp:
+    """One FFmpeg filter: name, (key, value) arguments (key None = positional) and pad labels"""
+
+    def __init__(self, name, args=None, inputs=None, outputs=None):
+        self.name = name
+        self.args = list(args or [])
+        self.inputs = list(inputs or [])
+        self.outputs = list(outputs or [])
+
+    @classmethod
+    def parse(cls, text):
+        """Parse '[in]name=a:b=c[out]' into a FilterOp"""
+        match = _LABEL_RE.match(text.strip())
+        inputs = re.findall(r'\[([^\]]*)\]', match.group(1))
+        outputs = re.findall(r'\[([^\]]*)\]', match.group(3))
+        body = match.group(2)
+
+        name, _, arg_text = body.partition('=')
+        args = []
+        if arg_text:
+            for part in _split_top(arg_text, ':'):
+                key, sep, value = part.partition('=')
+                # Positional arguments have no '=' outside of quotes
+                if sep and "'" not in key:
+                    args.append((key, value))
+                else:
+                    args.append((None, part))
+        return cls(name.strip(), args, inputs, outputs)
+
+    def get(self, key, position=None):
+        """Value of a keyed argument, or of the positional argument at position"""
+        positional = [value for k, value in self.args if k is None]
+        for k, value in self.args:
+            if k == key:
+                return value
+        if position is not None and position < len(positional):
+            return positional[position]
+        return None
+
+    def numeric_args(self):
+        """All arguments as {key: float}, or None if any is positional or an expression"""
+        params = {}
+        for key, value in self.args:
+            number = _num(value)
+            if key is None or number is None:
+                return None
+            params[key] = number
+        return params
+
+    def __str__(self):
+        text = self.name
+        if self.args:
+            text += '=' + ':'.join(value if key is None else f"{key}={value}" for key, value in self.args)
+        return ''.join(f"[{label}]" for label in self.inputs) + text + ''.join(f"[{label}]" for label in self.outputs)
+
+
+class BranchOp:
+    """A labelled sub-graph with one unlabelled input and one unlabelled output (e.g. split ... blend)"""
+
+    name = 'branch'
+
+    def __init__(self, chains):
+        self.chains = chains  # List of chains, each a list of FilterOps
+
+    def ops(self):
+        return [op for chain in self.chains for op in chain]
+
+    def render(self, prefix, external=None):
+        """
+        Serialize with every label made unique by prefix (labels may be redefined, e.g. [tr]hflip[tr])
+
+        Args:
+            prefix: Label prefix for this branch
+            external: Labels of extra inputs, e.g. {'ext0': '2:v'}
+        """
+        mapping = dict(external or {})
+        head = ''
+        if any(MAIN_LABEL in op.inputs for op in self.ops()):
+            # The running stream can only be referenced by name, so end the previous chain with a label
+            mapping[MAIN_LABEL] = f"{prefix}{MAIN_LABEL}"
+            head = f"null[{mapping[MAIN_LABEL]}];"
+        counter = 0
+        chains = []
+        for chain in self.chains:
+            rendered = []
+            for op in chain:
+                inputs = [mapping.get(label, label) for label in op.inputs]
+                outputs = []
+                for label in op.outputs:
+                    counter += 1
+                    mapping[label] = f"{prefix}{label}_{counter}"
+                    outputs.append(mapping[label])
+                rendered.append(str(FilterOp(op.name, op.args, inputs, outputs)))
+            chains.append(','.join(rendered))
+        return head + ';'.join(chains)
+
+
+class CompiledGraph:
+    """Result of EffectGraph.compile()"""
+
+    def __init__(self, filter, complex, cost, output_label=None, inputs=None):
+        self.filter = filter              # -vf chain or -filter_complex graph
+        self.complex = complex            # True: use -filter_complex and map output_label
+        self.cost = cost                  # See EffectGraph.estimate_cost()
+        self.output_label = output_label
+        self.inputs = inputs or []        # Extra FFmpeg input arguments, in input order
+
+
+class EffectGraph:
+    """Ordered effect stack of one scene"""
+
+    def __init__(self):
+        self.ops = []
+        self.inputs = []  # FFmpeg argument lists of extra inputs (noise plates, ...)
+
+    def add_input(self, args):
+        """
+        Register an extra FFmpeg input (e.g. ['-stream_loop', '-1', '-i', 'plate.mkv'])
+
+        Returns:
+            str: Label to use for it in a branch segment, next to MAIN_LABEL for the running stream
+        """
+        self.inputs.append(list(args))
+        return f"ext{len(self.inputs) - 1}"
+
+    def _parse_segment(self, segment):
+        chains = [[FilterOp.parse(f) for f in _split_top(chain, ',')] for chain in _split_top(segment, ';')]
+        if len(chains) == 1 and not any(op.inputs or op.outputs for op in chains[0]):
+            return chains[0]
+        return [BranchOp(chains)]
+
+    def append(self, segment):
+        """Append a filter string (one filter, a comma chain, or a labelled graph)"""
+        if segment:
+            self.ops.extend(self._parse_segment(segment))
+        return self
+
+    def prepend(self, segment):
+        """Insert a filter string before all existing ops"""
+        if segment:
+            self.ops[0:0] = self._parse_segment(segment)
+        return self
+
+    def is_empty(self):
+        return not self.ops
+
+    def has_branches(self):
+        return any(isinstance(op, BranchOp) for op in self.ops)
+
+    def to_chain(self, external=None):
+        """Serialize in the current op order (labels made unique, extra inputs resolved via external)"""
+        if not self.ops:
+            return None
+        return ','.join(
+            op.render(f"e{i}_", external) if isinstance(op, BranchOp) else str(op)
+            for i, op in enumerate(self.ops)
+        )
+
+    # ---- Analysis ---------------------------------------------------------
+
+    @staticmethod
+    def _output_size(op, size):
+        """Frame size after op, where it can be read from numeric arguments"""
+        w, h = size
+        if op.name == 'scale':
+            new_w, new_h = _num(op.get('w', 0) or op.get('width')), _num(op.get('h', 1) or op.get('height'))
+        elif op.name == 'crop':
+            new_w, new_h = _num(op.get('w', 0) or op.get('out_w')), _num(op.get('h', 1) or op.get('out_h'))
+        elif op.name == 'zoompan' and op.get('s'):
+            new_w, new_h = (_num(v) for v in op.get('s').split('x'))
+        else:
+            return size
+        return (int(new_w) if new_w else w, int(new_h) if new_h else h)
+
+    def output_size(self, width, height):
+        """
+        Frame size the graph outputs, or None unless every op's size is known for certain
+
+        Unlike _sizes() (a cost estimate), ops with expression sizes and branches count as unknown.
+        """
+        size = (width, height)
+        for op in self.ops:
+            if isinstance(op, BranchOp):
+                return None
+            if op.name in SIZE_PRESERVING_OPS:
+                continue
+            if op.name == 'scale':
+                new_size = (_num(op.get('w', 0) or op.get('width')), _num(op.get('h', 1) or op.get('height')))
+            elif op.name == 'crop':
+                new_size = (_num(op.get('w', 0) or op.get('out_w')), _num(op.get('h', 1) or op.get('out_h')))
+            elif op.name == 'zoompan' and op.get('s'):
+                new_size = tuple(_num(v) for v in op.get('s').split('x'))
+            else:
+                return None
+            if None in new_size or min(new_size) <= 0:
+                return None
+            size = (int(new_size[0]), int(new_size[1]))
+        return size
+
+    def _sizes(self, width, height):
+        """Frame size entering each op, plus the final output size"""
+        sizes = [(width, height)]
+        for op in self.ops:
+            sizes.append(sizes[-1] if isinstance(op, BranchOp) else self._output_size(op, sizes[-1]))
+        return sizes
+
+    def _first_generator(self):
+        """Index of the first op that turns one input frame into many (loop, zoompan with d > 1)"""
+        for i, op in enumerate(self.ops):
+            if isinstance(op, FilterOp) and (op.name == 'loop' or (op.name == 'zoompan' and op.get('d') != '1')):
+                return i
+        return len(self.ops)
+
+    def _rates(self, frames, still_input):
+        """Frames that pass each position (positions up to the generator of a still input see one frame)"""
+        generator = self._first_generator() if still_input else -1
+        return [1 if p <= generator else frames for p in range(len(self.ops) + 1)]
+
+    def estimate_cost(self, width, height, frames, still_input=False):
+        """
+        Estimate the per-pixel work of the graph
+
+        Returns:
+            dict: filters (count), mpixel_ops (weighted megapixel operations for the whole clip)
+        """
+        sizes = self._sizes(width, height)
+        rates = self._rates(frames, still_input)
+        total = 0.0
+        count = 0
+        for i, op in enumerate(self.ops):
+            pixels = max(sizes[i][0] * sizes[i][1], sizes[i + 1][0] * sizes[i + 1][1])
+            ops = op.ops() if isinstance(op, BranchOp) else [op]
+            for sub in ops:
+                total += OP_COSTS.get(sub.name, 1.0) * pixels * rates[i + 1]
+                count += 1
+        return {'filters': count, 'frames': frames, 'mpixel_ops': round(total / 1e6, 1)}
+
+    # ---- Passes -----------------------------------------------------------
+
+    def _place_color_ops(self, width, height, frames, still_input):
+        """Move each color op across neighbouring resample ops to the position that touches the fewest pixels"""
+        i = 0
+        while i < len(self.ops):
+            op = self.ops[i]
+            if not (isinstance(op, FilterOp) and op.name in COLOR_OPS):
+                i += 1
+                continue
+
+            rest = self.ops[:i] + self.ops[i + 1:]
+            graph = EffectGraph()
+            graph.ops = rest
+            sizes = graph._sizes(width, height)
+            rates = graph._rates(frames, still_input)
+
+            # Reachable insert positions: across contiguous resample ops in both directions
+            lo = i
+            while lo > 0 and isinstance(rest[lo - 1], FilterOp) and rest[lo - 1].name in RESAMPLE_OPS:
+                lo -= 1
+            hi = i
+            while hi < len(rest) and isinstance(rest[hi], FilterOp) and rest[hi].name in RESAMPLE_OPS:
+                hi += 1
+
+            def cost(pos):
+                return sizes[pos][0] * sizes[pos][1] * rates[pos]
+
+            best = i
+            for pos in range(lo, hi + 1):
+                if cost(pos) < cost(best):
+                    best = pos
+            self.ops = rest[:best] + [op] + rest[best:]
+            i = best + 1 if best > i else i + 1
+
+    @staticmethod
+    def _hue_as_eq(op):
+        """hue with only a saturation factor is the same per-pixel operation as eq saturation"""
+        params = op.numeric_args()
+        if op.name == 'hue' and params is not None and set(params) <= {'s'} and params:
+            return FilterOp('eq', [('saturation', _fmt(params['s']))])
+        return op
+
+    @staticmethod
+    def _fuse_eq(a, b):
+        """One eq equivalent to eq a followed by eq b, or None if the stages would reorder"""
+        pa, pb = a.numeric_args(), b.numeric_args()
+        if pa is None or pb is None or any(key not in EQ_STAGES for key in list(pa) + list(pb)):
+            return None
+
+        def stages(params):
+            planes = {}
+            for key in params:
+                for plane, stage in EQ_STAGES[key]:
+                    planes.setdefault(plane, set()).add(stage)
+            return planes
+
+        sa, sb = stages(pa), stages(pb)
+        for plane in set(sa) & set(sb):
+            # Every stage of a must come before (or be shared with) every stage of b on this plane
+            if max(sa[plane]) > min(sb[plane]):
+                return None
+            # gamma_weight blends rather than composes
+            if max(sa[plane]) == min(sb[plane]) == 2 and ('gamma_weight' in pa or 'gamma_weight' in pb):
+                return None
+
+        merged = dict(pa)
+        for key, value in pb.items():
+            if key in merged:
+                # Brightness offsets add; contrast, saturation and gammas are factors
+                merged[key] = merged[key] + value if key == 'brightness' else merged[key] * value
+            else:
+                merged[key] = value
+        return FilterOp('eq', [(key, _fmt(value)) for key, value in merged.items()])
+
+    @staticmethod
+    def _fuse_hue(a, b):
+        """Hue rotations add and saturation factors multiply (they commute)"""
+        pa, pb = a.numeric_args(), b.numeric_args()
+        if pa is None or pb is None or not set(pa) | set(pb) <= {'h', 's'}:
+            return None
+        h = pa.get('h', 0) + pb.get('h', 0)
+        s = pa.get('s', 1) * pb.get('s', 1)
+        return FilterOp('hue', [('h', _fmt(h)), ('s', _fmt(s))])
+
+    def _fuse(self):
+        ops = [self._hue_as_eq(op) if isinstance(op, FilterOp) else op for op in self.ops]
+        fused = []
+        for op in ops:
+            prev = fused[-1] if fused else None
+            merged = None
+            if isinstance(prev, FilterOp) and isinstance(op, FilterOp) and prev.name == op.name:
+                if op.name == 'eq':
+                    merged = self._fuse_eq(prev, op)
+                elif op.name == 'hue':
+                    merged = self._fuse_hue(prev, op)
+            if merged:
+                fused[-1] = merged
+            else:
+                fused.append(op)
+        self.ops = fused
+
+    @staticmethod
+    def _bakeable(op):
+        params = op.numeric_args() if isinstance(op, FilterOp) else None
+        if params is None:
+            return False
+        if op.name == 'eq':
+            return set(params) <= set(EQ_STAGES)
+        return op.name == 'hue' and set(params) <= {'h', 's'}
+
+    def _bake_luts(self, min_ops):
+        """Replace each run of at least min_ops adjacent eq/hue ops with one lut3d lookup"""
+        baked = []
+        run = []
+        for op in self.ops + [None]:
+            if op is not None and self._bakeable(op):
+                run.append(op)
+                continue
+            if len(run) >= min_ops:
+                try:
+                    lut_path = ColorLUT().bake([(o.name, o.numeric_args()) for o in run])
+                    run = [FilterOp('lut3d', [('file', f"'{lut_path}'"), ('interp', 'tetrahedral')])]
+                except Exception as e:
+                    print(f"⚠️ Color LUT failed, keeping {len(run)} color filters: {e}", file=sys.stderr, flush=True)
+            baked.extend(run)
+            run = []
+            if op is not None:
+                baked.append(op)
+        self.ops = baked
+
+    def optimize(self, width, height, frames, still_input=False, lut_min_ops=None):
+        """Run the placement, fusion and LUT passes in place"""
+        if lut_min_ops is None:
+            lut_min_ops = int(os.getenv('COLOR_LUT_MIN_OPS', 2))
+        self._place_color_ops(width, height, frames, still_input)
+        self._fuse()
+        if NUMPY_AVAILABLE and lut_min_ops > 0:
+            self._bake_luts(lut_min_ops)
+        return self
+
+    def compile(self, width, height, duration, fps=30, still_input=False, input_label='0:v', output_label='vout',
+                lut_min_ops=None, first_input_index=1):
+        """
+        Optimize and serialize the graph
+
+        Args:
+            width: Size of the input frames
+            height: Size of the input frames
+            duration: Clip duration in seconds (for the cost estimate)
+            still_input: The input is a single still frame repeated by a loop/zoompan op
+            lut_min_ops: Bake runs of this many color ops into a LUT (default: COLOR_LUT_MIN_OPS env or 2, 0 = off)
+            first_input_index: FFmpeg input index the extra inputs start at
+
+        Returns:
+            CompiledGraph or None if the graph is empty
+        """
+        if not self.ops:
+            return None
+        frames = max(1, int(math.ceil(duration * fps)))
+        self.optimize(width, height, frames, still_input, lut_min_ops)
+        cost = self.estimate_cost(width, height, frames, still_input)
+
+        if self.has_branches() or self.inputs:
+            external = {f"ext{n}": f"{first_input_index + n}:v" for n in range(len(self.inputs))}
+            graph = f"[{input_label}]{self.to_chain(external)}[{output_label}]"
+            inputs = [arg for args in self.inputs for arg in args]
+            return CompiledGraph(graph, True, cost, output_label, inputs)
+        return CompiledGraph(self.to_chain(), False, cost)
@@ -0,0 +1,407 @@
+"""
+Encode Backends
+Scene encode, audio mix and duration probe either through ffmpeg/ffprobe subprocesses (default)
+or in-process through PyAV (libav bindings, no process startup per call)
+"""
+import os
+import sys
+import shutil
+import subprocess
+from fractions import Fraction
+
+from services import ffmpeg_scheduler
+from services.effect_graph import FilterOp, _split_top
+from services.segment_format import audio_args, AUDIO_SAMPLE_RATE, SEGMENT_TIMESCALE
+from services.transitions import keyframe_args
+
+# PyAV runs libav in-process (optional, the subprocess backend works without it)
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
+ENCODE_BACKENDS = ('subprocess', 'pyav')
+
+
+def get_encode_backend(name=None):
+    """
+    Resolve the encode backend
+
+    Args:
+        name: 'subprocess' or 'pyav'; default: ENCODE_BACKEND env or 'subprocess'
+
+    Returns:
+        SubprocessBackend or PyAVBackend
+    """
+    if name is None:
+        name = os.getenv('ENCODE_BACKEND', 'subprocess').lower()
+    if name == 'pyav':
+        if AV_AVAILABLE:
+            return PyAVBackend()
+        print("⚠️ ENCODE_BACKEND=pyav but PyAV is not installed, using subprocess", file=sys.stderr, flush=True)
+    return SubprocessBackend()
+
+
+def raw_frame_input(frame, fps):
+    """FFmpeg input arguments for one raw rgb24 frame read from stdin"""
+    return [
+        '-f', 'rawvideo',
+        '-pix_fmt', 'rgb24',
+        '-s', f"{frame.width}x{frame.height}",
+        '-framerate', str(fps),
+        '-i', 'pipe:0',
+    ]
+
+
+def run_with_frame(cmd, frame):
+    """Run an FFmpeg command that reads the frame from stdin (see raw_frame_input)"""
+    result = ffmpeg_scheduler.run(cmd, input=frame.tobytes(), capture_output=True)
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode, cmd, stderr=result.stderr.decode('utf-8', errors='replace')
+        )
+    return result
+
+
+class SceneEncodeJob:
+    """Everything a backend needs to encode one scene clip"""
+
+    def __init__(self, frame, audio_path, output_path, duration, segment_format, compiled=None,
+                 audio_filter=None, keyframe_times=None, motion_renderer=None, log_path=None):
+        """
+        Args:
+            frame: PIL RGB image of the composed scene
+            audio_path: Scene audio (TTS or TTS + sound effect)
+            output_path: Scene clip (.mp4)
+            duration: Video duration in seconds
+            segment_format: SegmentFormat of the job (encoder settings, frame rate)
+            compiled: CompiledGraph of the scene effects or None
+            audio_filter: Audio filter chain (atempo for speed effects) or None
+            keyframe_times: Times that must start a GOP (transition windows)
+            motion_renderer: NumpyMotionRenderer feeding the frames, or None for a single piped frame
+            log_path: FFmpeg log file for the motion renderer
+        """
+        self.frame = frame
+        self.audio_path = audio_path
+        self.output_path = output_path
+        self.duration = duration
+        self.segment_format = segment_format
+        self.compiled = compiled
+        self.audio_filter = audio_filter
+        self.keyframe_times = keyframe_times or []
+        self.motion_renderer = motion_renderer
+        self.log_path = log_path
+
+    @property
+    def fps(self):
+        return self.segment_format.fps
+
+
+class SubprocessBackend:
+    """One ffmpeg/ffprobe process per operation"""
+
+    name = 'subprocess'
+
+    def probe_duration(self, path):
+        """Container duration in seconds"""
+        cmd = [
+            'ffprobe',
+            '-v', 'error',
+            '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1',
+            str(path)
+        ]
+        result = ffmpeg_scheduler.run(cmd, capture_output=True, text=True, check=True)
+        return float(result.stdout.strip())
+
+    def mix_audio(self, tts_audio_path, sound_effect_path, output_path, target_duration, volume_percent=50, offset_percent=0):
+        """
+        Mix TTS audio with sound effect using FFmpeg
+
+        Args:
+            tts_audio_path: Path to TTS audio (voice)
+            sound_effect_path: Path to sound effect
+            output_path: Output path for mixed audio
+            target_duration: Target duration in seconds
+            volume_percent: Sound effect volume (0-100%), default 50%
+            offset_percent: Sound effect timing offset (0-100%), default 0% (start)
+        """
+        # Convert percentage to FFmpeg volume value (0.0-1.0)
+        volume = volume_percent / 100.0
+
+        # Calculate delay in milliseconds based on offset percentage
+        # 0% = start (0ms delay), 50% = middle, 100% = end
+        delay_ms = int(target_duration * (offset_percent / 100.0) * 1000)
+
+        # ROBUST APPROACH: Normalize both audio streams to same format before mixing
+        # TTS is often mono 24kHz, sound effects can be stereo 44.1kHz
+        # We need to convert both to the same format (44.1kHz stereo) before mixing
+        # Output as MP3 format (not AAC) for compatibility with rest of pipeline
+        cmd = [
+            'ffmpeg', '-y',
+            '-i', str(tts_audio_path),      # Input 0: TTS voice
+            '-i', str(sound_effect_path),   # Input 1: Sound effect
+            '-filter_complex',
+            # Normalize TTS to 44.1kHz stereo
+            '[0:a]aresample=44100,aformat=channel_layouts=stereo[tts];'
+            # Normalize sound effect to 44.1kHz stereo, apply delay (timing offset), then volume
+            # NO LOOP - sound effect plays once at specified timing
+            f'[1:a]aresample=44100,aformat=channel_layouts=stereo,adelay={delay_ms}|{delay_ms},volume={volume}[sfx];'
+            # Mix both streams WITHOUT auto-normalization (keeps TTS at 100%, SFX at specified volume)
+            '[tts][sfx]amix=inputs=2:duration=first:dropout_transition=3:normalize=0[out]',
+            '-map', '[out]',
+            '-t', str(target_duration),     # Trim to target duration
+            '-c:a', 'libmp3lame',          # Use MP3 codec for MP3 container
+            '-b:a', '192k',
+            '-ar', '44100',                 # Output sample rate
+            str(output_path)
+        ]
+
+        try:
+            ffmpeg_scheduler.run(cmd, check=True, capture_output=True, text=True)
+            print("   ✓ Audio mixed successfully", file=sys.stderr, flush=True)
+        except subprocess.CalledProcessError as e:
+            # Log the actual error for debugging
+            print(f"   ⚠️ Audio mixing failed: {e.stderr if e.stderr else str(e)}", file=sys.stderr, flush=True)
+            print("   ℹ️ Using TTS only (without sound effect)", file=sys.stderr, flush=True)
+            # Fallback: copy TTS audio as is
+            shutil.copy(tts_audio_path, output_path)
+
+    def encode_scene(self, job):
+        """Encode a scene clip with one ffmpeg process (frame(s) piped on stdin)"""
+        compiled = job.compiled
+
+        # Zoom/pan from the NumPy renderer arrives as a frame stream, everything else as one frame
+        image_input = job.motion_renderer.input_args() if job.motion_renderer else raw_frame_input(job.frame, job.fps)
+
+        # Inputs: 0 = frame(s), 1 = audio, 2+ = extra effect inputs (noise plates)
+        cmd = [
+            'ffmpeg', '-y',
+            *image_input,
+            '-i', str(job.audio_path),
+            *(compiled.inputs if compiled else []),
+            *job.segment_format.encode_args(),
+            '-t', str(job.duration),
+        ]
+
+        # Add video filter if effects are present (branching effects need -filter_complex)
+        if compiled and compiled.complex:
+            cmd.extend(['-filter_complex', compiled.filter, '-map', f"[{compiled.output_label}]", '-map', '1:a'])
+        elif compiled:
+            cmd.extend(['-vf', compiled.filter])
+
+        # Adjust audio tempo to match video speed
+        if job.audio_filter:
+            cmd.extend(['-af', job.audio_filter])
+
+        # Keyframes at the transition windows, so the transition renderer can stream-copy the rest
+        cmd.extend(keyframe_args(job.keyframe_times))
+
+        cmd.extend([
+            *audio_args(),
+            '-shortest',
+            str(job.output_path)
+        ])
+
+        # Log full FFmpeg command for debugging
+        print(f"   🔧 FFmpeg cmd: {' '.join(cmd)}", file=sys.stderr, flush=True)
+
+        if job.motion_renderer:
+            job.motion_renderer.run(job.frame, cmd, job.log_path)
+        else:
+            run_with_frame(cmd, job.frame)
+        return job.output_path
+
+
+class PyAVBackend(SubprocessBackend):
+    """
+    Probe, audio mix and scene encode inside the Python process via PyAV
+
+    The scene's filter chain runs in a libavfilter graph fed with the PIL frame, and every
+    output frame passes through Python before the encoder (keyframes are set per frame).
+    Scenes with branching filter graphs, extra inputs (noise plates) or the NumPy motion
+    renderer are encoded by the subprocess path.
+    """
+
+    name = 'pyav'
+
+    def __init__(self):
+        if not AV_AVAILABLE:
+            raise RuntimeError("PyAV is required for the pyav encode backend")
+
+    def probe_duration(self, path):
+        """Container duration in seconds (header only, no decoding)"""
+        with av.open(str(path)) as container:
+            if container.duration is not None:
+                return container.duration / av.time_base
+            stream = (container.streams.video or container.streams.audio)[0]
+            return float(stream.duration * stream.time_base)
+
+    @staticmethod
+    def _chain(graph, source, chain):
+        """Add a comma-separated filter chain after source, return the last filter"""
+        node = source
+        for text in _split_top(chain, ','):
+            op = FilterOp.parse(text)
+            args = str(FilterOp(op.name, op.args)).partition('=')[2]
+            filter_node = graph.add(op.name, args) if args else graph.add(op.name)
+            node.link_to(filter_node)
+            node = filter_node
+        return node
+
+    @staticmethod
+    def _drain(sink):
+        """Pull the frames available at a buffersink (lazily: apad never ends on its own)"""
+        while True:
+            try:
+                yield sink.pull()
+            except (av.error.BlockingIOError, av.error.EOFError):
+                return
+
+    def mix_audio(self, tts_audio_path, sound_effect_path, output_path, target_duration, volume_percent=50, offset_percent=0):
+        """Same mix as the subprocess backend, in one in-process filter graph"""
+        volume = volume_percent / 100.0
+        delay_ms = int(target_duration * (offset_percent / 100.0) * 1000)
+        try:
+            with av.open(str(tts_audio_path)) as tts, av.open(str(sound_effect_path)) as sfx:
+                graph = av.filter.Graph()
+                tts_src = graph.add_abuffer(template=tts.streams.audio[0])
+                sfx_src = graph.add_abuffer(template=sfx.streams.audio[0])
+                tts_out = self._chain(graph, tts_src, 'aresample=44100,aformat=channel_layouts=stereo')
+                sfx_out = self._chain(graph, sfx_src, f'aresample=44100,aformat=channel_layouts=stereo,adelay={delay_ms}|{delay_ms},volume={volume}')
+                mix = graph.add('amix', 'inputs=2:duration=first:dropout_transition=3:normalize=0')
+                tts_out.link_to(mix, 0, 0)
+                sfx_out.link_to(mix, 0, 1)
+                sink = graph.add('abuffersink')
+                mix.link_to(sink)
+                graph.configure()
+
+                for source, container in ((tts_src, tts), (sfx_src, sfx)):
+                    for frame in container.decode(audio=0):
+                        source.push(frame)
+                    source.push(None)
+
+                with av.open(str(output_path), 'w', format='mp3') as output:
+                    stream = output.add_stream('libmp3lame', rate=AUDIO_SAMPLE_RATE)
+                    stream.layout = 'stereo'
+                    stream.bit_rate = 192000
+                    max_samples = int(target_duration * AUDIO_SAMPLE_RATE)
+                    written = 0
+                    for frame in self._drain(sink):
+                        if written >= max_samples:
+                            break
+                        frame.pts = None
+                        output.mux(stream.encode(frame))
+                        written += frame.samples
+                    output.mux(stream.encode(None))
+            print("   ✓ Audio mixed successfully (in-process)", file=sys.stderr, flush=True)
+        except (av.error.FFmpegError, ValueError) as e:
+            print(f"   ⚠️ Audio mixing failed: {e}", file=sys.stderr, flush=True)
+            print("   ℹ️ Using TTS only (without sound effect)", file=sys.stderr, flush=True)
+            shutil.copy(tts_audio_path, output_path)
+
+    def _video_frames(self, job, count):
+        """Run the scene's filter chain on the frame and yield count output frames"""
+        graph = av.filter.Graph()
+        source = graph.add_buffer(width=job.frame.width, height=job.frame.height, format='rgb24',
+                                  time_base=Fraction(1, job.fps))
+        last = self._chain(graph, source, job.compiled.filter) if job.compiled else source
+        sink = graph.add('buffersink')
+        last.link_to(sink)
+        graph.configure()
+
+        frame = av.VideoFrame.from_image(job.frame)
+        frame.pts = 0
+        frame.time_base = Fraction(1, job.fps)
+        source.push(frame)
+        # EOF right away: loop/zoompan generate the remaining frames, fps/tpad flush on it
+        source.push(None)
+
+        produced = 0
+        while produced < count:
+            try:
+                out = sink.pull()
+            except (av.error.BlockingIOError, av.error.EOFError):
+                return
+            yield out
+            produced += 1
+
+    def _audio_frames(self, job):
+        """Decode the scene audio (through the speed filter if any)"""
+        with av.open(str(job.audio_path)) as container:
+            if not job.audio_filter:
+                for frame in container.decode(audio=0):
+                    frame.pts = None
+                    yield frame
+                return
+
+            graph = av.filter.Graph()
+            source = graph.add_abuffer(template=container.streams.audio[0])
+            sink = graph.add('abuffersink')
+            self._chain(graph, source, job.audio_filter).link_to(sink)
+            graph.configure()
+            for frame in container.decode(audio=0):
+                source.push(frame)
+                for out in self._drain(sink):
+                    out.pts = None
+                    yield out
+            source.push(None)
+            for out in self._drain(sink):
+                out.pts = None
+                yield out
+
+    def encode_scene(self, job):
+        """Encode a scene clip in-process (falls back to ffmpeg for graphs libavfilter chains can't express here)"""
+        if job.motion_renderer or (job.compiled and (job.compiled.complex or job.compiled.inputs)):
+            return super().encode_scene(job)
+
+        options = job.segment_format.encoder_options()
+        # Forced I frames become IDR frames, so transition windows start a closed GOP
+        options['forced-idr'] = '1'
+        frame_count = max(1, int(round(job.duration * job.fps)))
+        keyframes = {int(round(t * job.fps)) for t in job.keyframe_times}
+        # PyAV >= 12 takes the PictureType enum, older versions the letter
+        key_type = getattr(getattr(av.video.frame, 'PictureType', None), 'I', 'I')
+
+        # In-process encodes count against the same machine-wide slots and thread budget as ffmpeg
+        scheduler = ffmpeg_scheduler.get_scheduler()
+        with scheduler.slot(f"pyav {job.output_path}") as slot_index, \
+                av.open(str(job.output_path), 'w', options={'video_track_timescale': str(SEGMENT_TIMESCALE)}) as output:
+            video = output.add_stream('libx264', rate=job.fps)
+            video.width = job.segment_format.width
+            video.height = job.segment_format.height
+            video.pix_fmt = 'yuv420p'
+            video.options = options
+            video.thread_count = scheduler.slot_threads(slot_index)
+
+            audio = output.add_stream('aac', rate=AUDIO_SAMPLE_RATE)
+            audio.layout = 'stereo'
+            audio.bit_rate = 192000
+
+            audio_frames = self._audio_frames(job)
+            audio_time = 0.0
+
+            # Interleave: after each video frame, mux audio up to the same timestamp
+            for index, frame in enumerate(self._video_frames(job, frame_count)):
+                frame = frame.reformat(format='yuv420p')
+                frame.pts = index
+                frame.time_base = Fraction(1, job.fps)
+                if index in keyframes:
+                    frame.pict_type = key_type
+                output.mux(video.encode(frame))
+
+                video_time = (index + 1) / job.fps
+                # Audio stops with the video, like -shortest
+                while audio_time < min(video_time, job.duration):
+                    audio_frame = next(audio_frames, None)
+                    if audio_frame is None:
+                        audio_time = job.duration
+                        break
+                    output.mux(audio.encode(audio_frame))
+                    audio_time += audio_frame.samples / audio_frame.sample_rate
+
+            output.mux(video.encode(None))
+            output.mux(audio.encode(None))
+
+        return job.output_path
@@ -0,0 +1,272 @@
+"""
+FFmpeg Scheduler
+Machine-wide admission control for ffmpeg/ffprobe: a process limit shared by every process on the box
+(gunicorn workers, scene renderer pools) through lock files, -threads from a global core budget, and
+a lower CPU/IO priority than the API, so parallel renders never starve the Flask request threads
+"""
+import os
+import json
+import time
+import queue
+import shutil
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# Binaries that only read headers: they skip the slot queue (never held up behind long encodes)
+LIGHT_COMMANDS = ('ffprobe',)
+
+# Poll interval while waiting for a slot (seconds, doubled up to the maximum)
+SLOT_POLL_SECONDS = 0.05
+SLOT_POLL_MAX_SECONDS = 0.5
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class FFmpegScheduler:
+    """Runs ffmpeg/ffprobe commands under a machine-wide slot limit and CPU budget"""
+
+    def __init__(self, slots=None, cpu_budget=None, niceness=None, ionice=None, lock_dir=None):
+        """
+        Args:
+            slots: ffmpeg processes running at once on the machine (default: FFMPEG_SLOTS env or half the cores)
+            cpu_budget: Cores all ffmpeg processes share (default: FFMPEG_CPU_BUDGET env or all cores but one,
+                        which is left to the API)
+            niceness: nice increment of ffmpeg processes (default: FFMPEG_NICE env or 10, 0 disables)
+            ionice: Run ffmpeg in the best-effort IO class at the lowest priority (default: FFMPEG_IONICE env or on)
+            lock_dir: Slot lock files (default: FFMPEG_SCHEDULER_DIR env or <tmp>/video_editor_ffmpeg_slots)
+        """
+        cores = os.cpu_count() or 1
+        if slots is None:
+            slots = int(os.getenv('FFMPEG_SLOTS', max(1, cores // 2)))
+        if cpu_budget is None:
+            cpu_budget = int(os.getenv('FFMPEG_CPU_BUDGET', max(1, cores - 1)))
+        if niceness is None:
+            niceness = int(os.getenv('FFMPEG_NICE', 10))
+        if ionice is None:
+            ionice = os.getenv('FFMPEG_IONICE', '1').lower() in ('1', 'true', 'yes')
+        if lock_dir is None:
+            lock_dir = os.getenv('FFMPEG_SCHEDULER_DIR') or Path(tempfile.gettempdir()) / 'video_editor_ffmpeg_slots'
+
+        self.slots = max(1, slots)
+        self.cpu_budget = max(1, cpu_budget)
+        self.niceness = niceness
+        self.lock_dir = Path(lock_dir)
+        self.queue_dir = self.lock_dir / 'queue'
+        self.queue_dir.mkdir(parents=True, exist_ok=True)
+
+        # nice/ionice as command prefixes (preexec_fn is unsafe with the render threads)
+        self.prefix = []
+        if ionice and shutil.which('ionice'):
+            self.prefix += ['ionice', '-c', '2', '-n', '7']
+        if niceness and shutil.which('nice'):
+            self.prefix += ['nice', '-n', str(niceness)]
+
+        # Without fcntl (Windows) the limit only holds within this process
+        self._local_slots = queue.Queue()
+        for index in range(self.slots):
+            self._local_slots.put(index)
+        self._waiter_seq = 0
+        self._lock = threading.Lock()
+
+    def slot_threads(self, index=None):
+        """
+        Encoder/filter threads of the process holding a slot
+
+        The budget is split evenly and the remainder goes to the first slots, so all slots together
+        use the whole core budget (at least one thread each).
+
+        Args:
+            index: Slot index (None: the smallest share)
+        """
+        share, extra = divmod(self.cpu_budget, self.slots)
+        if index is not None and index < extra:
+            share += 1
+        return max(1, share)
+
+    def _slot_path(self, index):
+        return self.lock_dir / f"slot_{index}.lock"
+
+    def _register_waiter(self, label):
+        with self._lock:
+            self._waiter_seq += 1
+            seq = self._waiter_seq
+        waiter_path = self.queue_dir / f"{os.getpid()}-{threading.get_ident()}-{seq}"
+        waiter_path.write_text(json.dumps({'pid': os.getpid(), 'label': label, 'since': time.time()}))
+        return waiter_path
+
+    @contextmanager
+    def slot(self, label=''):
+        """
+        Hold one machine-wide ffmpeg slot (waits while all slots are taken)
+
+        Args:
+            label: Shown in stats() while the slot is held
+        """
+        if not FCNTL_AVAILABLE:
+            index = self._local_slots.get()
+            try:
+                yield index
+            finally:
+                self._local_slots.put(index)
+            return
+
+        waiter_path = self._register_waiter(label)
+        handle = None
+        index = None
+        poll = SLOT_POLL_SECONDS
+        try:
+            while handle is None:
+                for candidate in range(self.slots):
+                    f = open(self._slot_path(candidate), 'a+')
+                    try:
+                        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        f.close()
+                        continue
+                    handle, index = f, candidate
+                    break
+                else:
+                    time.sleep(poll)
+                    poll = min(poll * 2, SLOT_POLL_MAX_SECONDS)
+        finally:
+            waiter_path.unlink(missing_ok=True)
+
+        try:
+            handle.seek(0)
+            handle.truncate()
+            handle.write(json.dumps({'pid': os.getpid(), 'label': label, 'since': time.time()}))
+            handle.flush()
+            yield index
+        finally:
+            handle.seek(0)
+            handle.truncate()
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            handle.close()
+
+    def prepare(self, cmd, slot_index=None):
+        """
+        Command with the thread allocation and priority prefix applied
+
+        ffmpeg gets -filter_threads/-filter_complex_threads (global) and -threads before the output
+        file, unless the command sets threads itself.
+
+        Args:
+            slot_index: Slot the command runs in (see slot_threads)
+        """
+        cmd = [str(arg) for arg in cmd]
+        if os.path.basename(cmd[0]) == 'ffmpeg' and '-threads' not in cmd:
+            threads = str(self.slot_threads(slot_index))
+            cmd = [cmd[0], '-filter_threads', threads, '-filter_complex_threads', threads,
+                   *cmd[1:-1], '-threads', threads, cmd[-1]]
+        return self.prefix + cmd
+
+    def _is_light(self, cmd):
+        return os.path.basename(str(cmd[0])) in LIGHT_COMMANDS
+
+    def _label(self, cmd):
+        return ' '.join(str(arg) for arg in cmd[:1] + cmd[-1:])
+
+    def run(self, cmd, **kwargs):
+        """subprocess.run() through the scheduler (same arguments and result)"""
+        if self._is_light(cmd):
+            return subprocess.run(self.prepare(cmd), **kwargs)
+        with self.slot(self._label(cmd)) as index:
+            return subprocess.run(self.prepare(cmd, index), **kwargs)
+
+    @contextmanager
+    def popen(self, cmd, **kwargs):
+        """subprocess.Popen() through the scheduler; the slot is held until the block ends"""
+        with self.slot(self._label(cmd)) as index:
+            process = subprocess.Popen(self.prepare(cmd, index), **kwargs)
+            try:
+                yield process
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+
+    def stats(self):
+        """
+        Current load of the machine-wide scheduler
+
+        Returns:
+            dict: slots, running (pid/label/seconds per held slot), queued (waiting commands), CPU budget,
+                  threads per slot, niceness
+        """
+        now = time.time()
+        running = []
+        for index in range(self.slots):
+            try:
+                info = json.loads(self._slot_path(index).read_text() or 'null')
+            except (FileNotFoundError, ValueError):
+                continue
+            # A process that died releases its lock, but its info stays until the slot is reused
+            if info and _pid_alive(info['pid']):
+                running.append({'slot': index, 'pid': info['pid'], 'label': info['label'],
+                                'seconds': round(now - info['since'], 1)})
+
+        queued = 0
+        for waiter_path in self.queue_dir.iterdir():
+            try:
+                pid = int(waiter_path.name.split('-')[0])
+            except ValueError:
+                continue
+            if _pid_alive(pid):
+                queued += 1
+            else:
+                waiter_path.unlink(missing_ok=True)
+
+        return {
+            'slots': self.slots,
+            'running': running,
+            'queued': queued,
+            'cpu_budget': self.cpu_budget,
+            'threads_per_slot': [self.slot_threads(index) for index in range(self.slots)],
+            'niceness': self.niceness,
+            'cross_process': FCNTL_AVAILABLE,
+        }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """The scheduler of this process (all processes share its slots through the lock files)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = FFmpegScheduler()
+        return _scheduler
+
+
+def default_workers():
+    """Default number of parallel scene renders: one per ffmpeg slot, so no worker idles on a slot lock"""
+    return get_scheduler().slots
+
+
+def run(cmd, **kwargs):
+    """Run an ffmpeg/ffprobe command like subprocess.run(), under the machine-wide scheduler"""
+    return get_scheduler().run(cmd, **kwargs)
+
+
+def popen(cmd, **kwargs):
+    """Start an ffmpeg command like subprocess.Popen() (context manager holding its slot)"""
+    return get_scheduler().popen(cmd, **kwargs)
@@ -0,0 +1,179 @@
+"""
+Motion Renderer
+Renders zoom/pan motion in Python and pipes raw frames into FFmpeg (alternative to zoompan)
+"""
+import os
+import sys
+import math
+import subprocess
+from PIL import Image
+
+from services import ffmpeg_scheduler
+
+# NumPy computes the per-frame crop windows (optional, the zoompan engine works without it)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Scale of the pan-only framing (mirrors VideoEffects.PAN_FRAMING_SCALE)
+PAN_FRAMING_SCALE = 3.5
+
+
+def get_motion_engine(engine=None):
+    """
+    Resolve the motion engine for zoom/pan scenes
+
+    Args:
+        engine: 'zoompan' (FFmpeg filter) or 'numpy' (this module); default: MOTION_ENGINE env or 'zoompan'
+
+    Returns:
+        str: Engine that will actually be used
+    """
+    if engine is None:
+        engine = os.getenv('MOTION_ENGINE', 'zoompan').lower()
+    if engine == 'numpy' and not NUMPY_AVAILABLE:
+        print("⚠️ MOTION_ENGINE=numpy but NumPy is not installed, using zoompan", file=sys.stderr, flush=True)
+        return 'zoompan'
+    return engine if engine in ('zoompan', 'numpy') else 'zoompan'
+
+
+class NumpyMotionRenderer:
+    """
+    Computes the zoom/pan crop window of every frame at once and resamples it from one source image
+
+    Crop windows use the same motion as VideoEffects._combined_zoompan_filter, but in float source
+    coordinates, so PIL's bicubic affine resampling moves the window by sub-pixel amounts instead of
+    zoompan's whole-pixel steps.
+    """
+
+    def __init__(self, zoom_type, pan_type, width, height, duration, intensity=0.5, fps=30):
+        """
+        Args:
+            zoom_type: effect_zoom value ('none', 'zoom_in', 'zoom_out', 'ken_burns', 'pulse')
+            pan_type: effect_pan value ('none', 'left', 'right', 'up', 'down')
+            width: Output width (the source image has the same size)
+            height: Output height
+            duration: Scene video duration in seconds
+            intensity: effect_intensity (0.0 - 1.0)
+            fps: Output frame rate
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy is required for the numpy motion engine")
+
+        self.zoom_type = zoom_type or 'none'
+        self.pan_type = pan_type or 'none'
+        self.width = width
+        self.height = height
+        self.intensity = intensity
+        self.fps = fps
+        self.frames = max(3, int(math.ceil(max(duration, 0.1) * fps)))
+
+    def crop_windows(self):
+        """
+        Crop window of every frame in source pixels
+
+        Returns:
+            tuple: (x, y, crop_width, crop_height) NumPy arrays, one entry per frame
+        """
+        w, h = float(self.width), float(self.height)
+        t = np.arange(self.frames, dtype=np.float64) / self.frames
+        max_scale = 1.0 + (self.intensity * 0.5)
+        # Pan offsets, expressed like the zoompan chain (relative to the 3.5x framing)
+        pan_distance = w * self.intensity / PAN_FRAMING_SCALE
+
+        if self.zoom_type == 'none':
+            # Pan only: fixed 1/3.5 window moving across the image
+            crop_w = np.full_like(t, w / PAN_FRAMING_SCALE)
+            crop_h = np.full_like(t, h / PAN_FRAMING_SCALE)
+        else:
+            if self.zoom_type == 'zoom_out':
+                zoom = max_scale - (max_scale - 1) * t
+            elif self.zoom_type == 'pulse':
+                pulse_intensity = 0.1 + (self.intensity * 0.1)
+                zoom = 1 + pulse_intensity * np.sin(t * math.pi * 4)
+            else:
+                # zoom_in and ken_burns
+                zoom = 1 + (max_scale - 1) * t
+            # zoompan never zooms out past the full image
+            zoom = np.clip(zoom, 1.0, None)
+            crop_w = w / zoom
+            crop_h = h / zoom
+
+        x = (w - crop_w) / 2
+        y = (h - crop_h) / 2
+
+        if self.zoom_type == 'ken_burns' and self.pan_type == 'none':
+            x = x + np.sin(t * math.pi) * (50 / PAN_FRAMING_SCALE)
+
+        if self.pan_type == 'left':
+            x = x - t * pan_distance
+        elif self.pan_type == 'right':
+            x = x + t * pan_distance
+        elif self.pan_type == 'up':
+            y = y - t * pan_distance
+        elif self.pan_type == 'down':
+            y = y + t * pan_distance
+
+        # Keep the window inside the image, like zoompan and crop do
+        x = np.clip(x, 0, w - crop_w)
+        y = np.clip(y, 0, h - crop_h)
+        return x, y, crop_w, crop_h
+
+    def iter_frames(self, source):
+        """
+        Yield every output frame as raw rgb24 bytes
+
+        Args:
+            source: PIL Image of the composed scene frame
+        """
+        if source.mode != 'RGB':
+            source = source.convert('RGB')
+        if source.size != (self.width, self.height):
+            source = source.resize((self.width, self.height), Image.LANCZOS)
+
+        size = (self.width, self.height)
+        for x, y, crop_w, crop_h in zip(*self.crop_windows()):
+            # Output pixel (u, v) samples source pixel (x + u * sx, y + v * sy)
+            data = (crop_w / self.width, 0, x, 0, crop_h / self.height, y)
+            yield source.transform(size, Image.AFFINE, data, resample=Image.BICUBIC).tobytes()
+
+    def input_args(self):
+        """FFmpeg input arguments for the raw frame pipe"""
+        return [
+            '-f', 'rawvideo',
+            '-pix_fmt', 'rgb24',
+            '-s', f"{self.width}x{self.height}",
+            '-framerate', str(self.fps),
+            '-i', 'pipe:0',
+        ]
+
+    def run(self, source, cmd, log_path):
+        """
+        Run an FFmpeg command whose first input is input_args(), feeding it the rendered frames
+
+        Args:
+            source: PIL Image of the composed scene frame
+            cmd: Full FFmpeg command
+            log_path: File that receives FFmpeg's stderr (a pipe could fill up and block the writer)
+        """
+        with open(log_path, 'w') as log:
+            with ffmpeg_scheduler.popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=log) as process:
+                try:
+                    for frame in self.iter_frames(source):
+                        process.stdin.write(frame)
+                except BrokenPipeError:
+                    # FFmpeg exited early (error or -t reached), its return code tells which
+                    pass
+                finally:
+                    try:
+                        process.stdin.close()
+                    except BrokenPipeError:
+                        pass
+                    returncode = process.wait()
+
+        if returncode != 0:
+            with open(log_path) as log:
+                stderr = log.read()
+            raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
@@ -0,0 +1,118 @@
+"""
+Noise Plates
+Short, seamlessly looped noise clips generated once per resolution/strength and blended over scenes
+(replaces FFmpeg's per-frame noise filter for film grain and glitch)
+"""
+import os
+import sys
+import json
+import hashlib
+import subprocess
+import tempfile
+from pathlib import Path
+
+from services import ffmpeg_scheduler
+
+# NumPy generates the noise (optional, VideoEffects keeps the noise filter without it)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Bump when the noise generation changes, so cached plates are regenerated
+PLATE_VERSION = 1
+
+
+def noise_plates_enabled():
+    """Plates are used unless NOISE_PLATES=0 or NumPy is missing"""
+    return NUMPY_AVAILABLE and os.getenv('NOISE_PLATES', '1').lower() not in ('0', 'false', 'no')
+
+
+class NoisePlates:
+    """Disk cache of FFV1 noise loops, keyed by kind, size, frame rate and strength"""
+
+    def __init__(self, plate_dir=None, seconds=None):
+        """
+        Args:
+            plate_dir: Cache directory (default: NOISE_PLATE_DIR env or <tmp>/video_editor_noise_plates)
+            seconds: Loop length (default: NOISE_PLATE_SECONDS env or 1.0)
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy is required to generate noise plates")
+        if plate_dir is None:
+            plate_dir = os.getenv('NOISE_PLATE_DIR') or Path(tempfile.gettempdir()) / 'video_editor_noise_plates'
+        if seconds is None:
+            seconds = float(os.getenv('NOISE_PLATE_SECONDS', 1.0))
+        self.plate_dir = Path(plate_dir)
+        self.plate_dir.mkdir(parents=True, exist_ok=True)
+        self.seconds = seconds
+
+    def plate(self, kind, width, height, fps, strength):
+        """
+        Get a noise loop, generating it on first use
+
+        The plate is mid-grey (128) plus noise in every plane, so blending it with
+        all_mode=grainmerge adds the noise like noise=alls=<strength>.
+
+        Args:
+            kind: 'gaussian' (like noise=alls=N) or 'uniform' (like noise=alls=N:allf=u)
+            width: Frame width
+            height: Frame height
+            fps: Frame rate
+            strength: noise filter strength (0-100)
+
+        Returns:
+            Path: .mkv plate
+        """
+        frames = max(1, int(round(self.seconds * fps)))
+        params = {'version': PLATE_VERSION, 'kind': kind, 'size': [width, height], 'fps': fps,
+                  'strength': strength, 'frames': frames}
+        key = hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        plate_path = self.plate_dir / f"{kind}_{width}x{height}_{key}.mkv"
+        if plate_path.exists():
+            return plate_path
+
+        print(f"🌫️  Generating {kind} noise plate {width}x{height} ({frames} frames, strength {strength})", file=sys.stderr, flush=True)
+        # Seeded from the parameters, so the same scene always gets the same grain
+        rng = np.random.default_rng(int(key, 16))
+
+        tmp_path = self.plate_dir / f".{plate_path.stem}.{os.getpid()}.tmp.mkv"
+        cmd = [
+            'ffmpeg', '-y',
+            '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'yuv420p',
+            '-s', f"{width}x{height}",
+            '-framerate', str(fps),
+            '-i', 'pipe:0',
+            '-c:v', 'ffv1',
+            '-level', '3',
+            '-slices', '4',
+            str(tmp_path)
+        ]
+        with ffmpeg_scheduler.popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) as process:
+            try:
+                for _ in range(frames):
+                    process.stdin.write(self._frame(rng, kind, width, height, strength))
+            except BrokenPipeError:
+                pass
+            _, stderr = process.communicate()
+        if process.returncode != 0:
+            tmp_path.unlink(missing_ok=True)
+            raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr.decode('utf-8', errors='replace'))
+
+        os.replace(tmp_path, plate_path)
+        return plate_path
+
+    @staticmethod
+    def _frame(rng, kind, width, height, strength):
+        """One yuv420p noise frame (planes Y, U, V)"""
+        size = width * height + 2 * ((width + 1) // 2) * ((height + 1) // 2)
+        if kind == 'uniform':
+            # noise filter 'u': uniform in [-strength/2, strength/2]
+            noise = rng.uniform(-strength / 2, strength / 2, size)
+        else:
+            # noise filter default: gaussian with std strength / sqrt(3)
+            noise = rng.normal(0.0, strength / np.sqrt(3.0), size)
+        return np.clip(np.rint(128 + noise), 0, 255).astype(np.uint8).tobytes()
@@ -15,42 +15,32 @@ class PreviewGenerator:
         self.output_dir.mkdir(exist_ok=True)
         self.translation_service = TranslationService()
 
-    def generate_preview(self, project_id, scenes, tts_voice='de-DE-KatjaNeural', background_music_path=None, background_music_volume=7, target_language='auto', video_speed=1.0, ai_image_model='flux-dev', font_size=30, resolution='preview', temp_export=False):
+    def generate_preview(self, project_id, scenes, tts_voice='de-DE-KatjaNeural', background_music_path=None, background_music_volume=7, target_language='auto', video_speed=1.0, ai_image_model='flux-dev', font_size=30, resolution='preview', temp_export=False, quality=None):
         """
         Generate preview video from scenes using actual video generation
 
         Args:
             temp_export: If True, save to temp_exports directory (for export downloads only)
+            quality: Quality tier ('draft', 'preview', 'final'); default derived from resolution
         """
         if not scenes:
             raise ValueError("No scenes to preview")
 
+        source_scenes = scenes
+
         try:
             # Translate scene scripts if target_language is set (not 'auto')
             if target_language and target_language != 'auto':
-                print(f"\n🌐 Translating {len(scenes)} scenes to {target_language}...")
-
-                # Create a copy of scenes with translated scripts
-                translated_scenes = []
-                for scene in scenes:
-                    scene_copy = dict(scene)  # Copy the scene dict
-                    original_script = scene.get('script', '')
-
-                    if original_script:
-                        translated_script = self.translation_service.translate(original_script, target_language)
-                        scene_copy['script'] = translated_script
-
-                    translated_scenes.append(scene_copy)
+                print(f"\n🌐 Translating scenes to {target_language}...")
 
-                # Use translated scenes for video generation
-                scenes = translated_scenes
-                print("✓ Translation complete\n")
+                # Translated copies are produced as the video generator consumes them (scenes may be a stream)
+                scenes = self._translate_scenes(scenes, target_language)
 
             # Initialize video generator with selected voice
             video_gen = SimpleVideoGenerator(tts_voice=tts_voice)
 
             # Generate actual video file (now returns timing data too)
-            video_path, scene_timings = video_gen.generate_video(scenes, project_id, resolution=resolution, background_music_path=background_music_path, background_music_volume=background_music_volume, video_speed=video_speed, ai_image_model=ai_image_model, font_size=font_size, temp_export=temp_export)
+            video_path, scene_timings = video_gen.generate_video(scenes, project_id, resolution=resolution, background_music_path=background_music_path, background_music_volume=background_music_volume, video_speed=video_speed, ai_image_model=ai_image_model, font_size=font_size, temp_export=temp_export, quality=quality)
 
             # Get video filename for URL
             video_filename = Path(video_path).name
@@ -68,10 +58,18 @@ class PreviewGenerator:
                 'preview_url': f'/api/previews/{video_filename}',
                 '_timestamp': timestamp,  # Add _timestamp field for frontend cache busting
                 'total_duration': total_duration,
-                'scene_count': len(scenes),
+                'scene_count': len(scene_timings),
                 'status': 'ready',
-                'message': f'Preview video generated successfully! ({len(scenes)} scenes, {total_duration:.1f}s)',
-                'scene_timings': scene_timings  # Include timing data for database updates
+                'message': f'Preview video generated successfully! ({len(scene_timings)} scenes, {total_duration:.1f}s)',
+                'scene_timings': scene_timings,  # Include timing data for database updates
+                'scenes_reused': video_gen.render_report['reused'],
+                'scenes_rendered': video_gen.render_report['rendered'],
+                # Scenes left out after an error; a retry re-renders only these (see render_checkpoint)
+                'scenes_failed': video_gen.render_report['failed'],
+                'scene_renders': video_gen.render_report['scenes'],  # Clip fingerprints for incremental previews
+                'render_timings': video_gen.render_report['timings'],  # Seconds and reuse per render graph node kind
+                # WebVTT captions when the text is not burned into the video (PREVIEW_TEXT_LAYER=sidecar)
+                'captions_url': f'/api/previews/{Path(video_gen.captions_path).name}' if video_gen.captions_path else None
             }
 
         except Exception as e:
@@ -79,11 +77,17 @@ class PreviewGenerator:
             print(f"Video generation failed: {e}")
             print("Falling back to JSON manifest...")
 
+            # Lists and SceneStreams can be iterated again; a one-shot iterator is already consumed
+            if iter(source_scenes) is source_scenes:
+                manifest_scenes = []
+            else:
+                manifest_scenes = list(source_scenes)
+
             preview_data = {
                 'project_id': project_id,
                 'created_at': datetime.now().isoformat(),
-                'scenes': scenes,
-                'total_duration': sum(s.get('duration', 5) for s in scenes),
+                'scenes': manifest_scenes,
+                'total_duration': sum(s.get('duration', 5) for s in manifest_scenes),
                 'format': 'preview',
                 'resolution': '540p',
                 'error': str(e)
@@ -100,7 +104,18 @@ class PreviewGenerator:
                 'preview_path': str(preview_path),
                 'preview_url': None,
                 'total_duration': preview_data['total_duration'],
-                'scene_count': len(scenes),
+                'scene_count': len(manifest_scenes),
                 'status': 'error',
                 'message': f'Video generation failed: {str(e)}'
             }
+
+    def _translate_scenes(self, scenes, target_language):
+        """Yield copies of the scenes with translated scripts"""
+        for scene in scenes:
+            scene_copy = dict(scene)  # Copy the scene dict
+            original_script = scene.get('script', '')
+
+            if original_script:
+                scene_copy['script'] = self.translation_service.translate(original_script, target_language)
+
+            yield scene_copy
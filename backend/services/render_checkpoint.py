@@ -0,0 +1,204 @@
+"""
+Render Checkpoint
+Manifest of the finished stage outputs of a render (TTS, frame, scene clip, concat, finish), so a
+retried or resumed render picks up from the last good stage instead of starting from zero
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+
+# Stage outputs a render records, in pipeline order
+CHECKPOINT_STAGES = ('tts', 'frame', 'scene', 'concat', 'finish')
+
+# Bump when the meaning of checkpoint entries changes
+CHECKPOINT_VERSION = 1
+
+MANIFEST_NAME = 'manifest.jsonl'
+
+
+class RenderCheckpoint:
+    """
+    Checkpoint directory of one render job (e.g. one project + resolution)
+
+    Every finished stage output is appended to manifest.jsonl as one JSON line in a single
+    O_APPEND write, so an entry is either fully recorded or not at all, even if the process dies
+    or several worker processes record at once. Threads of one process (prefetchers, render graph)
+    share an instance through a lock. Entries are keyed by content hashes of their inputs, so
+    entries of edited scenes simply stop matching.
+    """
+
+    def __init__(self, job_name, root=None):
+        """
+        Args:
+            job_name: Directory name of the job (e.g. 'project_12_preview')
+            root: Parent directory of all checkpoints (default: RENDER_CHECKPOINT_DIR env or <tmp>/video_editor_checkpoints)
+        """
+        if root is None:
+            root = os.getenv('RENDER_CHECKPOINT_DIR') or Path(tempfile.gettempdir()) / 'video_editor_checkpoints'
+        self.job_name = job_name
+        self.root = Path(root)
+        self.path = self.root / job_name
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.path / MANIFEST_NAME
+        self._loaded_size = 0
+        self._torn = False
+        self._lock = threading.Lock()
+        self.entries = self._load()
+
+    @staticmethod
+    def key(*parts):
+        """Content hash of a stage's inputs"""
+        payload = json.dumps([CHECKPOINT_VERSION, *parts], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+    def _load(self):
+        entries = {}
+        if not self.manifest_path.exists():
+            return entries
+        with open(self.manifest_path, encoding='utf-8') as f:
+            data = f.read()
+        self._loaded_size = len(data.encode('utf-8'))
+        # A process died mid-write: start the next entry on a fresh line
+        self._torn = bool(data) and not data.endswith('\n')
+        for line in data.splitlines():
+            try:
+                entry = json.loads(line)
+                entries[(entry['stage'], entry['key'])] = entry
+            except (ValueError, KeyError):
+                # Torn last line of a process that died mid-write
+                continue
+        return entries
+
+    def _manifest_grew(self):
+        try:
+            return self.manifest_path.stat().st_size != self._loaded_size
+        except FileNotFoundError:
+            return False
+
+    def get(self, stage, key):
+        """
+        Look up a finished stage output
+
+        Returns:
+            dict: The entry (path, recorded metadata) or None if missing or its file is gone
+        """
+        with self._lock:
+            entry = self.entries.get((stage, key))
+            if entry is None and self._manifest_grew():
+                # Recorded by another process of this job (scene renderer workers)
+                self.entries = self._load()
+                entry = self.entries.get((stage, key))
+        if entry is None:
+            return None
+        if entry.get('path') and not os.path.exists(entry['path']):
+            return None
+        return entry
+
+    def put(self, stage, key, path=None, copy=True, **meta):
+        """
+        Record a finished stage output
+
+        Args:
+            stage: One of CHECKPOINT_STAGES
+            key: Result of key() over the stage's inputs
+            path: Output file
+            copy: Keep the file inside the checkpoint (hard link, copy across filesystems); False only
+                  references it (for files that already live in a persistent cache)
+            **meta: JSON-serialisable values needed to resume (durations, timings)
+
+        Returns:
+            dict: The recorded entry
+        """
+        if stage not in CHECKPOINT_STAGES:
+            raise ValueError(f"Unknown checkpoint stage: {stage}")
+
+        # Another render of this job may have completed and cleared the directory meanwhile
+        self.path.mkdir(parents=True, exist_ok=True)
+        if path is not None and copy:
+            stored_path = self.path / f"{stage}_{key}{Path(path).suffix}"
+            # Unique per call: two threads may record the same key at once (identical scene scripts)
+            tmp_path = self.path / f".{stage}_{key}.{uuid.uuid4().hex}.tmp"
+            try:
+                os.link(path, tmp_path)
+            except OSError:
+                shutil.copy(path, tmp_path)
+            os.replace(tmp_path, stored_path)
+            # rename() is a no-op if both names already link the same file (same key recorded twice)
+            tmp_path.unlink(missing_ok=True)
+            path = stored_path
+
+        entry = dict(meta, stage=stage, key=key, path=str(path) if path is not None else None, created_at=time.time())
+        line = (json.dumps(entry, default=str) + '\n').encode('utf-8')
+        with self._lock:
+            if self._torn:
+                line = b'\n' + line
+                self._torn = False
+            fd = os.open(self.manifest_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                os.fsync(fd)
+                end = os.lseek(fd, 0, os.SEEK_CUR)
+            finally:
+                os.close(fd)
+
+            self.entries[(stage, key)] = entry
+            # Nothing else was appended since the last load, so no reload is needed for this entry
+            if end - len(line) == self._loaded_size:
+                self._loaded_size = end
+        return entry
+
+    def summary(self):
+        """Number of recorded entries per stage"""
+        counts = {stage: 0 for stage in CHECKPOINT_STAGES}
+        with self._lock:
+            entries = list(self.entries)
+        for stage, _ in entries:
+            counts[stage] = counts.get(stage, 0) + 1
+        return counts
+
+    def clear(self):
+        """Delete the checkpoint after a complete render (referenced cache files are kept)"""
+        try:
+            shutil.rmtree(self.path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Checkpoint cleanup warning: {e}", file=sys.stderr, flush=True)
+        with self._lock:
+            self.entries = {}
+            self._loaded_size = 0
+            self._torn = False
+
+    @staticmethod
+    def prune(root=None, max_age_hours=None):
+        """
+        Delete checkpoints of renders that were never resumed
+
+        Args:
+            root: Checkpoint root (default: RENDER_CHECKPOINT_DIR env or <tmp>/video_editor_checkpoints)
+            max_age_hours: Age of the last recorded entry (default: RENDER_CHECKPOINT_MAX_AGE_HOURS env or 24)
+        """
+        if root is None:
+            root = os.getenv('RENDER_CHECKPOINT_DIR') or Path(tempfile.gettempdir()) / 'video_editor_checkpoints'
+        if max_age_hours is None:
+            max_age_hours = float(os.getenv('RENDER_CHECKPOINT_MAX_AGE_HOURS', 24))
+        root = Path(root)
+        if not root.is_dir():
+            return
+
+        cutoff = time.time() - max_age_hours * 3600
+        for job_dir in root.iterdir():
+            manifest_path = job_dir / MANIFEST_NAME
+            try:
+                last_write = manifest_path.stat().st_mtime if manifest_path.exists() else job_dir.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if job_dir.is_dir() and last_write < cutoff:
+                shutil.rmtree(job_dir, ignore_errors=True)
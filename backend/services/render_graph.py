@@ -0,0 +1,197 @@
+"""
+Render Graph
+Declarative render DAG: every node (TTS audio, SFX mix, background image, text frame, scene encode,
+concat, speed, music mix, upload) has a content hash of its inputs, and one executor runs independent
+nodes in parallel, skips nodes whose outputs already exist and records per-node timings
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Bump when node implementations change in a way that alters outputs for the same inputs
+GRAPH_VERSION = 1
+
+
+def file_signature(path):
+    """Size + mtime of an input file (None if missing), so replaced media changes the node key"""
+    if isinstance(path, (str, os.PathLike)) and path and os.path.isfile(path):
+        stat = os.stat(path)
+        return [str(path), stat.st_size, int(stat.st_mtime)]
+    return None
+
+
+class RenderNode:
+    """One step of a render with its inputs, dependencies and how to reuse an existing output"""
+
+    def __init__(self, name, kind, run, deps=(), inputs=None, lookup=None, record=None):
+        """
+        Args:
+            name: Unique name within the graph (e.g. 'tts_3')
+            kind: Node type the timings are grouped by (e.g. 'tts', 'encode')
+            run: Callable receiving the dependency results in order, returns the node result
+            deps: RenderNodes whose results run() needs
+            inputs: JSON-serialisable values that determine the output (hashed into key)
+            lookup: Callable (key) -> existing result or None (persistent caches, checkpoints)
+            record: Callable (key, result) storing a fresh result for later lookups
+        """
+        self.name = name
+        self.kind = kind
+        self.run = run
+        self.deps = list(deps)
+        self.inputs = inputs or {}
+        self.lookup = lookup
+        self.record = record
+        self._key = None
+
+    @property
+    def key(self):
+        """Content hash of the node's inputs and of its dependencies' keys"""
+        if self._key is None:
+            payload = json.dumps(
+                [GRAPH_VERSION, self.kind, self.inputs, [dep.key for dep in self.deps]],
+                sort_keys=True, default=str
+            )
+            self._key = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+        return self._key
+
+
+class RenderGraph:
+    """A set of RenderNodes and the memoizing executor that runs them"""
+
+    def __init__(self, memo=None, max_workers=None):
+        """
+        Args:
+            memo: Dict of node key -> result shared between graphs (identical nodes run once)
+            max_workers: Nodes run at once (default: RENDER_GRAPH_WORKERS env or 4); nodes mostly wait on
+                         FFmpeg processes or network APIs, so threads suffice
+        """
+        self.nodes = []
+        self.memo = memo if memo is not None else {}
+        if max_workers is None:
+            max_workers = int(os.getenv('RENDER_GRAPH_WORKERS', 4))
+        self.max_workers = max(1, max_workers)
+        self.timings = []
+
+    def add(self, name, kind, run, deps=(), inputs=None, lookup=None, record=None):
+        """Add a node (dependencies must already be in the graph) and return it"""
+        node = RenderNode(name, kind, run, deps, inputs, lookup, record)
+        self.nodes.append(node)
+        return node
+
+    def _reuse(self, node):
+        """Existing result of a node, or None if it has to run"""
+        if node.key in self.memo:
+            return self.memo[node.key], 'memo'
+        if node.lookup:
+            result = node.lookup(node.key)
+            if result is not None:
+                return result, 'cached'
+        return None, None
+
+    def _execute(self, node, dep_results):
+        start = time.perf_counter()
+        result = node.run(*dep_results)
+        if node.record:
+            try:
+                node.record(node.key, result)
+            except Exception as e:
+                print(f"   ⚠️ Could not record {node.name}: {e}", file=sys.stderr, flush=True)
+        return result, time.perf_counter() - start
+
+    def run(self, targets=None):
+        """
+        Run the nodes needed for targets (default: all sinks), independent nodes in parallel
+
+        Reuse is checked top-down: a node whose output already exists is not run and neither are
+        the dependencies only it needed (its key is known from the dependency keys alone).
+
+        Returns:
+            dict: node name -> result
+
+        Raises:
+            The first exception a node raised (its dependents do not run)
+        """
+        needed = []
+        seen = []
+        results = {}
+
+        def collect(node):
+            if any(node is other for other in seen):
+                return
+            seen.append(node)
+            result, status = self._reuse(node)
+            if status:
+                results[id(node)] = result
+                self.timings.append({'name': node.name, 'kind': node.kind, 'key': node.key,
+                                     'seconds': 0.0, 'status': status})
+                return
+            for dep in node.deps:
+                collect(dep)
+            needed.append(node)
+
+        if targets is None:
+            # Sinks: nodes no other node depends on
+            targets = [node for node in self.nodes
+                       if not any(node is dep for other in self.nodes for dep in other.deps)]
+        for node in targets:
+            collect(node)
+
+        remaining = list(needed)
+        running = {}
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while remaining or running:
+                if error is None:
+                    for node in [n for n in remaining if all(id(dep) in results for dep in n.deps)]:
+                        remaining.remove(node)
+                        running[pool.submit(self._execute, node, [results[id(dep)] for dep in node.deps])] = node
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    try:
+                        result, seconds = future.result()
+                    except Exception as e:
+                        self.timings.append({'name': node.name, 'kind': node.kind, 'key': node.key,
+                                             'seconds': 0.0, 'status': 'failed'})
+                        error = error or e
+                        continue
+                    results[id(node)] = result
+                    self.memo[node.key] = result
+                    self.timings.append({'name': node.name, 'kind': node.kind, 'key': node.key,
+                                         'seconds': seconds, 'status': 'ran'})
+
+        if error is not None:
+            raise error
+        return {node.name: results[id(node)] for node in seen if id(node) in results}
+
+    def summary(self):
+        """Per-kind totals of the recorded timings"""
+        return summarize_timings(self.timings)
+
+
+def summarize_timings(timings):
+    """
+    Group node timings by kind
+
+    Returns:
+        dict: kind -> {'ran', 'reused', 'failed', 'seconds'}
+    """
+    summary = {}
+    for timing in timings:
+        entry = summary.setdefault(timing['kind'], {'ran': 0, 'reused': 0, 'failed': 0, 'seconds': 0.0})
+        if timing['status'] == 'ran':
+            entry['ran'] += 1
+        elif timing['status'] == 'failed':
+            entry['failed'] += 1
+        else:
+            entry['reused'] += 1
+        entry['seconds'] = round(entry['seconds'] + timing['seconds'], 3)
+    return summary
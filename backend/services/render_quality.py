@@ -0,0 +1,61 @@
+"""
+Render Quality Tiers
+Named encoder/resolution presets for scene encodes (draft / preview / final)
+"""
+
+# supersample: upper bound for the zoompan upscale factor (the actual factor follows the zoom range)
+QUALITY_TIERS = {
+    # Pacing checks: tiny, low frame rate, fastest encoder settings
+    'draft': {
+        'width': 360,
+        'height': 640,
+        'fps': 15,
+        'preset': 'ultrafast',
+        'crf': 30,
+        'supersample': 1.5,
+    },
+    # Editor previews
+    'preview': {
+        'width': 608,
+        'height': 1080,
+        'fps': 30,
+        'preset': 'veryfast',
+        'crf': 23,
+        'supersample': 2.5,
+    },
+    # 1080x1920 exports
+    'final': {
+        'width': 1080,
+        'height': 1920,
+        'fps': 30,
+        'preset': 'medium',
+        'crf': 23,
+        'supersample': 3.5,
+    },
+}
+
+# Tier used when no quality is requested, by resolution name
+RESOLUTION_TIERS = {
+    'preview': 'preview',
+    '1080p': 'final',
+}
+
+
+def get_quality_tier(quality=None, resolution='preview'):
+    """
+    Resolve the quality tier for a render request
+
+    Args:
+        quality: Tier name ('draft', 'preview', 'final') or None
+        resolution: Resolution name used when no quality is given ('preview' maps to the preview tier)
+
+    Returns:
+        dict: Tier settings including its 'name'
+    """
+    if quality is None:
+        quality = RESOLUTION_TIERS.get(resolution, 'final')
+
+    if quality not in QUALITY_TIERS:
+        raise ValueError(f"Unknown quality tier: '{quality}' (available: {', '.join(QUALITY_TIERS)})")
+
+    return dict(QUALITY_TIERS[quality], name=quality)
@@ -0,0 +1,151 @@
+"""
+Render Workspace Manager
+Gives every render job its own scratch directory (optionally RAM-backed, spilling to disk when the
+shared RAM budget runs out)
+"""
+import os
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+
+# Shared parent directory for all job workspaces on disk
+DISK_ROOT = Path(tempfile.gettempdir()) / "video_editor_simple"
+
+# Rough size of an encoded scene clip: H.264 bits per output pixel and frame at the tier CRFs
+# (mostly still or slowly moving content, ~3 Mbit/s at 1080x1920) plus the AAC track
+CLIP_BITS_PER_PIXEL = 0.05
+AUDIO_BYTES_PER_SECOND = 192000 // 8
+
+
+def estimate_clip_bytes(width, height, fps, seconds):
+    """Estimated size of a scene clip of the given geometry and length"""
+    return int(seconds * (width * height * fps * CLIP_BITS_PER_PIXEL / 8 + AUDIO_BYTES_PER_SECOND))
+
+
+class RenderWorkspace:
+    """
+    Isolated scratch directory for one render job, cleaned up only by that job
+
+    A RAM workspace is re-checked against the budget before every render stage (reserve()); once
+    the next stage no longer fits, new files go to a disk directory of the same job, files already
+    in RAM stay where they are.
+    """
+
+    def __init__(self, job_name, use_ram=None, ram_budget_bytes=None, reserve_bytes=0):
+        """
+        Args:
+            job_name: Readable prefix for the workspace directory (e.g. 'project_12')
+            use_ram: Put intermediates on a tmpfs like /dev/shm (default: RENDER_RAM_SCRATCH env)
+            ram_budget_bytes: Max bytes all jobs may use on the tmpfs (default: RENDER_RAM_BUDGET_MB env or 512 MB)
+            reserve_bytes: Estimated bytes of the first render stage; falls back to disk if it does not fit the budget
+        """
+        if use_ram is None:
+            use_ram = os.getenv('RENDER_RAM_SCRATCH', '').lower() in ('1', 'true', 'yes')
+        if ram_budget_bytes is None:
+            ram_budget_bytes = int(float(os.getenv('RENDER_RAM_BUDGET_MB', 512)) * 1024 * 1024)
+
+        self.job_name = job_name
+        self.ram_budget_bytes = ram_budget_bytes
+        self.ram_root = Path(os.getenv('RENDER_RAM_DIR', '/dev/shm')) / "video_editor_simple"
+        self.in_ram = False
+        root = DISK_ROOT
+
+        if use_ram:
+            if self._ram_fits(self.ram_root, ram_budget_bytes, reserve_bytes):
+                root = self.ram_root
+                self.in_ram = True
+            else:
+                print("⚠️ RAM scratch budget exceeded, using disk workspace", file=sys.stderr, flush=True)
+
+        self.path = self._create(root)
+        # Every directory of this job (RAM and, after a spill, disk)
+        self.paths = [self.path]
+        print(f"📂 Render workspace: {self.path}{' (RAM)' if self.in_ram else ''}", file=sys.stderr, flush=True)
+
+    def _create(self, root):
+        root.mkdir(parents=True, exist_ok=True)
+        self._remove_stale(root)
+        # pid in the name lets later jobs detect workspaces of dead processes
+        return Path(tempfile.mkdtemp(prefix=f"{self.job_name}-{os.getpid()}-", dir=root))
+
+    def reserve(self, expected_bytes):
+        """
+        Directory for the next render stage's files
+
+        A RAM workspace checks the shared budget (actual usage of all jobs on the tmpfs) and the
+        free tmpfs space again; if expected_bytes no longer fit, the job spills to disk for good.
+
+        Returns:
+            Path: Directory new files should be written to
+        """
+        if self.in_ram and not self._ram_fits(self.ram_root, self.ram_budget_bytes, expected_bytes):
+            self.in_ram = False
+            self.path = self._create(DISK_ROOT)
+            self.paths.append(self.path)
+            print(f"⚠️ RAM scratch budget reached, spilling to disk workspace {self.path}", file=sys.stderr, flush=True)
+        return self.path
+
+    def owns(self, path):
+        """Check if a file lives in one of this job's directories"""
+        path = Path(path).resolve()
+        return any(directory.resolve() in path.parents for directory in self.paths)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+        return False
+
+    def cleanup(self):
+        """Delete this job's workspace (never touches other jobs)"""
+        for path in self.paths:
+            try:
+                if path.exists():
+                    shutil.rmtree(path)
+                    print(f"🧹 Cleaned up workspace {path}", file=sys.stderr, flush=True)
+            except Exception as e:
+                print(f"⚠️ Workspace cleanup warning: {e}", file=sys.stderr, flush=True)
+
+    @staticmethod
+    def _dir_size(path):
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for name in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, name))
+                except OSError:
+                    continue
+        return total
+
+    @classmethod
+    def _ram_fits(cls, ram_root, budget_bytes, reserve_bytes):
+        """Check that the tmpfs exists and this job fits into the shared byte budget"""
+        if not ram_root.parent.is_dir() or not os.access(ram_root.parent, os.W_OK):
+            return False
+
+        used = cls._dir_size(ram_root) if ram_root.exists() else 0
+        free = shutil.disk_usage(ram_root.parent).free
+        return used + reserve_bytes <= budget_bytes and reserve_bytes < free
+
+    @staticmethod
+    def _remove_stale(root):
+        """Remove workspaces left behind by processes that no longer exist"""
+        for job_dir in root.iterdir():
+            if not job_dir.is_dir():
+                continue
+            parts = job_dir.name.split('-')
+            try:
+                pid = int(parts[-2])
+            except (IndexError, ValueError):
+                continue
+            if pid == os.getpid():
+                continue
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                shutil.rmtree(job_dir, ignore_errors=True)
+            except PermissionError:
+                # Process exists but belongs to another user
+                continue
@@ -0,0 +1,227 @@
+"""
+Scene Clip Cache
+Content-addressed store for rendered scene clips, so unchanged scenes are never re-encoded
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import shutil
+import tempfile
+from pathlib import Path
+
+# Bump when the scene render pipeline changes in a way that alters output for the same inputs
+CACHE_VERSION = 11
+
+# Scene fields that affect a scene's rendered clip (besides all effect_* fields)
+SCENE_FINGERPRINT_FIELDS = [
+    'script', 'background_type', 'background_value',
+    'sound_effect_path', 'sound_effect_volume', 'sound_effect_offset',
+    # Transition windows change where the clip's keyframes are forced
+    'transition_in', 'transition_out',
+]
+
+
+def _file_signature(path):
+    """[size, mtime] of an existing file, None for anything else"""
+    if isinstance(path, str) and path and os.path.isfile(path):
+        stat = os.stat(path)
+        return [stat.st_size, int(stat.st_mtime)]
+    return None
+
+
+def _is_generated_image(path, keyword, width, height, ai_image_model):
+    """Whether path is the image cache file ReplicateImageService generates for these parameters"""
+    # Same naming as ReplicateImageService._get_cache_key (the service falls back to flux-dev)
+    key_string = f"{keyword}_{width}_{height}_{ai_image_model or 'flux-dev'}"
+    return Path(str(path)).name == f"{hashlib.md5(key_string.encode()).hexdigest()}.jpg"
+
+
+class SceneClipCache:
+    """Persistent scene clip cache keyed by a fingerprint of everything that affects a scene's output"""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """
+        Args:
+            cache_dir: Cache directory (default: SCENE_CACHE_DIR env or <tmp>/video_editor_scene_cache)
+            max_bytes: Size limit before least recently used clips are evicted (default: SCENE_CACHE_MAX_MB env or 2048 MB)
+        """
+        if cache_dir is None:
+            cache_dir = os.getenv('SCENE_CACHE_DIR') or Path(tempfile.gettempdir()) / 'video_editor_scene_cache'
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('SCENE_CACHE_MAX_MB', 2048)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def fingerprint(scene, tts_voice, width, height, ai_image_model='flux-dev', font_size=80, extra=None):
+        """
+        Build the cache key for a scene
+
+        Args:
+            scene: Scene dict
+            tts_voice: Voice used for TTS
+            width: Video width
+            height: Video height
+            extra: Optional dict of additional render settings that affect the output
+
+        Returns:
+            str: Hex digest identifying the scene's rendered output
+        """
+        data = {
+            'version': CACHE_VERSION,
+            'voice': tts_voice,
+            'resolution': [width, height],
+            'ai_image_model': ai_image_model,
+            'font_size': font_size,
+            'extra': extra or {},
+        }
+        for field in SCENE_FINGERPRINT_FIELDS:
+            data[field] = scene.get(field)
+        for key in sorted(scene):
+            if key.startswith('effect_'):
+                data[key] = scene[key]
+
+        # Include size + mtime of referenced files so replaced media invalidates the clip
+        files = {}
+        for field in ('background_value', 'sound_effect_path'):
+            signature = _file_signature(scene.get(field))
+            if signature:
+                files[field] = signature
+        # Only keyword scenes render image_path. The image the render generates and saves back to the
+        # scene is already identified by keyword, model and size, so only a different image counts.
+        image_path = scene.get('image_path')
+        if scene.get('background_type') == 'keyword' and image_path and \
+                not _is_generated_image(image_path, scene.get('background_value'), width, height, ai_image_model):
+            signature = _file_signature(image_path)
+            if signature:
+                files['image_path'] = [str(image_path)] + signature
+        data['files'] = files
+
+        payload = json.dumps(data, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _clip_path(self, key):
+        return self.cache_dir / f"{key}.mp4"
+
+    def _meta_path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key):
+        """
+        Look up a cached clip
+
+        Returns:
+            tuple: (clip_path, duration) or None on a miss
+        """
+        clip_path = self._clip_path(key)
+        meta_path = self._meta_path(key)
+        if not clip_path.exists() or not meta_path.exists():
+            return None
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            # Touch so pruning evicts least recently used clips first
+            os.utime(clip_path, None)
+            return clip_path, float(meta['duration'])
+        except Exception as e:
+            print(f"⚠️ Scene cache entry {key[:12]} unreadable: {e}", file=sys.stderr, flush=True)
+            return None
+
+    def put(self, key, video_path, duration):
+        """
+        Store a rendered clip in the cache
+
+        Returns:
+            Path: Location of the cached clip
+        """
+        clip_path = self._clip_path(key)
+        meta_path = self._meta_path(key)
+
+        # Write to temp names and rename, so concurrent renders never see partial files
+        tmp_clip = self.cache_dir / f".{key}.{os.getpid()}.mp4.tmp"
+        shutil.copy(video_path, tmp_clip)
+        os.replace(tmp_clip, clip_path)
+
+        tmp_meta = self.cache_dir / f".{key}.{os.getpid()}.json.tmp"
+        with open(tmp_meta, 'w') as f:
+            json.dump({'duration': duration, 'created_at': time.time()}, f)
+        os.replace(tmp_meta, meta_path)
+
+        return clip_path
+
+    def _cached_key(self, path):
+        """Cache key of a clip path inside this cache, None for other files"""
+        path = Path(path)
+        if path.suffix == '.mp4' and path.parent.resolve() == self.cache_dir.resolve():
+            return path.stem
+        return None
+
+    def segment_infos(self, paths):
+        """
+        Segment probe results recorded for the cached clips among paths (see SegmentFormat.probe)
+
+        Returns:
+            dict: path -> probe info, for the clips probed before
+        """
+        infos = {}
+        for path in paths:
+            key = self._cached_key(path)
+            if not key:
+                continue
+            try:
+                with open(self._meta_path(key)) as f:
+                    info = json.load(f).get('segment')
+            except (OSError, ValueError):
+                continue
+            if info:
+                infos[str(path)] = info
+        return infos
+
+    def record_segment_infos(self, infos):
+        """Store probe results of cached clips, so the pre-concat checker skips them next time"""
+        for path, info in infos.items():
+            key = self._cached_key(path)
+            if not key:
+                continue
+            meta_path = self._meta_path(key)
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                meta['segment'] = info
+                tmp_meta = self.cache_dir / f".{key}.{os.getpid()}.json.tmp"
+                with open(tmp_meta, 'w') as f:
+                    json.dump(meta, f)
+                os.replace(tmp_meta, meta_path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Scene cache entry {key[:12]} not updated: {e}", file=sys.stderr, flush=True)
+
+    def prune(self):
+        """Evict least recently used clips until the cache fits into max_bytes"""
+        clips = []
+        total = 0
+        for clip_path in self.cache_dir.glob('*.mp4'):
+            try:
+                stat = clip_path.stat()
+            except FileNotFoundError:
+                continue
+            clips.append((stat.st_mtime, stat.st_size, clip_path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        removed = 0
+        for _, size, clip_path in sorted(clips):
+            if total <= self.max_bytes:
+                break
+            clip_path.unlink(missing_ok=True)
+            clip_path.with_suffix('.json').unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        print(f"🧹 Scene cache pruned {removed} clips ({total / 1024 / 1024:.0f} MB left)", file=sys.stderr, flush=True)
@@ -0,0 +1,140 @@
+"""
+Scene Renderer
+Renders scene clips in parallel using a process pool
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+from services.ffmpeg_scheduler import default_workers
+
+# Generator instance owned by each pool worker process (set by _init_worker)
+_worker_generator = None
+
+
+def _init_worker(tts_voice, temp_dir, checkpoint_job=None, checkpoint_root=None):
+    """Create one SimpleVideoGenerator per worker process"""
+    global _worker_generator
+    # Imported here to avoid a circular import with simple_video_generator
+    from services.simple_video_generator import SimpleVideoGenerator
+    from services.render_checkpoint import RenderCheckpoint
+    _worker_generator = SimpleVideoGenerator(tts_voice=tts_voice)
+    _worker_generator.temp_dir = Path(temp_dir)
+    _worker_generator.temp_dir.mkdir(parents=True, exist_ok=True)
+    if checkpoint_job:
+        _worker_generator.checkpoint = RenderCheckpoint(checkpoint_job, checkpoint_root)
+
+
+def _warm_up():
+    """No-op task: makes the pool start its worker processes"""
+    return os.getpid()
+
+
+def _render_scene(scene, width, height, idx, ai_image_model, font_size, quality_tier):
+    """Render one scene inside a worker process (must be a module-level function to be picklable)"""
+    _worker_generator.scene_node_timings = []
+    try:
+        scene_video, actual_duration = _worker_generator._create_scene_video(
+            scene, width, height, idx, ai_image_model, font_size, quality_tier
+        )
+    except Exception as e:
+        # Timings of the nodes that ran before the failure travel with the exception
+        e.node_timings = _worker_generator.scene_node_timings
+        raise
+    return str(scene_video), actual_duration, _worker_generator.scene_node_timings
+
+
+class SceneRenderer:
+    """Runs SimpleVideoGenerator._create_scene_video for many scenes at once"""
+
+    def __init__(self, generator, max_workers=None):
+        """
+        Args:
+            generator: SimpleVideoGenerator whose voice, temp_dir and checkpoint the workers use
+            max_workers: Number of worker processes (default: SCENE_RENDER_WORKERS env or the FFMPEG_SLOTS count)
+        """
+        self.generator = generator
+        if max_workers is None:
+            max_workers = int(os.getenv('SCENE_RENDER_WORKERS', default_workers()))
+        self.max_workers = max(1, max_workers)
+        # Render graph node timings of all scenes rendered so far (see render_graph)
+        self.node_timings = []
+
+    def render(self, jobs, width, height, ai_image_model='flux-dev', font_size=80, quality_tier=None, prefetcher=None):
+        """
+        Render scenes and return results keyed by scene index
+
+        Scenes are handed to the workers one at a time as workers become free, so with a prefetcher
+        the next scenes' assets are fetched while the current ones encode.
+
+        Args:
+            jobs: List of (idx, scene) tuples
+            width: Video width
+            height: Video height
+            quality_tier: Quality tier dict (see render_quality)
+            prefetcher: AssetPrefetcher fetching TTS/images ahead of the encodes (see asset_prefetch)
+
+        Returns:
+            dict: idx -> (video_path, actual_duration) or the Exception raised for that scene
+        """
+        results = {}
+        workers = min(self.max_workers, len(jobs))
+
+        # Single worker: render inline, no pool startup cost
+        if workers <= 1:
+            queue = prefetcher.iterate(jobs) if prefetcher else iter(jobs)
+            for idx, scene in queue:
+                self.generator.scene_node_timings = []
+                try:
+                    results[idx] = self.generator._create_scene_video(
+                        scene, width, height, idx, ai_image_model, font_size, quality_tier
+                    )
+                except Exception as e:
+                    results[idx] = e
+                self.node_timings.extend(self.generator.scene_node_timings)
+            return results
+
+        print(f"⚙️  Rendering {len(jobs)} scenes with {workers} worker processes", file=sys.stderr, flush=True)
+
+        checkpoint = self.generator.checkpoint
+        checkpoint_args = (checkpoint.job_name, str(checkpoint.root)) if checkpoint else ()
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.generator.tts_voice, str(self.generator.temp_dir), *checkpoint_args)
+        ) as pool:
+            # Fork the workers before the prefetch threads start: a child forked while another
+            # thread holds a lock (HTTP pool, logging, checkpoint) can deadlock on it
+            pool.submit(_warm_up).result()
+            queue = prefetcher.iterate(jobs) if prefetcher else iter(jobs)
+            futures = {}
+
+            def submit_next():
+                job = next(queue, None)
+                if job is not None:
+                    idx, scene = job
+                    futures[pool.submit(_render_scene, scene, width, height, idx, ai_image_model, font_size, quality_tier)] = idx
+
+            for _ in range(workers):
+                submit_next()
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = futures.pop(future)
+                    submit_next()
+                    self._collect(results, idx, future)
+
+        return results
+
+    def _collect(self, results, idx, future):
+        """Store a worker's result (or exception) and its node timings"""
+        try:
+            video_path, actual_duration, node_timings = future.result()
+            results[idx] = (Path(video_path), actual_duration)
+            self.node_timings.extend(node_timings)
+        except Exception as e:
+            results[idx] = e
+            self.node_timings.extend(getattr(e, 'node_timings', []))
@@ -0,0 +1,260 @@
+"""
+Segment Format
+One output format for every scene segment (geometry, SAR, pixel format, frame rate, timebase, GOP, audio),
+plus a pre-concat checker that repairs stray segments, so the final concat is always a stream copy
+"""
+import sys
+import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from services import ffmpeg_scheduler
+
+# MP4 track timescale for every segment (divisible by all tier frame rates)
+SEGMENT_TIMESCALE = 90000
+
+# Keyframe interval in seconds
+SEGMENT_GOP_SECONDS = 2
+
+# Packets the checker demuxes to find the first video packet
+PROBE_PACKETS = 100
+
+AUDIO_SAMPLE_RATE = 44100
+AUDIO_CHANNELS = 2
+
+
+def audio_args():
+    """Audio encoder arguments shared by every segment"""
+    return [
+        '-c:a', 'aac',
+        '-b:a', '192k',
+        '-ar', str(AUDIO_SAMPLE_RATE),  # Force 44.1kHz sample rate for all scenes
+        '-ac', str(AUDIO_CHANNELS),     # Force stereo for all scenes
+    ]
+
+
+class SegmentFormat:
+    """Target format of the scene segments of one render job"""
+
+    def __init__(self, width, height, quality_tier):
+        """
+        Args:
+            width: Output width
+            height: Output height
+            quality_tier: Quality tier dict (see render_quality), provides fps/preset/crf
+        """
+        self.width = width
+        self.height = height
+        self.tier = quality_tier
+        self.fps = quality_tier['fps']
+
+    def video_filter(self, input_size=None):
+        """
+        Filter chain appended to every scene's effects: fit into the output frame
+        (letterboxed if an effect changed the aspect), square pixels, constant frame rate, yuv420p
+
+        Args:
+            input_size: (width, height) the chain before it is known to output (see EffectGraph.output_size);
+                        at the target size the scale/pad pass is left out
+        """
+        w, h = self.width, self.height
+        if input_size is not None and tuple(input_size) == (w, h):
+            return f"setsar=1,fps={self.fps},format=yuv420p"
+        return (
+            f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+            f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,"
+            f"setsar=1,"
+            f"fps={self.fps},"
+            f"format=yuv420p"
+        )
+
+    def encode_args(self, gop=None):
+        """
+        Video encoder arguments
+
+        Args:
+            gop: Keyframe interval in frames (default: SEGMENT_GOP_SECONDS)
+        """
+        options = self.encoder_options(gop)
+        return [
+            '-c:v', 'libx264',
+            '-preset', options['preset'],
+            '-crf', options['crf'],
+            '-pix_fmt', 'yuv420p',
+            '-g', options['g'],
+            *self.mux_args(),
+        ]
+
+    def encoder_options(self, gop=None):
+        """libx264 options as an AVOption dict (for in-process encoders)"""
+        if gop is None:
+            gop = int(self.fps * SEGMENT_GOP_SECONDS)
+        return {
+            'preset': self.tier['preset'],
+            'crf': str(self.tier['crf']),
+            'g': str(gop),
+        }
+
+    @staticmethod
+    def mux_args():
+        """Muxer arguments (also needed for stream-copied segments)"""
+        return ['-video_track_timescale', str(SEGMENT_TIMESCALE)]
+
+    def expected(self):
+        """Stream properties every segment must have"""
+        return {
+            'video_codec': 'h264',
+            'width': self.width,
+            'height': self.height,
+            'pix_fmt': 'yuv420p',
+            'sar': '1:1',
+            'frame_rate': f"{self.fps}/1",
+            'time_base': f"1/{SEGMENT_TIMESCALE}",
+            'audio_codec': 'aac',
+            'sample_rate': AUDIO_SAMPLE_RATE,
+            'channels': AUDIO_CHANNELS,
+        }
+
+    @staticmethod
+    def probe(path):
+        """
+        Read the stream properties compared by the checker: stream headers and whether the first video
+        packet is a keyframe (a stream-copy concat can only cut there), in one ffprobe call
+        """
+        cmd = [
+            'ffprobe', '-v', 'error',
+            # Demux only the start of the file (audio packets come first in some interleavings)
+            '-read_intervals', f"%+#{PROBE_PACKETS}",
+            '-show_entries',
+            'stream=index,codec_type,codec_name,profile,width,height,pix_fmt,sample_aspect_ratio,'
+            'r_frame_rate,time_base,sample_rate,channels:packet=stream_index,flags',
+            '-of', 'json',
+            str(path)
+        ]
+        result = ffmpeg_scheduler.run(cmd, capture_output=True, text=True, check=True)
+        output = json.loads(result.stdout)
+        streams = output.get('streams', [])
+        video = next((s for s in streams if s.get('codec_type') == 'video'), {})
+        audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+        first_packet = next((p for p in output.get('packets', []) if video and p.get('stream_index') == video.get('index')), None)
+
+        sar = video.get('sample_aspect_ratio')
+        info = {
+            'video_codec': video.get('codec_name'),
+            'profile': video.get('profile'),
+            'width': video.get('width'),
+            'height': video.get('height'),
+            'pix_fmt': video.get('pix_fmt'),
+            # Unset SAR means square pixels
+            'sar': sar if sar and sar not in ('0:1', 'N/A') else '1:1',
+            'frame_rate': video.get('r_frame_rate'),
+            'time_base': video.get('time_base'),
+            'has_audio': audio is not None,
+            'starts_with_keyframe': bool(first_packet) and 'K' in first_packet.get('flags', ''),
+        }
+        if audio:
+            info.update({
+                'audio_codec': audio.get('codec_name'),
+                'sample_rate': int(audio.get('sample_rate') or 0),
+                'channels': audio.get('channels'),
+            })
+        return info
+
+    def mismatches(self, info, profile=None):
+        """
+        Fields of a probed segment that differ from the target format
+
+        Args:
+            info: Result of probe()
+            profile: H.264 profile the other segments use (x264 picks it from the preset)
+
+        Returns:
+            list: Mismatching field names ('audio' if the segment has no audio stream, 'keyframe' if it
+                  does not start on a keyframe)
+        """
+        expected = self.expected()
+        fields = [key for key, value in expected.items()
+                  if info.get('has_audio') or not key.startswith(('audio', 'sample', 'channels'))]
+        bad = [key for key in fields if info.get(key) != expected[key]]
+        if not info.get('has_audio'):
+            bad.append('audio')
+        if profile and info.get('profile') != profile:
+            bad.append('profile')
+        if info.get('starts_with_keyframe') is False:
+            bad.append('keyframe')
+        return bad
+
+    def repair(self, path, output_path, mismatched):
+        """
+        Rewrite one segment into the target format (only the streams that need it are re-encoded)
+
+        Args:
+            path: Segment to repair
+            output_path: Repaired segment
+            mismatched: Field names from mismatches()
+        """
+        audio_fields = {'audio', 'audio_codec', 'sample_rate', 'channels'}
+        video_ok = not set(mismatched) - audio_fields - {'time_base'}
+        has_audio = 'audio' not in mismatched
+
+        cmd = ['ffmpeg', '-y', '-i', str(path)]
+        if not has_audio:
+            # Silent track, so the segment's audio lines up with its neighbours
+            cmd.extend(['-f', 'lavfi', '-i', f"anullsrc=r={AUDIO_SAMPLE_RATE}:cl=stereo"])
+        cmd.extend(['-map', '0:v:0', '-map', '0:a:0' if has_audio else '1:a:0'])
+
+        if video_ok:
+            cmd.extend(['-c:v', 'copy', *self.mux_args()])
+        else:
+            cmd.extend(['-vf', self.video_filter(), *self.encode_args()])
+
+        if has_audio and not audio_fields & set(mismatched):
+            cmd.extend(['-c:a', 'copy'])
+        else:
+            cmd.extend(audio_args())
+        if not has_audio:
+            cmd.append('-shortest')
+        cmd.append(str(output_path))
+
+        ffmpeg_scheduler.run(cmd, check=True, capture_output=True, text=True)
+        return output_path
+
+    def ensure_compatible(self, paths, work_dir, max_workers=None, known=None):
+        """
+        Check all segments before the stream-copy concat and repair the ones that differ
+
+        Args:
+            paths: Segment paths in timeline order
+            work_dir: Directory for repaired segments
+            max_workers: Parallel ffprobe/repair processes
+            known: Optional dict path -> probe() result recorded earlier for the same file (cached
+                   clips), those segments are not probed again
+
+        Returns:
+            list: Segment paths to concat (repaired ones replaced)
+        """
+        # probe() results of the segments probed by this call, path -> info
+        self.probed = {}
+        if not paths:
+            return []
+        known = known or {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            unknown = [path for path in dict.fromkeys(paths) if str(path) not in known]
+            self.probed = {str(path): info for path, info in zip(unknown, pool.map(self.probe, unknown))}
+            infos = [known.get(str(path)) or self.probed[str(path)] for path in paths]
+
+            # The profile follows the encoder preset, so the majority of segments defines it
+            profile = Counter(info.get('profile') for info in infos).most_common(1)[0][0]
+
+            repairs = {}
+            for idx, (path, info) in enumerate(zip(paths, infos)):
+                mismatched = self.mismatches(info, profile)
+                if mismatched:
+                    print(f"   🔧 Segment {idx + 1} differs ({', '.join(mismatched)}), repairing", file=sys.stderr, flush=True)
+                    repairs[idx] = pool.submit(self.repair, path, work_dir / f"segment_fixed_{idx}.mp4", mismatched)
+
+            fixed = {idx: future.result() for idx, future in repairs.items()}
+
+        if fixed:
+            print(f"   ✓ Repaired {len(fixed)}/{len(paths)} segments for the stream-copy concat", file=sys.stderr, flush=True)
+        return [fixed.get(idx, path) for idx, path in enumerate(paths)]
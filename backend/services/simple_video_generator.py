@@ -7,19 +7,46 @@ import sys
 import subprocess
 from pathlib import Path
 from gtts import gTTS
-import tempfile
-from PIL import Image, ImageDraw, ImageFont
+import shutil
+import time
+from PIL import Image
 import json
 import asyncio
 import edge_tts
-import platform
+from services import ffmpeg_scheduler
 from services.replicate_image_service import ReplicateImageService
 from services.video_effects import VideoEffects
 from services.elevenlabs_voice_service import ElevenLabsVoiceService
 from services.openai_tts_service import OpenAITTSService
 from services.dropbox_storage import storage
+from services.scene_renderer import SceneRenderer
+from services.asset_prefetch import AssetPrefetcher
+from services.scene_cache import SceneClipCache
+from services.render_workspace import RenderWorkspace, DISK_ROOT, estimate_clip_bytes
+from services.render_checkpoint import RenderCheckpoint
+from services.render_graph import RenderGraph, file_signature, summarize_timings
+from services.effect_graph import FilterOp
+from services.render_quality import get_quality_tier
+from services.motion_renderer import NumpyMotionRenderer, get_motion_engine
+from services.transitions import TransitionRenderer, scene_transition, keyframe_times
+from services.encode_backends import SceneEncodeJob, get_encode_backend, raw_frame_input, run_with_frame
+from services.text_layout import draw_text
+from services.text_layer import (
+    TextLayerCache, get_text_layer_mode, background_duration, background_fingerprint,
+    composite_text, replace_audio, write_webvtt
+)
+from services.segment_format import SegmentFormat, audio_args
 
 class SimpleVideoGenerator:
+    # Length of the still segment looped for effect-free scenes
+    STILL_SEGMENT_SECONDS = 1.0
+
+    # Scenes per concat chunk (CONCAT_CHUNK_SIZE env); also the fan-in of the chunk concat tree
+    CONCAT_CHUNK_SIZE = 100
+
+    # Scene length assumed for scratch space estimates when a scene has no duration (DB default)
+    ESTIMATED_SCENE_SECONDS = 5.0
+
     def __init__(self, tts_voice='de-DE-KatjaNeural'):
         # Output directory for generated videos (hybrid storage)
         self.output_dir = storage.get_save_dir('previews')
@@ -29,8 +56,35 @@ class SimpleVideoGenerator:
         self.temp_exports_dir = Path("./temp_exports")
         self.temp_exports_dir.mkdir(exist_ok=True)
 
-        self.temp_dir = Path(tempfile.gettempdir()) / "video_editor_simple"
-        self.temp_dir.mkdir(exist_ok=True)
+        # Encoder preset / CRF / fps / resolution; generate_video() picks the tier per request
+        self.quality_tier = get_quality_tier()
+
+        # Zoom/pan engine: FFmpeg zoompan or the NumPy motion renderer (MOTION_ENGINE env)
+        self.motion_engine = get_motion_engine()
+
+        # Scene encode / audio mix / probe: ffmpeg subprocesses or in-process PyAV (ENCODE_BACKEND env)
+        self.encode_backend = get_encode_backend()
+
+        # Loop a pre-encoded still segment for effect-free scenes (STILL_FAST_PATH=0 disables)
+        self.still_fast_path = os.getenv('STILL_FAST_PATH', '1').lower() not in ('0', 'false', 'no')
+
+        # WebVTT captions of the last generate_video() run (sidecar text layer only)
+        self.captions_path = None
+
+        # Reuse statistics and clip fingerprints of the last generate_video() run
+        self.render_report = {'reused': 0, 'rendered': 0, 'scenes': []}
+
+        # Render graph node timings of the running job (summed up in render_report['timings'])
+        self.node_timings = []
+        self.scene_node_timings = []
+
+        # Stage outputs of the running job, kept after a failure so a retry resumes (see render_checkpoint)
+        self.checkpoint = None
+
+        # Scratch directory; generate_video() swaps in a private per-job workspace
+        self.temp_dir = DISK_ROOT
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self.workspace = None
         self.tts_voice = tts_voice  # Can be Edge, ElevenLabs, or OpenAI voice
 
         # Initialize Replicate image service (REQUIRED)
@@ -40,126 +94,573 @@ class SimpleVideoGenerator:
         self.elevenlabs_service = ElevenLabsVoiceService()
         self.openai_tts_service = OpenAITTSService()
 
-    def generate_video(self, scenes, project_id, resolution='preview', background_music_path=None, background_music_volume=7, video_speed=1.0, ai_image_model='flux-dev', font_size=80, temp_export=False):
+    def generate_video(self, scenes, project_id, resolution='preview', background_music_path=None, background_music_volume=7, video_speed=1.0, ai_image_model='flux-dev', font_size=80, temp_export=False, render_workers=None, use_cache=True, finish_mode=None, speed_mode=None, quality=None, text_layer=None, resume=True):
         """Generate video using FFmpeg concat demuxer
 
+        Scenes are consumed as a stream and rendered in chunks; each chunk is stream-copied into
+        one file and the chunk files are concatenated as a tree, so open files, memory and scratch
+        space stay bounded for projects with thousands of scenes.
+
         Args:
+            scenes: Scene dicts in timeline order (list or iterator, e.g. DatabaseManager.iter_project_scenes)
             temp_export: If True, save to temp_exports directory (for export downloads only, not previews)
+            render_workers: Number of scenes rendered in parallel (default: SCENE_RENDER_WORKERS env or the FFMPEG_SLOTS count)
+            use_cache: If True, reuse clips of unchanged scenes from the scene clip cache
+            finish_mode: 'single_pass' (concat + speed + music in one FFmpeg run) or 'multi_pass'
+                         (default: RENDER_FINISH_MODE env or 'single_pass')
+            speed_mode: 'timeline' (apply video_speed after concat) or 'per_scene' (fold video_speed
+                        into each scene's encode, so the final concat is pure stream copy)
+                        (default: RENDER_SPEED_MODE env or 'timeline')
+            quality: Quality tier name ('draft', 'preview', 'final'); default derived from resolution
+            text_layer: 'burned' (text in the frame), 'sidecar' (WebVTT captions next to the video) or
+                        'overlay' (text PNG over a cached text-free background); default: PREVIEW_TEXT_LAYER
+                        env or 'burned' for previews, EXPORT_TEXT_LAYER env or 'burned' for exports
+            resume: If True, record finished stages (TTS, frame, scene clip, concat, finish) in a checkpoint
+                    and pick up from the last good stage of a failed or incomplete earlier render
         """
         if not scenes:
             raise ValueError("No scenes to generate")
 
-        # Set resolution
-        if resolution == 'preview':
-            width, height = 608, 1080
-        else:
-            width, height = 1080, 1920
+        if speed_mode is None:
+            speed_mode = os.getenv('RENDER_SPEED_MODE', 'timeline')
+
+        # Per-scene speed: multiply project speed into each scene's effect_speed (setpts/atempo)
+        # and finish at 1.0x, so nothing is encoded twice
+        timeline_speed = video_speed
+        folded_speed = None
+        if speed_mode == 'per_scene' and video_speed and video_speed != 1.0:
+            print(f"⚡ Folding video speed {video_speed}x into scene encodes", file=sys.stderr, flush=True)
+            folded_speed = video_speed
+            timeline_speed = 1.0
+
+        # Set resolution, frame rate and encoder settings from the quality tier
+        tier = get_quality_tier(quality, resolution)
+        self.quality_tier = tier
+        width, height = tier['width'], tier['height']
+        print(f"🎚️  Quality tier: {tier['name']} ({width}x{height} @ {tier['fps']}fps, {tier['preset']}, CRF {tier['crf']})", file=sys.stderr, flush=True)
+
+        text_layer = get_text_layer_mode(text_layer, export=temp_export)
+        if text_layer != 'burned':
+            print(f"🔤 Text layer: {text_layer}", file=sys.stderr, flush=True)
+        self.captions_path = None
+
+        # Scenes are rendered and concatenated chunk by chunk, so only one chunk's clips exist at a time
+        chunk_size = max(2, int(os.getenv('CONCAT_CHUNK_SIZE', self.CONCAT_CHUNK_SIZE)))
+
+        # Every job renders into its own workspace, so concurrent renders never share files
+        # Scratch estimate of the first chunk: its clips plus the chunk file they are concatenated into
+        scene_count = len(scenes) if hasattr(scenes, '__len__') else chunk_size
+        clip_bytes = estimate_clip_bytes(width, height, tier['fps'], self.ESTIMATED_SCENE_SECONDS)
+        workspace = RenderWorkspace(f"project_{project_id}", reserve_bytes=2 * min(scene_count, chunk_size) * clip_bytes)
+        self.workspace = workspace
+        self.temp_dir = workspace.path
+
+        # Checkpoints outlive the workspace: a failed render leaves them for the next attempt
+        checkpoint = None
+        if resume:
+            RenderCheckpoint.prune()
+            checkpoint = RenderCheckpoint(f"project_{project_id}_{resolution}{'_export' if temp_export else ''}")
+            recorded = {stage: count for stage, count in checkpoint.summary().items() if count}
+            if recorded:
+                print(f"⏯️  Resuming from checkpoint: {', '.join(f'{count} {stage}' for stage, count in recorded.items())}", file=sys.stderr, flush=True)
+        self.checkpoint = checkpoint
 
-        scene_videos = []
-        scene_timings = []  # Track actual timings
+        try:
+            scene_timings = []  # Track actual timings
+            scene_texts = []    # Script per timing entry (captions)
+            chunk_videos = []   # Concatenated chunks (the pending chunk's segments are kept in segments)
+            segments = []
+            concat_keys = []    # Checkpoint key per chunk (None if a scene of it failed)
+
+            print(f"\n{'='*80}", file=sys.stderr, flush=True)
+            print(f"🎬 VIDEO GENERATION - Scene Order & Durations", file=sys.stderr, flush=True)
+            print(f"{'='*80}", file=sys.stderr, flush=True)
+
+            clip_cache = SceneClipCache() if use_cache else None
+            self.render_report = {
+                'reused': 0,
+                'rendered': 0,
+                'failed': [],
+                'scenes': [],
+                'timings': {}
+            }
+            self.node_timings = []
+
+            chunk_meta = None
+            for chunk in self._scene_chunks(self._prepare_scenes(scenes, folded_speed), chunk_size):
+                # A second chunk exists: write the previous one to disk and drop its segments
+                if segments:
+                    chunk_videos.append(self._concat_chunk(segments, len(chunk_videos), concat_keys[-1], chunk_meta))
+                # Clips plus chunk file of this chunk must fit the RAM budget, else the job spills to disk
+                self.temp_dir = workspace.reserve(2 * sum(
+                    estimate_clip_bytes(width, height, tier['fps'], float(scene.get('duration') or self.ESTIMATED_SCENE_SECONDS))
+                    for _, scene in chunk
+                ))
+                segments, concat_key, chunk_meta = self._render_chunk(
+                    chunk, width, height, tier, ai_image_model, font_size, render_workers, clip_cache,
+                    video_speed, timeline_speed, scene_timings, text_layer, scene_texts
+                )
+                concat_keys.append(concat_key)
+
+            print(f"\n{'='*80}", file=sys.stderr, flush=True)
+            print(f"📊 FINAL SCENE TIMELINE", file=sys.stderr, flush=True)
+            print(f"{'='*80}", file=sys.stderr, flush=True)
+            cumulative = 0
+            for timing in scene_timings:
+                print(f"Scene {timing['index']+1} (ID: {timing['id']}) | Start: {cumulative:.2f}s | Duration: {timing['duration']:.2f}s | DB: {timing['db_duration']}s", file=sys.stderr, flush=True)
+                cumulative += timing['duration']
+            print(f"Total: {cumulative:.2f}s", file=sys.stderr, flush=True)
+            print(f"{'='*80}\n", file=sys.stderr, flush=True)
+
+            # Single chunk: its segments go straight into the final concat
+            if chunk_videos and segments:
+                chunk_videos.append(self._concat_chunk(segments, len(chunk_videos), concat_keys[-1], chunk_meta))
+            scene_videos = self._concat_tree(chunk_videos, chunk_size) if chunk_videos else segments
+
+            if not scene_videos:
+                raise ValueError("No scene videos were created")
+
+            # Concatenate using FFmpeg
+            print(f"Concatenating {len(scene_videos)} videos...", file=sys.stderr, flush=True)
+            output_filename = f"video_{project_id}_{resolution}.mp4"
+
+            # Use temp_exports_dir for export downloads, previews go to output_dir
+            if temp_export:
+                output_path = self.temp_exports_dir / output_filename
+                print(f"📦 Generating export to temp location (for download): {output_path}", file=sys.stderr, flush=True)
+            else:
+                output_path = self.output_dir / output_filename
+
+            # Finish inside the job workspace, then move into place so concurrent jobs never see partial files
+            # (intermediates of a multi-pass finish are about as large as the concatenated input)
+            self.temp_dir = workspace.reserve(2 * sum(os.path.getsize(path) for path in scene_videos if os.path.exists(path)))
+            job_output_path = self.temp_dir / output_filename
+            graph = RenderGraph()
+
+            # A finished video is only reusable if every chunk was complete (see render_checkpoint)
+            complete = checkpoint and None not in concat_keys
+            finish_lookup, finish_record = self._checkpointed('finish') if complete else (None, None)
+            finish = self._add_finish_nodes(
+                graph, scene_videos, job_output_path, background_music_path, background_music_volume, timeline_speed,
+                finish_mode, segment_keys=concat_keys if complete else None, lookup=finish_lookup, record=finish_record
+            )
+
+            def publish(finished_path):
+                if Path(finished_path) == job_output_path:
+                    shutil.move(str(job_output_path), str(output_path))
+                else:
+                    # Finished video restored from the checkpoint
+                    shutil.copy(finished_path, output_path)
+                print(f"✓ Video generated: {output_path}", file=sys.stderr, flush=True)
+                return output_path
+
+            published = graph.add('publish', 'publish', publish, deps=[finish], inputs={'output': str(output_path)})
+
+            # Sidecar captions: scene text as WebVTT cues on the final (speed-adjusted) timeline
+            if text_layer == 'sidecar':
+                def captions():
+                    cues = []
+                    start = 0.0
+                    for timing, text in zip(scene_timings, scene_texts):
+                        end = start + timing['duration'] / (video_speed or 1.0)
+                        cues.append((start, end, text))
+                        start = end
+                    captions_path = write_webvtt(cues, Path(output_path).with_suffix('.vtt'))
+                    print(f"🔤 Captions written: {captions_path}", file=sys.stderr, flush=True)
+                    return captions_path
+
+                # Needs only the timings, so it runs next to the finish
+                captions_node = graph.add('captions', 'captions', captions, inputs={'output': str(output_path)})
+            else:
+                captions_node = None
+
+            # Evict old clips only after the concat no longer needs this run's clips
+            if clip_cache:
+                def prune_cache(_):
+                    try:
+                        clip_cache.prune()
+                    except Exception as e:
+                        print(f"⚠️ Scene cache prune warning: {e}", file=sys.stderr, flush=True)
+
+                graph.add('prune', 'prune', prune_cache, deps=[finish])
+
+            # Upload to Dropbox if on Railway (not local Mac) - skip for temp exports
+            if not temp_export and not storage.use_local and storage.dbx:
+                def upload(*published_paths):
+                    # The video and its captions sidecar (if any) go to the same folder
+                    for published_path in published_paths:
+                        try:
+                            rel_path = f'previews/{Path(published_path).name}'
+                            dropbox_path = f'/output/video_editor_prototype/{rel_path}'
+                            with open(published_path, 'rb') as f:
+                                import dropbox
+                                storage.dbx.files_upload(f.read(), dropbox_path, mode=dropbox.files.WriteMode.overwrite)
+                            print(f"☁️ Uploaded preview to Dropbox: {dropbox_path}", file=sys.stderr, flush=True)
+                        except Exception as e:
+                            print(f"⚠️ Dropbox upload warning: {e}", file=sys.stderr, flush=True)
+
+                graph.add('upload', 'upload', upload, deps=[published] + ([captions_node] if captions_node else []))
+
+            try:
+                results = graph.run()
+            finally:
+                self.node_timings.extend(graph.timings)
+            self.captions_path = results.get('captions')
+
+            # A complete render needs no checkpoint; with failed scenes the retry re-renders only those
+            if checkpoint:
+                if self.render_report['failed']:
+                    print(f"⏯️  {len(self.render_report['failed'])} scenes failed, keeping checkpoint for a retry", file=sys.stderr, flush=True)
+                else:
+                    checkpoint.clear()
+
+            # Per-node timings of all scene and finish steps
+            self.render_report['timings'] = summarize_timings(self.node_timings)
+            for kind, timing in self.render_report['timings'].items():
+                print(f"⏱️  {kind:<10} {timing['ran']:>5} ran {timing['reused']:>5} reused {timing['seconds']:>9.2f}s", file=sys.stderr, flush=True)
+
+        finally:
+            # Cleanup this job's temporary files only (keep image_cache for database)
+            workspace.cleanup()
+            self.workspace = None
+            self.checkpoint = None
 
-        print(f"\n{'='*80}", file=sys.stderr, flush=True)
-        print(f"🎬 VIDEO GENERATION - Scene Order & Durations", file=sys.stderr, flush=True)
-        print(f"{'='*80}", file=sys.stderr, flush=True)
+        # Return both path and timing information
+        return str(output_path), scene_timings
+
+    @staticmethod
+    def _prepare_scenes(scenes, folded_speed=None):
+        """
+        Stream (index, scene) pairs with the project speed folded in and the transition windows attached
 
-        # Process each scene
+        Looks one scene ahead, because a scene's outgoing transition only applies if another scene follows.
+
+        Args:
+            scenes: Scene dicts (list or iterator, e.g. DatabaseManager.iter_project_scenes)
+            folded_speed: Project speed to multiply into each scene's effect_speed (per_scene speed mode)
+        """
+        previous = None
+        transition_in = 0.0
         for idx, scene in enumerate(scenes):
-            print(f"\n📝 Scene {idx + 1}/{len(scenes)} (ID: {scene.get('id', 'unknown')})", file=sys.stderr, flush=True)
+            if folded_speed:
+                scene_speed = scene.get('effect_speed', 1.0) or 1.0
+                if scene_speed <= 0:
+                    scene_speed = 1.0
+                scene = dict(scene, effect_speed=scene_speed * folded_speed)
+
+            if previous is not None:
+                prev_idx, prev_scene = previous
+                transition_out = scene_transition(prev_scene)[1]
+                yield prev_idx, SimpleVideoGenerator._with_transition_windows(prev_scene, transition_in, transition_out)
+                transition_in = transition_out
+            previous = (idx, scene)
+
+        if previous is not None:
+            prev_idx, prev_scene = previous
+            yield prev_idx, SimpleVideoGenerator._with_transition_windows(prev_scene, transition_in, 0.0)
+
+    @staticmethod
+    def _with_transition_windows(scene, transition_in, transition_out):
+        """Tell a scene the transition windows at its edges, so its encode puts keyframes there"""
+        if not transition_in and not transition_out:
+            return scene
+        return dict(scene, transition_in=transition_in, transition_out=transition_out)
+
+    @staticmethod
+    def _scene_chunks(indexed_scenes, chunk_size):
+        """
+        Group (index, scene) pairs into chunks of about chunk_size scenes
+
+        Chunks only end on hard cuts, so every transition is rendered inside one chunk.
+        """
+        chunk = []
+        for idx, scene in indexed_scenes:
+            chunk.append((idx, scene))
+            if len(chunk) >= chunk_size and not scene.get('transition_out'):
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _render_chunk(self, chunk, width, height, tier, ai_image_model, font_size, render_workers, clip_cache,
+                      video_speed, timeline_speed, scene_timings, text_layer='burned', scene_texts=None):
+        """
+        Render one chunk of scenes into concat-ready segments (cache hits are reused)
+
+        Appends the chunk's timings to scene_timings (scripts to scene_texts) and its clips to self.render_report.
+        A chunk whose concat is recorded in self.checkpoint is restored without rendering anything.
+
+        Returns:
+            tuple: (segment paths in timeline order, concat checkpoint key or None,
+                    checkpoint metadata for the concat or None if restored or a scene failed)
+        """
+        scene_videos = []
+        scene_durations = []
+        scene_transitions = []  # Outgoing transition per rendered scene
+        chunk_timings = []
+        chunk_texts = []
+        chunk_report = []
+        cache_keys = {}
+        render_results = {}
+
+        # Log each scene in timeline order, then render cache misses in parallel
+        render_jobs = []
+        render_settings = {'quality': tier, 'motion_engine': self.motion_engine}
+        if text_layer != 'burned':
+            render_settings['text_layer'] = text_layer
+            # The scene renderer workers read the mode from the scene
+            chunk = [(idx, dict(scene, text_layer=text_layer)) for idx, scene in chunk]
+
+        concat_key = None
+        if self.checkpoint:
+            for idx, scene in chunk:
+                cache_keys[idx] = SceneClipCache.fingerprint(scene, self.tts_voice, width, height, ai_image_model, font_size, extra=render_settings)
+            concat_key = RenderCheckpoint.key(
+                [(idx, scene.get('id'), cache_keys[idx], scene_transition(scene)) for idx, scene in chunk],
+                video_speed, timeline_speed
+            )
+            restored = self.checkpoint.get('concat', concat_key)
+            if restored:
+                print(f"\n⏯️  Scenes {chunk[0][0] + 1}-{chunk[-1][0] + 1} restored from checkpoint", file=sys.stderr, flush=True)
+                scene_timings.extend(restored['timings'])
+                if scene_texts is not None:
+                    scene_texts.extend(restored['texts'])
+                self.render_report['reused'] += len(chunk)
+                self.render_report['scenes'].extend(dict(entry, reused=True) for entry in restored['report'])
+                return [Path(restored['path'])], concat_key, None
+
+        for idx, scene in chunk:
+            print(f"\n📝 Scene {idx + 1} (ID: {scene.get('id', 'unknown')})", file=sys.stderr, flush=True)
             print(f"   Script: {scene['script'][:70]}...", file=sys.stderr, flush=True)
             print(f"   DB Duration: {scene.get('duration', 'N/A')}s", file=sys.stderr, flush=True)
 
-            try:
-                # Log effects if any
-                if VideoEffects.has_effects(scene):
-                    effects_summary = VideoEffects.get_effects_summary(scene)
-                    print(f"   🎨 Effects: {effects_summary}", file=sys.stderr, flush=True)
-
-                scene_video, actual_duration = self._create_scene_video(
-                    scene,  # Pass full scene object instead of individual params
-                    width,
-                    height,
-                    idx,
-                    ai_image_model,  # Pass AI model from generate_video()
-                    font_size  # Pass font_size from generate_video()
-                )
-                scene_videos.append(scene_video)
-                scene_timings.append({
-                    'index': idx,
-                    'id': scene.get('id'),
-                    'duration': actual_duration,
-                    'db_duration': scene.get('duration')
-                })
-                print(f"   ✓ Actual Duration: {actual_duration:.2f}s", file=sys.stderr, flush=True)
+            # Log effects if any
+            if VideoEffects.has_effects(scene):
+                effects_summary = VideoEffects.get_effects_summary(scene)
+                print(f"   🎨 Effects: {effects_summary}", file=sys.stderr, flush=True)
 
-            except Exception as e:
-                print(f"   ✗ Error: {e}", file=sys.stderr, flush=True)
+            if idx not in cache_keys and (clip_cache or self.checkpoint):
+                cache_keys[idx] = SceneClipCache.fingerprint(scene, self.tts_voice, width, height, ai_image_model, font_size, extra=render_settings)
+
+            if clip_cache:
+                cache_key = cache_keys[idx]
+
+                # Clip recorded in the database by the last preview of this scene
+                stored_clip = scene.get('render_clip_path')
+                if scene.get('render_fingerprint') == cache_key and stored_clip and os.path.exists(stored_clip) and scene.get('render_clip_duration'):
+                    print(f"   ♻️  Reusing last rendered clip {cache_key[:12]}", file=sys.stderr, flush=True)
+                    render_results[idx] = (Path(stored_clip), scene['render_clip_duration'])
+                    continue
+
+                cached = clip_cache.get(cache_key)
+                if cached:
+                    print(f"   ♻️  Reusing cached clip {cache_key[:12]}", file=sys.stderr, flush=True)
+                    render_results[idx] = cached
+                    continue
+
+            if self.checkpoint:
+                stored = self.checkpoint.get('scene', cache_keys[idx])
+                if stored:
+                    print(f"   ⏯️  Reusing checkpointed clip {cache_keys[idx][:12]}", file=sys.stderr, flush=True)
+                    render_results[idx] = (Path(stored['path']), stored['duration'])
+                    continue
+
+            render_jobs.append((idx, scene))
+
+        if clip_cache:
+            print(f"\n♻️  Scene cache: {len(render_results)} hits, {len(render_jobs)} to render", file=sys.stderr, flush=True)
+
+        rendered_indexes = {idx for idx, _ in render_jobs}
+        self.render_report['reused'] += len(render_results)
+        self.render_report['rendered'] += len(render_jobs)
+
+        if render_jobs:
+            renderer = SceneRenderer(self, max_workers=render_workers)
+
+            # Producer/consumer pipeline: TTS and AI images are fetched a bounded number of scenes
+            # ahead, so the network waits overlap with the encodes instead of adding up
+            prefetcher = None
+            if os.getenv('ASSET_PREFETCH', '1').lower() in ('1', 'true', 'yes'):
+                prefetcher = AssetPrefetcher(
+                    lambda idx, scene: self._prefetch_assets(idx, scene, width, height, ai_image_model)
+                )
+            rendered = renderer.render(render_jobs, width, height, ai_image_model, font_size, tier, prefetcher)
+            self.node_timings.extend(renderer.node_timings)
+
+            # Move fresh clips into the cache so they survive the temp_dir cleanup
+            for idx, result in rendered.items():
+                if not isinstance(result, Exception):
+                    scene_video, actual_duration = result
+                    cached = False
+                    if clip_cache:
+                        try:
+                            result = (clip_cache.put(cache_keys[idx], scene_video, actual_duration), actual_duration)
+                            cached = True
+                        except Exception as e:
+                            print(f"   ⚠️ Scene cache write failed: {e}", file=sys.stderr, flush=True)
+                    if self.checkpoint:
+                        # Clips in the scene cache are only referenced, workspace clips are kept in the checkpoint
+                        try:
+                            self.checkpoint.put('scene', cache_keys[idx], result[0], copy=not cached, duration=actual_duration)
+                        except Exception as e:
+                            print(f"   ⚠️ Checkpoint write failed: {e}", file=sys.stderr, flush=True)
+                render_results[idx] = result
+
+        # Collect results in scene order (workers may finish in any order)
+        for idx, scene in chunk:
+            result = render_results.get(idx)
+            if isinstance(result, Exception) or result is None:
+                print(f"   ✗ Scene {idx + 1} Error: {result}", file=sys.stderr, flush=True)
+                self.render_report['failed'].append({'index': idx, 'id': scene.get('id'), 'error': str(result)})
                 continue
 
-        print(f"\n{'='*80}", file=sys.stderr, flush=True)
-        print(f"📊 FINAL SCENE TIMELINE", file=sys.stderr, flush=True)
-        print(f"{'='*80}", file=sys.stderr, flush=True)
-        cumulative = 0
-        for timing in scene_timings:
-            print(f"Scene {timing['index']+1} (ID: {timing['id']}) | Start: {cumulative:.2f}s | Duration: {timing['duration']:.2f}s | DB: {timing['db_duration']}s", file=sys.stderr, flush=True)
-            cumulative += timing['duration']
-        print(f"Total: {cumulative:.2f}s", file=sys.stderr, flush=True)
-        print(f"{'='*80}\n", file=sys.stderr, flush=True)
-
-        if not scene_videos:
-            raise ValueError("No scene videos were created")
-
-        # Concatenate using FFmpeg
-        print(f"Concatenating {len(scene_videos)} videos...", file=sys.stderr, flush=True)
-        output_filename = f"video_{project_id}_{resolution}.mp4"
-
-        # Use temp_exports_dir for export downloads, previews go to output_dir
-        if temp_export:
-            output_path = self.temp_exports_dir / output_filename
-            print(f"📦 Generating export to temp location (for download): {output_path}", file=sys.stderr, flush=True)
+            scene_video, actual_duration = result
+            scene_videos.append(scene_video)
+            scene_durations.append(actual_duration)
+            scene_transitions.append(scene_transition(scene) if scene.get('transition_out') else ('none', 0.0))
+            if clip_cache and idx in cache_keys:
+                chunk_report.append({
+                    'id': scene.get('id'),
+                    'fingerprint': cache_keys[idx],
+                    'clip_path': str(scene_video),
+                    'clip_duration': actual_duration,
+                    'reused': idx not in rendered_indexes,
+                    # Already recorded in the database for this scene
+                    'stored': scene.get('render_fingerprint') == cache_keys[idx] and scene.get('render_clip_path') == str(scene_video)
+                })
+            if timeline_speed != video_speed:
+                # Report durations at 1.0x project speed like the timeline mode does
+                actual_duration = actual_duration * video_speed
+            chunk_texts.append(scene.get('script', ''))
+            chunk_timings.append({
+                'index': idx,
+                'id': scene.get('id'),
+                'duration': actual_duration,
+                'db_duration': scene.get('duration')
+            })
+            print(f"   ✓ Scene {idx + 1} Actual Duration: {actual_duration:.2f}s", file=sys.stderr, flush=True)
+
+        # Transitions: re-encode only the windows around the cuts, stream-copy everything else
+        if any(transition_type != 'none' for transition_type, _ in scene_transitions[:-1]):
+            transition_renderer = TransitionRenderer(self.temp_dir, tier, render_workers)
+            scene_videos, timeline_durations = transition_renderer.render(
+                list(zip(scene_videos, scene_durations)), scene_transitions
+            )
+            # Overlapped transition time comes off the outgoing scene
+            for timing, clip_duration, timeline_duration in zip(chunk_timings, scene_durations, timeline_durations):
+                if clip_duration > 0:
+                    timing['duration'] = timing['duration'] * timeline_duration / clip_duration
+
+        scene_timings.extend(chunk_timings)
+        if scene_texts is not None:
+            scene_texts.extend(chunk_texts)
+        self.render_report['scenes'].extend(chunk_report)
+
+        # Only a chunk without failed scenes may be restored as a whole
+        chunk_meta = None
+        if concat_key and len(chunk_timings) == len(chunk):
+            chunk_meta = {'timings': chunk_timings, 'texts': chunk_texts, 'report': chunk_report}
         else:
-            output_path = self.output_dir / output_filename
-
-        self._concat_videos_ffmpeg(scene_videos, output_path, background_music_path, background_music_volume, video_speed)
+            concat_key = None
+
+        # Repair segments that would break the stream-copy concat (never re-encode the whole timeline).
+        # Cached clips were probed when first concatenated, only new segments need ffprobe.
+        segment_format = SegmentFormat(width, height, tier)
+        known = clip_cache.segment_infos(scene_videos) if clip_cache else None
+        segments = segment_format.ensure_compatible(scene_videos, self.temp_dir, render_workers, known=known)
+        if clip_cache:
+            clip_cache.record_segment_infos(segment_format.probed)
+        return segments, concat_key, chunk_meta
+
+    def _concat_copy(self, video_paths, output_path):
+        """Stream-copy concat of segments that share one format (see SegmentFormat)"""
+        list_file = output_path.with_suffix('.txt')
+        with open(list_file, 'w') as f:
+            for video_path in video_paths:
+                f.write(f"file '{Path(video_path).absolute()}'\n")
 
-        print(f"✓ Video generated: {output_path}", file=sys.stderr, flush=True)
+        cmd = [
+            'ffmpeg', '-y',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', str(list_file),
+            '-c', 'copy',
+            str(output_path)
+        ]
+        ffmpeg_scheduler.run(cmd, check=True, capture_output=True, text=True)
+        list_file.unlink(missing_ok=True)
+        return output_path
+
+    def _discard_segments(self, video_paths):
+        """Delete intermediate segments of this job (cached clips live outside the workspace and are kept)"""
+        workspace = self.temp_dir.resolve()
+        for video_path in video_paths:
+            path = Path(video_path).resolve()
+            # Segments may sit in the RAM directory of a job that has since spilled to disk
+            if workspace in path.parents or (self.workspace and self.workspace.owns(path)):
+                path.unlink(missing_ok=True)
+
+    def _concat_chunk(self, segments, chunk_idx, concat_key=None, chunk_meta=None):
+        """
+        Concat one chunk's segments into a chunk file and free their disk space
 
-        # Upload to Dropbox if on Railway (not local Mac) - skip for temp exports
-        if not temp_export and not storage.use_local and storage.dbx:
+        Args:
+            concat_key: Checkpoint key of the chunk (see _render_chunk)
+            chunk_meta: Timings/texts/report to record with it (None: restored or incomplete, not recorded)
+        """
+        if len(segments) == 1 and chunk_meta is None:
+            # Restored chunk file or a single segment
+            return segments[0]
+        chunk_path = self.temp_dir / f"chunk_{chunk_idx}.mp4"
+        print(f"🧩 Concatenating chunk {chunk_idx + 1} ({len(segments)} segments)", file=sys.stderr, flush=True)
+        self._concat_copy(segments, chunk_path)
+        self._discard_segments(segments)
+        if self.checkpoint and concat_key and chunk_meta is not None:
             try:
-                rel_path = f'previews/{output_filename}'
-                dropbox_path = f'/output/video_editor_prototype/{rel_path}'
-                with open(output_path, 'rb') as f:
-                    import dropbox
-                    storage.dbx.files_upload(f.read(), dropbox_path, mode=dropbox.files.WriteMode.overwrite)
-                print(f"☁️ Uploaded preview to Dropbox: {dropbox_path}", file=sys.stderr, flush=True)
+                self.checkpoint.put('concat', concat_key, chunk_path, **chunk_meta)
             except Exception as e:
-                print(f"⚠️ Dropbox upload warning: {e}", file=sys.stderr, flush=True)
+                print(f"⚠️ Checkpoint write failed: {e}", file=sys.stderr, flush=True)
+        return chunk_path
 
-        # Cleanup temporary files (keep image_cache for database)
-        try:
-            import shutil
-            if self.temp_dir.exists():
-                shutil.rmtree(self.temp_dir)
-                print(f"🧹 Cleaned up temp files in {self.temp_dir}", file=sys.stderr, flush=True)
-        except Exception as e:
-            print(f"⚠️ Temp cleanup warning: {e}", file=sys.stderr, flush=True)
+    def _concat_tree(self, video_paths, fan_in):
+        """
+        Reduce files level by level (fan_in files per concat) until one concat list is small enough
 
-        # Return both path and timing information
-        return str(output_path), scene_timings
+        Every level is a stream copy, so a failure late in the tree only repeats that level.
+        """
+        level = 0
+        while len(video_paths) > fan_in:
+            level += 1
+            merged = []
+            for start in range(0, len(video_paths), fan_in):
+                group = video_paths[start:start + fan_in]
+                merged_path = self.temp_dir / f"chunk_l{level}_{start // fan_in}.mp4"
+                self._concat_copy(group, merged_path)
+                self._discard_segments(group)
+                merged.append(merged_path)
+            print(f"🧩 Concat level {level}: {len(video_paths)} → {len(merged)} files", file=sys.stderr, flush=True)
+            video_paths = merged
+        return video_paths
+
+    def _create_scene_video(self, scene, width, height, idx, ai_image_model='flux-dev', font_size=80, quality_tier=None):
+        """
+        Create single scene video with effects
 
-    def _create_scene_video(self, scene, width, height, idx, ai_image_model='flux-dev', font_size=80):
-        """Create single scene video with effects"""
+        Built as a render graph (see render_graph): TTS audio and background image are independent
+        and run in parallel, the SFX mix and text frame follow them, the encode needs both.
+        Node timings are left in self.scene_node_timings.
+        """
+        tier = quality_tier or self.quality_tier
         text = scene['script']
-        bg_type = scene.get('background_type', 'solid')
-        bg_value = scene.get('background_value', '#000000')
         sound_effect_path = scene.get('sound_effect_path')
+        graph = RenderGraph()
 
-        # Generate TTS using appropriate service based on voice prefix
-        tts_audio_path = self.temp_dir / f"audio_{idx}.mp3"
-        self._generate_tts(text, tts_audio_path)
+        # TTS fetched ahead by generate_video's asset prefetcher (see asset_prefetch)
+        prefetched_tts = scene.get('prefetched_tts')
+        if prefetched_tts:
+            scene = {key: value for key, value in scene.items() if key != 'prefetched_tts'}
 
-        # Get TTS audio duration using ffprobe
-        duration = self._get_audio_duration(tts_audio_path)
+        audio = self._add_tts_node(graph, text, idx, prefetched_tts)
 
         # Mix TTS with sound effect if provided
         print(f"   🔍 DEBUG: sound_effect_path = {sound_effect_path}", file=sys.stderr, flush=True)
@@ -169,17 +670,140 @@ class SimpleVideoGenerator:
         if sound_effect_path and os.path.exists(sound_effect_path):
             sound_effect_volume = scene.get('sound_effect_volume', 50)  # Default 50%
             sound_effect_offset = scene.get('sound_effect_offset', 0)   # Default 0% (start)
-            print(f"   🎵 Mixing sound effect: {sound_effect_path} (Volume: {sound_effect_volume}%, Offset: {sound_effect_offset}%)", file=sys.stderr, flush=True)
-            mixed_audio_path = self.temp_dir / f"mixed_audio_{idx}.mp3"
-            self._mix_audio_with_sound_effect(tts_audio_path, sound_effect_path, mixed_audio_path, duration, sound_effect_volume, sound_effect_offset)
-            audio_path = mixed_audio_path
+            audio = graph.add(
+                f"sfx_{idx}", 'sfx_mix',
+                lambda tts: self._sfx_mix_node(tts, sound_effect_path, sound_effect_volume, sound_effect_offset, idx),
+                deps=[audio],
+                inputs={'sound_effect': file_signature(sound_effect_path), 'volume': sound_effect_volume,
+                        'offset': sound_effect_offset, 'index': idx}
+            )
+        elif sound_effect_path:
+            print(f"   ⚠️ Sound effect file not found: {sound_effect_path}", file=sys.stderr, flush=True)
+        else:
+            print(f"   ℹ️ No sound effect for this scene", file=sys.stderr, flush=True)
+
+        encode_inputs = {'scene': scene, 'index': idx, 'size': [width, height], 'quality': tier, 'motion_engine': self.motion_engine}
+        text_layer = scene.get('text_layer', 'burned')
+        if text_layer == 'burned':
+            bg_type = scene.get('background_type', 'solid')
+            bg_value = scene.get('background_value', '#000000')
+            image = graph.add(
+                f"image_{idx}", 'image',
+                lambda: self._create_background_image(width, height, bg_type, bg_value, ai_image_model, scene),
+                inputs={'type': bg_type, 'value': bg_value, 'file': file_signature(bg_value),
+                        'image_path': file_signature(scene.get('image_path')), 'size': [width, height], 'model': ai_image_model}
+            )
+            # Text drawn into the frame (kept in memory and piped to FFmpeg as raw RGB)
+            frame = graph.add(f"frame_{idx}", 'frame', lambda img: self._draw_frame(img, text, font_size), deps=[image],
+                              inputs={'text': text, 'font_size': font_size})
+            clip = graph.add(f"encode_{idx}", 'encode',
+                             lambda audio_result, frame_img: self._encode_node(scene, frame_img, audio_result, width, height, idx, tier),
+                             deps=[audio, frame], inputs=encode_inputs)
         else:
-            if sound_effect_path:
-                print(f"   ⚠️ Sound effect file not found: {sound_effect_path}", file=sys.stderr, flush=True)
+            # Text kept out of the pixels: reuse a cached text-free background and add the text afterwards
+            clip = self._add_layered_nodes(graph, scene, width, height, idx, audio, tier, ai_image_model,
+                                           font_size, text_layer, encode_inputs)
+
+        try:
+            return graph.run([clip])[clip.name]
+        finally:
+            self.scene_node_timings = graph.timings
+
+    def _add_tts_node(self, graph, text, idx, prefetched=None):
+        """
+        Add the TTS node of a scene, result (path, duration)
+
+        Args:
+            prefetched: (path, duration) the asset prefetcher already produced
+        """
+        # Generate TTS using appropriate service based on voice prefix (paid voices: reuse a checkpointed take)
+        lookup, record = self._checkpointed('tts')
+        if prefetched:
+            # Already recorded in the checkpoint by the prefetcher
+            lookup, record = (lambda key: (Path(prefetched[0]), prefetched[1])), None
+        return graph.add(f"tts_{idx}", 'tts', lambda: self._tts_node(text, idx),
+                         inputs={'voice': self.tts_voice, 'text': text}, lookup=lookup, record=record)
+
+    def _prefetch_assets(self, idx, scene, width, height, ai_image_model):
+        """
+        Fetch the network-bound assets of a scene ahead of its encode (runs in an asset prefetcher thread)
+
+        Returns:
+            dict: The scene with the TTS take ('prefetched_tts') and AI image ('image_path') filled in
+        """
+        graph = RenderGraph()
+        tts = self._add_tts_node(graph, scene['script'], idx)
+        try:
+            audio_path, duration = graph.run([tts])[tts.name]
+        finally:
+            self.node_timings.extend(graph.timings)
+        scene = dict(scene, prefetched_tts=(str(audio_path), duration))
+
+        bg_value = scene.get('background_value')
+        if scene.get('background_type') == 'keyword' and bg_value:
+            start = time.perf_counter()
+            scene['image_path'] = self._ai_image_path(bg_value, width, height, ai_image_model, scene)
+            self.node_timings.append({'name': f"image_fetch_{idx}", 'kind': 'image_fetch', 'key': None,
+                                      'seconds': time.perf_counter() - start, 'status': 'ran'})
+        return scene
+
+    def _checkpointed(self, stage):
+        """
+        lookup/record callables keeping a node's result in the job checkpoint (see render_checkpoint)
+
+        Results are a file path or a (path, duration) tuple. Returns (None, None) without a checkpoint.
+        """
+        checkpoint = self.checkpoint
+        if not checkpoint:
+            return None, None
+
+        def lookup(key):
+            entry = checkpoint.get(stage, key)
+            if not entry:
+                return None
+            print(f"   ⏯️  Reusing checkpointed {stage} output", file=sys.stderr, flush=True)
+            if 'duration' in entry:
+                return Path(entry['path']), entry['duration']
+            return Path(entry['path'])
+
+        def record(key, result):
+            if isinstance(result, tuple):
+                checkpoint.put(stage, key, result[0], duration=result[1])
             else:
-                print(f"   ℹ️ No sound effect for this scene", file=sys.stderr, flush=True)
-            audio_path = tts_audio_path
+                checkpoint.put(stage, key, result)
+
+        return lookup, record
 
+    def _tts_node(self, text, idx):
+        """TTS audio of a scene: (path, duration)"""
+        tts_audio_path = self.temp_dir / f"audio_{idx}.mp3"
+        self._generate_tts(text, tts_audio_path)
+
+        # Get TTS audio duration using ffprobe
+        return tts_audio_path, self._get_audio_duration(tts_audio_path)
+
+    def _sfx_mix_node(self, tts, sound_effect_path, sound_effect_volume, sound_effect_offset, idx):
+        """TTS mixed with the scene's sound effect: (path, duration of the TTS)"""
+        tts_audio_path, duration = tts
+        print(f"   🎵 Mixing sound effect: {sound_effect_path} (Volume: {sound_effect_volume}%, Offset: {sound_effect_offset}%)", file=sys.stderr, flush=True)
+        mixed_audio_path = self.temp_dir / f"mixed_audio_{idx}.mp3"
+        self.encode_backend.mix_audio(tts_audio_path, sound_effect_path, mixed_audio_path, duration, sound_effect_volume, sound_effect_offset)
+        return mixed_audio_path, duration
+
+    def _draw_frame(self, img, text, font_size):
+        """Text frame: the background with the script drawn on a copy (the background may be shared)"""
+        frame = img.copy()
+        self._draw_text(frame, text, frame.width, frame.height, font_size)
+        return frame
+
+    @staticmethod
+    def _scene_timing(scene, duration):
+        """
+        Video duration and audio filter of a scene from its audio duration
+
+        Returns:
+            tuple: (video_duration, audio_filter or None)
+        """
         # Adjust duration for speed effect
         effect_speed = scene.get('effect_speed', 1.0)
         # Protect against division by zero - minimum speed is 0.1
@@ -192,66 +816,207 @@ class SimpleVideoGenerator:
         else:
             video_duration = duration
 
-        # Create image with text
-        img_path = self.temp_dir / f"frame_{idx}.jpg"
-        self._create_text_image(text, width, height, bg_type, bg_value, img_path, ai_image_model, font_size, scene)
+        # Adjust audio tempo to match video speed
+        audio_filter = VideoEffects.atempo_filter(effect_speed) if effect_speed != 1.0 else None
+        return video_duration, audio_filter
 
-        # Build effects filter chain
-        filter_chain = VideoEffects.build_filter_chain(scene, width, height, video_duration)
-
-        # Log the filter chain for debugging
-        if filter_chain:
-            print(f"   🎬 FFmpeg filter: {filter_chain}", file=sys.stderr, flush=True)
+    def _encode_node(self, scene, frame, audio, width, height, idx, tier):
+        """Scene clip with the text burned in: (path, actual duration)"""
+        audio_path, duration = audio
+        video_duration, audio_filter = self._scene_timing(scene, duration)
 
         # Create video from image + audio using FFmpeg with effects
         video_path = self.temp_dir / f"scene_{idx}.mp4"
+        self._encode_scene_frames(scene, frame, audio_path, video_path, video_duration, audio_filter, width, height, idx, tier)
+
+        # Return actual output duration (may differ from input due to effects)
+        return video_path, self._get_video_duration(video_path)
+
+    def _encode_scene_frames(self, scene, frame, audio_path, video_path, video_duration, audio_filter, width, height, idx, tier,
+                             encode_duration=None):
+        """
+        Encode the composed frame with the scene's effects (still fast path, motion, effect graph)
+
+        Args:
+            video_duration: Scene duration the effects and transition keyframes are laid out over
+            encode_duration: Length of the encoded clip if longer (padded text-free backgrounds)
+        """
+        encode_duration = max(encode_duration or video_duration, video_duration)
+        # Zoom/pan frames come from zoompan, or from the NumPy motion renderer (MOTION_ENGINE=numpy)
+        motion_renderer = None
+        if self.motion_engine == 'numpy' and VideoEffects.has_motion_source(scene):
+            motion_renderer = NumpyMotionRenderer(
+                scene.get('effect_zoom', 'none'), scene.get('effect_pan', 'none'), width, height,
+                video_duration, scene.get('effect_intensity', 0.5), tier['fps']
+            )
+
+        # Build effects graph (compiled below, once the input is known)
+        effect_graph = VideoEffects.build_effect_graph(
+            scene, width, height, video_duration, tier['fps'], tier['supersample'],
+            include_motion=motion_renderer is None
+        )
+
+        # Effect-free scenes: encode a short still segment once and loop it by stream copy. Speed alone
+        # (e.g. the project speed folded in by per_scene speed mode) changes nothing on a still: the
+        # scene duration and the chained atempo already carry it, so its setpts is dropped
+        still = not VideoEffects.has_effects(dict(scene, effect_speed=1.0)) and all(
+            isinstance(op, FilterOp) and op.name == 'setpts' for op in effect_graph.ops
+        )
+        if self.still_fast_path and still:
+            self._encode_still_scene(frame, audio_path, video_path, encode_duration, tier, idx, audio_filter)
+            return video_path
+
+        # Every segment ends in the same geometry/SAR/frame rate/pixel format, so the concat can stream-copy
+        # (no scale/pad pass if the effects already end at the output size)
+        segment_format = SegmentFormat(width, height, tier)
+        effect_graph.append(segment_format.video_filter(effect_graph.output_size(width, height)))
+
+        # Zoom/pan chains generate every frame from the single piped frame;
+        # everything else needs the still looped at the output frame rate
+        if not motion_renderer and not VideoEffects.has_motion_source(scene):
+            effect_graph.prepend(VideoEffects.still_loop_filter(tier['fps']))
+
+        # Inputs: 0 = frame(s), 1 = audio, 2+ = extra effect inputs (noise plates)
+        compiled = effect_graph.compile(
+            width, height, video_duration, tier['fps'], still_input=motion_renderer is None, first_input_index=2
+        )
+
+        # Log the filter graph for debugging
+        if compiled:
+            print(f"   🎬 FFmpeg filter: {compiled.filter}", file=sys.stderr, flush=True)
+            print(f"   📊 Effect cost: {compiled.cost['filters']} filters, {compiled.cost['mpixel_ops']} Mpx-ops", file=sys.stderr, flush=True)
+
+        job = SceneEncodeJob(
+            frame, audio_path, video_path, encode_duration, segment_format, compiled,
+            audio_filter=audio_filter,
+            # Keyframes at the transition windows, so the transition renderer can stream-copy the rest
+            keyframe_times=keyframe_times(video_duration, scene.get('transition_in', 0.0), scene.get('transition_out', 0.0)),
+            motion_renderer=motion_renderer,
+            log_path=self.temp_dir / f"scene_{idx}.log"
+        )
+
+        # Encode (ffmpeg subprocess or in-process PyAV, see ENCODE_BACKEND)
+        try:
+            self.encode_backend.encode_scene(job)
+        except subprocess.CalledProcessError as e:
+            print(f"   ❌ FFmpeg Error: {e.stderr}", file=sys.stderr, flush=True)
+            raise
+
+        return video_path
+
+    def _add_layered_nodes(self, graph, scene, width, height, idx, audio, tier, ai_image_model, font_size,
+                           text_layer, encode_inputs):
+        """
+        Nodes of a scene clip with the text kept out of the effect render
+
+        The text-free background is cached under its own key (no script, no audio), so a text
+        edit only costs an audio mux by stream copy ('sidecar') or a text overlay pass ('overlay').
+        The background length follows the audio, so its cache can only be checked once the TTS node
+        ran; the background image is loaded (or generated) only on a miss.
+
+        Returns:
+            RenderNode: The clip node, result (path, actual duration)
+        """
+        segment_format = SegmentFormat(width, height, tier)
+        bg_cache = SceneClipCache()
+
+        def background_key(video_duration):
+            bg_duration = background_duration(video_duration)
+            # Timed effects and transition keyframes follow the real duration, so only backgrounds
+            # without them are shared across nearby durations
+            timed = VideoEffects.has_timed_effects(scene) or (text_layer == 'sidecar' and scene.get('transition_out', 0.0))
+            return bg_duration, background_fingerprint(scene, width, height, ai_image_model, bg_duration,
+                                                       extra={'quality': tier, 'motion_engine': self.motion_engine},
+                                                       effect_duration=video_duration if timed else None)
+
+        def render_background(audio_result):
+            audio_path, duration = audio_result
+            video_duration = self._scene_timing(scene, duration)[0]
+            bg_duration, bg_key = background_key(video_duration)
+            cached = bg_cache.get(bg_key)
+            if cached:
+                print(f"   ♻️  Reusing text-free background {bg_key[:12]}", file=sys.stderr, flush=True)
+                return cached[0]
+            img = self._create_background_image(width, height, scene.get('background_type', 'solid'),
+                                                scene.get('background_value', '#000000'), ai_image_model, scene)
+            background_path = self.temp_dir / f"background_{idx}.mp4"
+            # Effects over the real duration; padded audio, so the clip still runs for its full (rounded up) length
+            self._encode_scene_frames(scene, img, audio_path, background_path, video_duration, 'apad', width, height, idx, tier,
+                                      encode_duration=bg_duration)
+            return bg_cache.put(bg_key, background_path, bg_duration)
+
+        def compose(audio_result, background_path):
+            audio_path, duration = audio_result
+            video_duration, audio_filter = self._scene_timing(scene, duration)
+            video_path = self.temp_dir / f"scene_{idx}.mp4"
+            try:
+                if text_layer == 'overlay':
+                    text_path = TextLayerCache().get(scene['script'], width, height, font_size, self._create_text_layer)
+                    composite_text(
+                        background_path, text_path, audio_path, video_path, video_duration, segment_format, audio_filter,
+                        keyframe_times(video_duration, scene.get('transition_in', 0.0), scene.get('transition_out', 0.0))
+                    )
+                else:
+                    # Text is shown by the player (WebVTT sidecar)
+                    replace_audio(background_path, audio_path, video_path, video_duration, segment_format, audio_filter)
+            except subprocess.CalledProcessError as e:
+                print(f"   ❌ FFmpeg Error: {e.stderr}", file=sys.stderr, flush=True)
+                raise
+            return video_path, self._get_video_duration(video_path)
+
+        background = graph.add(f"background_{idx}", 'encode', render_background, deps=[audio],
+                               inputs=dict(encode_inputs, layer='background'))
+        return graph.add(f"{text_layer}_{idx}", text_layer, compose, deps=[audio, background],
+                         inputs={'text': scene['script'], 'font_size': font_size, 'index': idx})
+
+    def _encode_still_scene(self, frame, audio_path, video_path, video_duration, tier, idx, audio_filter=None):
+        """
+        Fast path for static scenes (image + text + voice, no effects)
+
+        Instead of encoding every frame for the whole TTS duration, encode one
+        STILL_SEGMENT_SECONDS segment (a single GOP starting with an IDR frame),
+        then repeat it with -stream_loop and stream copy and mux the audio on top.
+        """
+        segment_path = self.temp_dir / f"still_{idx}.mp4"
+        segment_seconds = min(self.STILL_SEGMENT_SECONDS, video_duration)
+        segment_frames = max(1, int(round(segment_seconds * tier['fps'])))
+        segment_format = SegmentFormat(frame.width, frame.height, tier)
+
+        cmd_segment = [
+            'ffmpeg', '-y',
+            *raw_frame_input(frame, tier['fps']),
+            '-vf', f"{VideoEffects.still_loop_filter(tier['fps'])},{segment_format.video_filter(frame.size)}",
+            '-frames:v', str(segment_frames),
+            *segment_format.encode_args(gop=segment_frames),  # One GOP per segment, so every repeat starts on a keyframe
+            '-tune', 'stillimage',
+            '-an',
+            str(segment_path)
+        ]
 
-        # Base FFmpeg command
         cmd = [
             'ffmpeg', '-y',
-            '-loop', '1',
-            '-framerate', '30',  # CRITICAL: Set input framerate for zoompan to work with looped images
-            '-i', str(img_path),
+            '-stream_loop', '-1',
+            '-i', str(segment_path),
             '-i', str(audio_path),
-            '-c:v', 'libx264',
+            '-map', '0:v',
+            '-map', '1:a',
+            '-c:v', 'copy',
+            *segment_format.mux_args(),
             '-t', str(video_duration),
-            '-pix_fmt', 'yuv420p',
-        ]
-
-        # Add video filter if effects are present
-        if filter_chain:
-            cmd.extend(['-vf', filter_chain])
-
-        # Add audio codec and speed adjustment for audio if needed
-        if effect_speed != 1.0:
-            # Adjust audio tempo to match video speed
-            audio_filter = f"atempo={effect_speed}" if effect_speed <= 2.0 else f"atempo=2.0,atempo={effect_speed/2.0}"
-            cmd.extend(['-af', audio_filter])
-
-        cmd.extend([
-            '-c:a', 'aac',
-            '-b:a', '192k',
-            '-ar', '44100',  # Force 44.1kHz sample rate for all scenes
-            '-ac', '2',       # Force stereo for all scenes
+            *(['-af', audio_filter] if audio_filter else []),
+            *audio_args(),
             '-shortest',
             str(video_path)
-        ])
-
-        # Log full FFmpeg command for debugging
-        print(f"   🔧 FFmpeg cmd: {' '.join(cmd)}", file=sys.stderr, flush=True)
+        ]
 
-        # Run FFmpeg command
+        print(f"   ⚡ Still scene fast path ({segment_frames}-frame segment, looped)", file=sys.stderr, flush=True)
         try:
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+            run_with_frame(cmd_segment, frame)
+            ffmpeg_scheduler.run(cmd, check=True, capture_output=True, text=True)
         except subprocess.CalledProcessError as e:
             print(f"   ❌ FFmpeg Error: {e.stderr}", file=sys.stderr, flush=True)
             raise
 
-        # Return actual output duration (may differ from input due to effects)
-        actual_duration = self._get_video_duration(video_path)
-
-        return video_path, actual_duration
-
     async def _generate_edge_tts(self, text, output_path):
         """Generate TTS audio using Edge TTS"""
         communicate = edge_tts.Communicate(text, self.tts_voice)
@@ -282,49 +1047,77 @@ class SimpleVideoGenerator:
             print(f"🎤 Using Edge TTS voice: {voice}", file=sys.stderr, flush=True)
             asyncio.run(self._generate_edge_tts(text, output_path))
 
-    def _create_text_image(self, text, width, height, bg_type, bg_value, output_path, ai_image_model='flux-dev', font_size=30, scene=None):
-        """Create image with text"""
-        # Protect against font sizes that are too small for PIL TrueType rendering
-        if font_size <= 0:
-            font_size = 10  # Minimum 10px font size
-        elif font_size < 10:
-            print(f"   ⚠️  Font size {font_size} too small, using minimum 10px", file=sys.stderr, flush=True)
-            font_size = 10
+    def _create_text_image(self, text, width, height, bg_type, bg_value, output_path=None, ai_image_model='flux-dev', font_size=30, scene=None):
+        """
+        Create image with text (returns the RGB image, also saved as JPEG if output_path is given)
 
-        # Always use Replicate AI image for keyword scenes
-        if bg_type == 'keyword' and bg_value:
-            print(f"🎨 Using AI image for keyword: '{bg_value}'", file=sys.stderr, flush=True)
+        text=None renders the background only (text layer drawn separately, see text_layer)
+        """
+        img = self._create_background_image(width, height, bg_type, bg_value, ai_image_model, scene)
 
-            # Check if scene has existing image_path
-            existing_image_path = scene.get('image_path') if scene else None
+        if text is not None:
+            self._draw_text(img, text, width, height, font_size)
 
-            # DEBUG: Log scene data
-            print(f"🔍 DEBUG: scene = {scene}", file=sys.stderr, flush=True)
-            print(f"🔍 DEBUG: existing_image_path = {existing_image_path}", file=sys.stderr, flush=True)
-            if existing_image_path:
-                print(f"🔍 DEBUG: os.path.exists({existing_image_path}) = {os.path.exists(existing_image_path)}", file=sys.stderr, flush=True)
+        if output_path:
+            img.save(output_path, 'JPEG', quality=90)
+        return img
 
-            if existing_image_path and os.path.exists(existing_image_path):
-                # Reuse existing image
-                print(f"♻️  Reusing existing image: {existing_image_path}", file=sys.stderr, flush=True)
-                ai_image_path = existing_image_path
-            else:
-                # Generate new image
-                print(f"🆕 Generating new AI image...", file=sys.stderr, flush=True)
-                ai_image_path = self.image_service.generate_image(bg_value, width, height, model=ai_image_model)
+    def _ai_image_path(self, bg_value, width, height, ai_image_model='flux-dev', scene=None):
+        """
+        AI image file of a keyword scene: the scene's existing image, a checkpointed one, or a new
+        Replicate generation (saved to the scene's database row)
+        """
+        print(f"🎨 Using AI image for keyword: '{bg_value}'", file=sys.stderr, flush=True)
+
+        # Check if scene has existing image_path
+        existing_image_path = scene.get('image_path') if scene else None
+
+        # DEBUG: Log scene data
+        print(f"🔍 DEBUG: scene = {scene}", file=sys.stderr, flush=True)
+        print(f"🔍 DEBUG: existing_image_path = {existing_image_path}", file=sys.stderr, flush=True)
+        if existing_image_path:
+            print(f"🔍 DEBUG: os.path.exists({existing_image_path}) = {os.path.exists(existing_image_path)}", file=sys.stderr, flush=True)
+
+        if existing_image_path and os.path.exists(existing_image_path):
+            # Reuse existing image
+            print(f"♻️  Reusing existing image: {existing_image_path}", file=sys.stderr, flush=True)
+            return existing_image_path
+
+        frame_key = RenderCheckpoint.key(bg_value, width, height, ai_image_model)
+        stored_frame = self.checkpoint.get('frame', frame_key) if self.checkpoint else None
+        if stored_frame:
+            # Generated by an earlier attempt whose database update did not happen
+            print(f"⏯️  Reusing checkpointed image: {stored_frame['path']}", file=sys.stderr, flush=True)
+            return stored_frame['path']
+
+        # Generate new image
+        print(f"🆕 Generating new AI image...", file=sys.stderr, flush=True)
+        ai_image_path = self.image_service.generate_image(bg_value, width, height, model=ai_image_model)
+
+        if not ai_image_path or not os.path.exists(ai_image_path):
+            raise ValueError(f"Failed to get AI image for keyword: '{bg_value}'")
+
+        # The image service keeps its own copy in the image cache, the checkpoint only references it
+        if self.checkpoint:
+            self.checkpoint.put('frame', frame_key, ai_image_path, copy=False)
+
+        # Save image_path to database
+        if scene and scene.get('id'):
+            try:
+                from database.db_manager import DatabaseManager
+                db = DatabaseManager()
+                db.update_scene(scene['id'], {'image_path': ai_image_path})
+                print(f"💾 Saved image_path to database for scene {scene['id']}", file=sys.stderr, flush=True)
+            except Exception as e:
+                print(f"⚠️  Failed to save image_path to database: {e}", file=sys.stderr, flush=True)
 
-                if not ai_image_path or not os.path.exists(ai_image_path):
-                    raise ValueError(f"Failed to get AI image for keyword: '{bg_value}'")
+        return ai_image_path
 
-                # Save image_path to database
-                if scene and scene.get('id'):
-                    try:
-                        from database.db_manager import DatabaseManager
-                        db = DatabaseManager()
-                        db.update_scene(scene['id'], {'image_path': ai_image_path})
-                        print(f"💾 Saved image_path to database for scene {scene['id']}", file=sys.stderr, flush=True)
-                    except Exception as e:
-                        print(f"⚠️  Failed to save image_path to database: {e}", file=sys.stderr, flush=True)
+    def _create_background_image(self, width, height, bg_type, bg_value, ai_image_model='flux-dev', scene=None):
+        """Scene background as an RGB image: AI image for keywords, uploaded image, or black"""
+        # Always use Replicate AI image for keyword scenes
+        if bg_type == 'keyword' and bg_value:
+            ai_image_path = self._ai_image_path(bg_value, width, height, ai_image_model, scene)
 
             # Load AI-generated image
             img = Image.open(ai_image_path)
@@ -349,108 +1142,30 @@ class SimpleVideoGenerator:
             # For non-keyword/non-image scenes, use solid black background
             img = Image.new('RGB', (width, height), (0, 0, 0))
 
-        draw = ImageDraw.Draw(img)
-
-        # Font (use font_size parameter) - platform-agnostic
-        font = None
-        font_paths = []
-
-        # Platform-specific font paths
-        if platform.system() == "Darwin":  # macOS
-            font_paths = [
-                "/System/Library/Fonts/Helvetica.ttc",
-                "/System/Library/Fonts/Arial.ttf",
-                "/System/Library/Fonts/SFNSText.ttf"
-            ]
-        else:  # Linux (Railway)
-            font_paths = [
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-                "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf"
-            ]
-
-        # Try each font path
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                try:
-                    font = ImageFont.truetype(font_path, font_size)
-                    break
-                except Exception as e:
-                    continue
-
-        # Fallback (should never happen if fonts are installed correctly)
-        if font is None:
-            print(f"⚠️  WARNING: No TrueType font found on {platform.system()}, text size may not work correctly", file=sys.stderr, flush=True)
-            font = ImageFont.load_default()
-
-        # Word wrap
-        wrapped_text = self._wrap_text(text, width - 100, font, draw)
-
-        # Center text
-        bbox = draw.multiline_textbbox((0, 0), wrapped_text, font=font, align='center')
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        x = (width - text_width) // 2
-        y = (height - text_height) // 2
-
-        # Draw outline
-        for adj_x in [-2, 0, 2]:
-            for adj_y in [-2, 0, 2]:
-                if adj_x != 0 or adj_y != 0:
-                    draw.multiline_text((x + adj_x, y + adj_y), wrapped_text, font=font, fill=(0, 0, 0), align='center')
-
-        # Draw text
-        draw.multiline_text((x, y), wrapped_text, font=font, fill=(255, 255, 255), align='center')
-
-        img.save(output_path, 'JPEG', quality=90)
-
-    def _wrap_text(self, text, max_width, font, draw):
-        """Word wrap text"""
-        words = text.split()
-        lines = []
-        current_line = []
-
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            if bbox[2] - bbox[0] <= max_width:
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                current_line = [word]
-
-        if current_line:
-            lines.append(' '.join(current_line))
+        # Raw frames are piped as rgb24 (AI/custom images may be RGBA or palette images)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        return img
 
-        return '\n'.join(lines)
+    def _create_text_layer(self, text, width, height, font_size):
+        """Transparent RGBA image with only the text (composited over the background clip)"""
+        layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        self._draw_text(layer, text, width, height, font_size)
+        return layer
 
+    def _draw_text(self, img, text, width, height, font_size):
+        """Draw the wrapped, centered, outlined script text onto img (layout and fonts are cached, see text_layout)"""
+        draw_text(img, text, font_size)
 
     def _get_audio_duration(self, audio_path):
-        """Get audio duration using ffprobe"""
-        cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            str(audio_path)
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return float(result.stdout.strip())
+        """Get audio duration (ffprobe or PyAV, see ENCODE_BACKEND)"""
+        return self.encode_backend.probe_duration(audio_path)
 
     def _get_video_duration(self, video_path):
-        """Get video duration using ffprobe"""
-        cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            str(video_path)
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return float(result.stdout.strip())
+        """Get video duration (ffprobe or PyAV, see ENCODE_BACKEND)"""
+        return self.encode_backend.probe_duration(video_path)
 
-    def _concat_videos_ffmpeg(self, video_paths, output_path, background_music_path=None, background_music_volume=7, video_speed=1.0):
+    def _concat_videos_ffmpeg(self, video_paths, output_path, background_music_path=None, background_music_volume=7, video_speed=1.0, finish_mode=None):
         """
         Concatenate videos using FFmpeg with optional speed control and background music.
 
@@ -460,84 +1175,118 @@ class SimpleVideoGenerator:
         3. Add background music → at NORMAL speed
 
         This ensures music plays at normal speed while video can be sped up/slowed down!
+        In 'single_pass' finish mode all three steps run as one FFmpeg filter graph.
         """
-        # Ensure temp directory exists (may have been cleaned up from previous run)
-        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        graph = RenderGraph()
+        self._add_finish_nodes(graph, video_paths, output_path, background_music_path, background_music_volume, video_speed, finish_mode)
+        graph.run()
+        self.node_timings.extend(graph.timings)
 
-        # Create concat file
-        concat_file = self.temp_dir / "concat.txt"
-        with open(concat_file, 'w') as f:
-            for video_path in video_paths:
-                f.write(f"file '{video_path.absolute()}'\n")
+    def _add_finish_nodes(self, graph, video_paths, output_path, background_music_path=None, background_music_volume=7,
+                          video_speed=1.0, finish_mode=None, segment_keys=None, lookup=None, record=None):
+        """
+        Add the finish steps to a render graph: concat → speed → music mix, or one fused 'finish'
+        node in 'single_pass' mode (see _concat_videos_ffmpeg for the order)
 
-        # STEP 1: Concat videos WITHOUT music (we'll add music later)
-        temp_concat = self.temp_dir / "temp_concat.mp4"
+        Args:
+            segment_keys: Content keys of the segments (default: their paths)
+            lookup/record: Reuse of the final output (render checkpoint)
 
+        Returns:
+            RenderNode: The node writing output_path
+        """
+        if finish_mode is None:
+            finish_mode = os.getenv('RENDER_FINISH_MODE', 'single_pass')
+        has_music = bool(background_music_path and Path(background_music_path).exists())
+        segments = {'segments': segment_keys or [str(path) for path in video_paths]}
+        music = {'music': file_signature(background_music_path) if has_music else None, 'volume': background_music_volume}
+
+        # Ensure temp directory exists (may have been cleaned up from previous run)
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+
+        def concat_file():
+            concat_path = self.temp_dir / "concat.txt"
+            with open(concat_path, 'w') as f:
+                for video_path in video_paths:
+                    f.write(f"file '{Path(video_path).absolute()}'\n")
+            return concat_path
+
+        if finish_mode == 'single_pass':
+            def finish():
+                self._finish_single_pass(concat_file(), output_path, background_music_path, background_music_volume, video_speed)
+                return output_path
+            return graph.add('finish', 'finish', finish, inputs=dict(segments, speed=video_speed, **music),
+                             lookup=lookup, record=record)
+
+        concat = graph.add('concat', 'concat', lambda: self._finish_concat(concat_file(), self.temp_dir / "temp_concat.mp4"),
+                           inputs=segments)
+        working = concat
+        if video_speed != 1.0:
+            working = graph.add('speed', 'speed', lambda path: self._apply_speed(path, self.temp_dir / "temp_speed.mp4", video_speed),
+                                deps=[concat], inputs={'speed': video_speed})
+        return graph.add('music', 'music_mix',
+                         lambda path: self._mix_music(path, output_path, background_music_path if has_music else None, background_music_volume),
+                         deps=[working], inputs=music, lookup=lookup, record=record)
+
+    def _finish_concat(self, concat_file, output_path):
+        """STEP 1: Concat videos WITHOUT music (we'll add music later)"""
         cmd = [
             'ffmpeg', '-y',
             '-f', 'concat',
             '-safe', '0',
             '-i', str(concat_file),
             '-c', 'copy',  # Just concat, no re-encoding yet
-            str(temp_concat)
+            str(output_path)
         ]
 
         print(f"📹 Step 1: Concatenating videos...", file=sys.stderr, flush=True)
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        result = ffmpeg_scheduler.run(cmd, check=True, capture_output=True, text=True)
         if result.stderr:
             print(f"   ⚠️ FFmpeg stderr: {result.stderr[:500]}", file=sys.stderr, flush=True)
+        return output_path
 
-        # STEP 2: Apply video speed (if not 1.0) - THIS AFFECTS VIDEO + TTS!
-        working_file = temp_concat
+    def _apply_speed(self, input_path, output_path, video_speed):
+        """STEP 2: Apply video speed (if not 1.0) - THIS AFFECTS VIDEO + TTS!"""
+        print(f"⚡ Step 2: Applying video speed {video_speed}x...", file=sys.stderr, flush=True)
 
-        if video_speed != 1.0:
-            print(f"⚡ Step 2: Applying video speed {video_speed}x...", file=sys.stderr, flush=True)
-            temp_speed = self.temp_dir / "temp_speed.mp4"
-
-            # FFmpeg speed filters:
-            # - Video: setpts=PTS/SPEED (e.g., 0.87 → slower, 1.5 → faster)
-            # - Audio: atempo=SPEED (limited to 0.5-2.0, chain multiple if needed)
-
-            # Calculate atempo filter (chain if outside 0.5-2.0 range)
-            if 0.5 <= video_speed <= 2.0:
-                atempo_filter = f"atempo={video_speed}"
-            elif video_speed < 0.5:
-                # Chain two atempo filters for speeds < 0.5
-                atempo_filter = f"atempo=0.5,atempo={video_speed/0.5}"
-            else:  # video_speed > 2.0
-                # Chain two atempo filters for speeds > 2.0
-                atempo_filter = f"atempo=2.0,atempo={video_speed/2.0}"
-
-            cmd_speed = [
-                'ffmpeg', '-y',
-                '-i', str(temp_concat),
-                '-filter_complex', f'[0:v]setpts=PTS/{video_speed}[v];[0:a]{atempo_filter}[a]',
-                '-map', '[v]',
-                '-map', '[a]',
-                '-c:v', 'libx264',  # Re-encode video for speed change
-                '-preset', 'veryfast',
-                '-crf', '23',
-                '-c:a', 'aac',  # Re-encode audio for speed change
-                '-b:a', '192k',
-                str(temp_speed)
-            ]
+        # FFmpeg speed filters:
+        # - Video: setpts=PTS/SPEED (e.g., 0.87 → slower, 1.5 → faster)
+        # - Audio: atempo=SPEED (limited to 0.5-2.0, chain multiple if needed)
 
-            result = subprocess.run(cmd_speed, check=True, capture_output=True, text=True)
-            if result.stderr:
-                print(f"   ⚠️ FFmpeg stderr: {result.stderr[:500]}", file=sys.stderr, flush=True)
+        # Calculate atempo filter (chain if outside 0.5-2.0 range)
+        atempo_filter = VideoEffects.atempo_filter(video_speed)
+
+        cmd_speed = [
+            'ffmpeg', '-y',
+            '-i', str(input_path),
+            '-filter_complex', f'[0:v]setpts=PTS/{video_speed}[v];[0:a]{atempo_filter}[a]',
+            '-map', '[v]',
+            '-map', '[a]',
+            '-c:v', 'libx264',  # Re-encode video for speed change
+            '-preset', 'veryfast',
+            '-crf', '23',
+            '-c:a', 'aac',  # Re-encode audio for speed change
+            '-b:a', '192k',
+            str(output_path)
+        ]
+
+        result = ffmpeg_scheduler.run(cmd_speed, check=True, capture_output=True, text=True)
+        if result.stderr:
+            print(f"   ⚠️ FFmpeg stderr: {result.stderr[:500]}", file=sys.stderr, flush=True)
 
-            working_file = temp_speed
-            print(f"   ✓ Video speed adjusted to {video_speed}x", file=sys.stderr, flush=True)
+        print(f"   ✓ Video speed adjusted to {video_speed}x", file=sys.stderr, flush=True)
+        return output_path
 
-        # STEP 3: Add background music (at NORMAL speed!) - AFTER speed adjustment
-        if background_music_path and Path(background_music_path).exists():
+    def _mix_music(self, input_path, output_path, background_music_path=None, background_music_volume=7):
+        """STEP 3: Add background music (at NORMAL speed!) - AFTER speed adjustment"""
+        if background_music_path:
             music_volume = background_music_volume / 100.0
 
             print(f"🎵 Step 3: Adding background music at normal speed (Volume: {background_music_volume}%)...", file=sys.stderr, flush=True)
 
             cmd_music = [
                 'ffmpeg', '-y',
-                '-i', str(working_file),  # Video with speed applied
+                '-i', str(input_path),  # Video with speed applied
                 '-stream_loop', '-1',
                 '-i', str(background_music_path),  # Music at NORMAL speed
                 '-filter_complex', f'[1:a]volume={music_volume}[m];[0:a][m]amix=inputs=2:duration=first:normalize=0,volume=2.5',
@@ -548,76 +1297,71 @@ class SimpleVideoGenerator:
                 str(output_path)
             ]
 
-            result = subprocess.run(cmd_music, check=True, capture_output=True, text=True)
+            result = ffmpeg_scheduler.run(cmd_music, check=True, capture_output=True, text=True)
             if result.stderr:
                 print(f"   ⚠️ FFmpeg stderr: {result.stderr[:500]}", file=sys.stderr, flush=True)
         else:
             # No background music, just copy the working file
-            import shutil
-            shutil.copy(working_file, output_path)
+            shutil.copy(input_path, output_path)
 
         print(f"✓ Final video ready: {output_path}", file=sys.stderr, flush=True)
+        return output_path
 
-    def _mix_audio_with_sound_effect(self, tts_audio_path, sound_effect_path, output_path, target_duration, volume_percent=50, offset_percent=0):
+    def _finish_single_pass(self, concat_file, output_path, background_music_path=None, background_music_volume=7, video_speed=1.0):
         """
-        Mix TTS audio with sound effect using FFmpeg
+        Concat, speed change and music mix as ONE FFmpeg invocation (no intermediate files)
+
+        Same order as the multi-pass path: speed applies to video + TTS, music is mixed
+        in afterwards at normal speed. Video is only re-encoded when the speed changes.
+        """
+        has_music = bool(background_music_path and Path(background_music_path).exists())
 
-        Args:
-            tts_audio_path: Path to TTS audio (voice)
-            sound_effect_path: Path to sound effect
-            output_path: Output path for mixed audio
-            target_duration: Target duration in seconds
-            volume_percent: Sound effect volume (0-100%), default 50%
-            offset_percent: Sound effect timing offset (0-100%), default 0% (start)
-        """
-        # Convert percentage to FFmpeg volume value (0.0-1.0)
-        volume = volume_percent / 100.0
-
-        # Calculate delay in milliseconds based on offset percentage
-        # 0% = start (0ms delay), 50% = middle, 100% = end
-        delay_ms = int(target_duration * (offset_percent / 100.0) * 1000)
-
-        # ROBUST APPROACH: Use amerge + pan filters to mix audio
-        # This approach is more reliable than amix for different duration inputs
-
-        # ROBUST APPROACH: Normalize both audio streams to same format before mixing
-        # TTS is often mono 24kHz, sound effects can be stereo 44.1kHz
-        # We need to convert both to the same format (44.1kHz stereo) before mixing
-        # Output as MP3 format (not AAC) for compatibility with rest of pipeline
         cmd = [
             'ffmpeg', '-y',
-            '-i', str(tts_audio_path),      # Input 0: TTS voice
-            '-i', str(sound_effect_path),   # Input 1: Sound effect
-            '-filter_complex',
-            # Normalize TTS to 44.1kHz stereo
-            '[0:a]aresample=44100,aformat=channel_layouts=stereo[tts];'
-            # Normalize sound effect to 44.1kHz stereo, apply delay (timing offset), then volume
-            # NO LOOP - sound effect plays once at specified timing
-            f'[1:a]aresample=44100,aformat=channel_layouts=stereo,adelay={delay_ms}|{delay_ms},volume={volume}[sfx];'
-            # Mix both streams WITHOUT auto-normalization (keeps TTS at 100%, SFX at specified volume)
-            '[tts][sfx]amix=inputs=2:duration=first:dropout_transition=3:normalize=0[out]',
-            '-map', '[out]',
-            '-t', str(target_duration),     # Trim to target duration
-            '-c:a', 'libmp3lame',          # Use MP3 codec for MP3 container
-            '-b:a', '192k',
-            '-ar', '44100',                 # Output sample rate
-            str(output_path)
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', str(concat_file),
         ]
+        if has_music:
+            cmd.extend(['-stream_loop', '-1', '-i', str(background_music_path)])
 
-        try:
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-            print(f"   ✓ Audio mixed successfully", file=sys.stderr, flush=True)
-        except subprocess.CalledProcessError as e:
-            # Log the actual error for debugging
-            print(f"   ⚠️ Audio mixing failed: {e.stderr if e.stderr else str(e)}", file=sys.stderr, flush=True)
-            print(f"   ℹ️ Using TTS only (without sound effect)", file=sys.stderr, flush=True)
-            # Fallback: copy TTS audio as is
-            import shutil
-            shutil.copy(tts_audio_path, output_path)
+        graph = []
+        audio_label = '0:a'
+
+        if video_speed != 1.0:
+            audio_label = 'sa' if has_music else 'a'
+            graph.append(f'[0:v]setpts=PTS/{video_speed}[v]')
+            graph.append(f'[0:a]{VideoEffects.atempo_filter(video_speed)}[{audio_label}]')
+
+        if has_music:
+            music_volume = background_music_volume / 100.0
+            graph.append(f'[1:a]volume={music_volume}[m]')
+            graph.append(f'[{audio_label}][m]amix=inputs=2:duration=first:normalize=0,volume=2.5[a]')
+
+        if not graph:
+            # Nothing to filter: pure stream copy
+            cmd.extend(['-c', 'copy'])
+        else:
+            cmd.extend(['-filter_complex', ';'.join(graph)])
+            if video_speed != 1.0:
+                cmd.extend(['-map', '[v]', '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23'])
+            else:
+                cmd.extend(['-map', '0:v', '-c:v', 'copy'])
+            cmd.extend(['-map', '[a]', '-c:a', 'aac', '-b:a', '192k'])
+            if has_music:
+                cmd.append('-shortest')
+
+        cmd.append(str(output_path))
+
+        print(f"📹 Single-pass finish (speed: {video_speed}x, music: {'yes' if has_music else 'no'})...", file=sys.stderr, flush=True)
+        result = ffmpeg_scheduler.run(cmd, check=True, capture_output=True, text=True)
+        if result.stderr:
+            print(f"   ⚠️ FFmpeg stderr: {result.stderr[:500]}", file=sys.stderr, flush=True)
+
+        print(f"✓ Final video ready: {output_path}", file=sys.stderr, flush=True)
 
     def cleanup_temp_files(self):
-        """Clean up temp files"""
-        import shutil
-        if self.temp_dir.exists():
+        """Clean up temp files (never the shared workspace root other jobs render into)"""
+        if self.temp_dir != DISK_ROOT and self.temp_dir.exists():
             shutil.rmtree(self.temp_dir)
             self.temp_dir.mkdir(exist_ok=True)
@@ -0,0 +1,200 @@
+"""
+Text Layer
+Keeps the script text out of the scene pixels: previews can show it as a WebVTT sidecar, exports
+composite a cached transparent text PNG over a cached text-free background clip
+"""
+import os
+import sys
+import json
+import math
+import hashlib
+import tempfile
+from pathlib import Path
+
+from services import ffmpeg_scheduler
+from services.scene_cache import SceneClipCache
+from services.segment_format import audio_args
+from services.transitions import keyframe_args
+
+# 'burned': text drawn into the frame (one encode per scene, any text edit re-renders it)
+# 'sidecar': text-free clip + WebVTT captions drawn by the player (previews)
+# 'overlay': text-free background clip + text PNG composited in a second pass (opt-in; the text
+#            does not follow zoom/pan/rotate and a cold scene is encoded twice)
+TEXT_LAYER_MODES = ('burned', 'sidecar', 'overlay')
+
+# Scene fields that only affect the text or the audio, not the background pixels
+NON_BACKGROUND_FIELDS = ('script', 'sound_effect_path', 'sound_effect_volume', 'sound_effect_offset')
+
+# Bump when the text layer rendering changes, so cached PNGs are regenerated
+TEXT_LAYER_VERSION = 2
+
+
+def get_text_layer_mode(mode=None, export=False):
+    """
+    Resolve the text layer mode of a render
+
+    Args:
+        mode: One of TEXT_LAYER_MODES or None
+        export: Export render (default: EXPORT_TEXT_LAYER env or 'burned') instead of a preview
+                (default: PREVIEW_TEXT_LAYER env or 'burned')
+    """
+    if mode is None:
+        if export:
+            mode = os.getenv('EXPORT_TEXT_LAYER', 'burned')
+        else:
+            mode = os.getenv('PREVIEW_TEXT_LAYER', 'burned')
+    mode = mode.lower()
+    return mode if mode in TEXT_LAYER_MODES else 'burned'
+
+
+def background_duration(video_duration):
+    """
+    Length the text-free background is encoded at: rounded up to TEXT_BACKGROUND_STEP seconds
+    (default 0.5), so text edits that shift the TTS length by a few frames still reuse it
+
+    Only the loop is padded; effects are laid out over the real scene duration (see
+    background_fingerprint).
+    """
+    step = float(os.getenv('TEXT_BACKGROUND_STEP', 0.5))
+    if step <= 0:
+        return video_duration
+    return math.ceil(video_duration / step - 1e-9) * step
+
+
+def background_fingerprint(scene, width, height, ai_image_model, duration, extra=None, effect_duration=None):
+    """
+    Cache key of a scene's text-free background clip (script and audio fields excluded)
+
+    Args:
+        duration: Encoded (padded) length, see background_duration()
+        effect_duration: Real scene duration, for backgrounds whose pixels depend on it (timed effects,
+                         transition keyframes); None if they don't
+    """
+    background = {key: value for key, value in scene.items() if key not in NON_BACKGROUND_FIELDS}
+    extra = dict(extra or {}, layer='background', duration=round(duration, 3))
+    if effect_duration is not None:
+        extra['effect_duration'] = round(effect_duration, 3)
+    return SceneClipCache.fingerprint(background, None, width, height, ai_image_model, None, extra=extra)
+
+
+class TextLayerCache:
+    """Disk cache of transparent text PNGs keyed by text, font size and frame size"""
+
+    def __init__(self, layer_dir=None):
+        """
+        Args:
+            layer_dir: Cache directory (default: TEXT_LAYER_DIR env or <tmp>/video_editor_text_layers)
+        """
+        if layer_dir is None:
+            layer_dir = os.getenv('TEXT_LAYER_DIR') or Path(tempfile.gettempdir()) / 'video_editor_text_layers'
+        self.layer_dir = Path(layer_dir)
+        self.layer_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, text, width, height, font_size, render):
+        """
+        Get the text PNG, rendering it on first use
+
+        Args:
+            render: Callable (text, width, height, font_size) -> RGBA PIL image
+
+        Returns:
+            Path: .png file
+        """
+        payload = json.dumps({'version': TEXT_LAYER_VERSION, 'text': text, 'size': [width, height],
+                              'font_size': font_size}, sort_keys=True)
+        key = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+        layer_path = self.layer_dir / f"{key}.png"
+        if layer_path.exists():
+            return layer_path
+
+        tmp_path = self.layer_dir / f".{key}.{os.getpid()}.png.tmp"
+        render(text, width, height, font_size).save(tmp_path, 'PNG')
+        os.replace(tmp_path, layer_path)
+        return layer_path
+
+
+def composite_text(background_path, text_path, audio_path, output_path, duration, segment_format,
+                   audio_filter=None, keyframe_times=None):
+    """
+    Overlay the text PNG on the background clip and mux the scene audio (one cheap encode, no effects)
+
+    Args:
+        background_path: Text-free background clip (its audio is ignored)
+        text_path: Transparent text PNG
+        audio_path: Scene audio
+        duration: Scene video duration in seconds
+        segment_format: SegmentFormat of the job
+        audio_filter: Audio filter chain (atempo for speed effects) or None
+        keyframe_times: Times that must start a GOP (transition windows)
+    """
+    cmd = [
+        'ffmpeg', '-y',
+        '-i', str(background_path),
+        '-loop', '1', '-framerate', str(segment_format.fps), '-i', str(text_path),
+        '-i', str(audio_path),
+        '-filter_complex', '[0:v][1:v]overlay=0:0:shortest=1,format=yuv420p[v]',
+        '-map', '[v]',
+        '-map', '2:a',
+        *segment_format.encode_args(),
+        '-t', str(duration),
+    ]
+    if audio_filter:
+        cmd.extend(['-af', audio_filter])
+    cmd.extend(keyframe_args(keyframe_times))
+    cmd.extend([*audio_args(), '-shortest', str(output_path)])
+
+    print("   🔤 Text overlay pass on cached background", file=sys.stderr, flush=True)
+    ffmpeg_scheduler.run(cmd, check=True, capture_output=True, text=True)
+    return output_path
+
+
+def replace_audio(background_path, audio_path, output_path, duration, segment_format, audio_filter=None):
+    """Stream-copy the background video, trimmed to the scene duration, with the scene audio"""
+    cmd = [
+        'ffmpeg', '-y',
+        '-i', str(background_path),
+        '-i', str(audio_path),
+        '-map', '0:v',
+        '-map', '1:a',
+        '-c:v', 'copy',
+        *segment_format.mux_args(),
+        '-t', str(duration),
+    ]
+    if audio_filter:
+        cmd.extend(['-af', audio_filter])
+    cmd.extend([*audio_args(), '-shortest', str(output_path)])
+
+    ffmpeg_scheduler.run(cmd, check=True, capture_output=True, text=True)
+    return output_path
+
+
+def _vtt_timestamp(seconds):
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+def write_webvtt(cues, output_path):
+    """
+    Write a WebVTT caption file
+
+    Args:
+        cues: List of (start, end, text) in seconds
+        output_path: .vtt file
+    """
+    lines = ['WEBVTT', '']
+    for number, (start, end, text) in enumerate(cues, 1):
+        if not text or end <= start:
+            continue
+        lines.append(str(number))
+        lines.append(f"{_vtt_timestamp(start)} --> {_vtt_timestamp(end)}")
+        # A blank line ends a cue, so collapse the script's paragraph breaks
+        lines.extend(line.replace('-->', '->') for line in text.strip().splitlines() if line.strip())
+        lines.append('')
+
+    tmp_path = Path(output_path).with_suffix('.vtt.tmp')
+    tmp_path.write_text('\n'.join(lines), encoding='utf-8')
+    os.replace(tmp_path, output_path)
+    return output_path
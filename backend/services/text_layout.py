@@ -0,0 +1,149 @@
+"""
+Text Layout
+Scene text layout with cached fonts: every word is measured once, lines are wrapped greedily
+in linear time and the outlined text is drawn with a single stroked call
+"""
+import os
+import sys
+import platform
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+
+# Candidate fonts per platform, first existing one wins
+FONT_PATHS = {
+    'Darwin': [
+        "/System/Library/Fonts/Helvetica.ttc",
+        "/System/Library/Fonts/Arial.ttf",
+        "/System/Library/Fonts/SFNSText.ttf"
+    ],
+    # Linux (Railway)
+    'default': [
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf"
+    ],
+}
+
+# Outline around the text in pixels
+STROKE_WIDTH = 2
+
+# Horizontal space kept free around the text block
+TEXT_MARGIN = 100
+
+# PIL TrueType rendering breaks down below this size
+MIN_FONT_SIZE = 10
+
+
+@lru_cache(maxsize=None)
+def font_path():
+    """First installed font of this platform's candidates (None if none is installed)"""
+    for path in FONT_PATHS.get(platform.system(), FONT_PATHS['default']):
+        if os.path.exists(path):
+            return path
+    print(f"⚠️  WARNING: No TrueType font found on {platform.system()}, text size may not work correctly", file=sys.stderr, flush=True)
+    return None
+
+
+@lru_cache(maxsize=32)
+def load_font(path, size):
+    """Loaded font, cached by (path, size)"""
+    if path is None:
+        return ImageFont.load_default()
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+class TextLayout:
+    """Wrapped lines of a text and the size of the drawn block (outline included)"""
+
+    def __init__(self, text, width, height, offset):
+        self.text = text
+        self.width = width
+        self.height = height
+        self.offset = offset
+
+
+# Scratch surface for measuring multiline blocks
+_measure = ImageDraw.Draw(Image.new('L', (1, 1)))
+
+
+def wrap_words(words, widths, space_width, max_width):
+    """
+    Greedy line breaking over pre-measured words (one pass, no re-measuring of growing lines)
+
+    Args:
+        words: Words in order
+        widths: Advance width per word
+        space_width: Advance width of a space
+        max_width: Maximum line width
+
+    Returns:
+        list: Lines (a word wider than max_width gets its own line)
+    """
+    lines = []
+    current = []
+    current_width = 0.0
+    for word, word_width in zip(words, widths):
+        line_width = current_width + space_width + word_width if current else word_width
+        if current and line_width > max_width:
+            lines.append(' '.join(current))
+            current = [word]
+            current_width = word_width
+        else:
+            current.append(word)
+            current_width = line_width
+    if current:
+        lines.append(' '.join(current))
+    return lines
+
+
+@lru_cache(maxsize=512)
+def layout_text(text, path, size, max_width, stroke_width=STROKE_WIDTH):
+    """
+    Wrap and measure a text, cached by (text, font, size, width)
+
+    Returns:
+        TextLayout
+    """
+    font = load_font(path, size)
+    words = text.split()
+    word_widths = {}
+    for word in words:
+        if word not in word_widths:
+            word_widths[word] = font.getlength(word)
+
+    lines = wrap_words(words, [word_widths[word] for word in words], font.getlength(' '), max_width)
+    wrapped = '\n'.join(lines)
+
+    bbox = _measure.multiline_textbbox((0, 0), wrapped, font=font, align='center', stroke_width=stroke_width)
+    return TextLayout(wrapped, bbox[2] - bbox[0], bbox[3] - bbox[1], (bbox[0], bbox[1]))
+
+
+def draw_text(img, text, font_size):
+    """
+    Draw the script text wrapped, centered and outlined onto img (RGB or RGBA)
+
+    Args:
+        img: PIL image of the frame size
+        text: Script text
+        font_size: Font size in pixels
+    """
+    if font_size < MIN_FONT_SIZE:
+        if font_size > 0:
+            print(f"   ⚠️  Font size {font_size} too small, using minimum {MIN_FONT_SIZE}px", file=sys.stderr, flush=True)
+        font_size = MIN_FONT_SIZE
+
+    width, height = img.size
+    path = font_path()
+    layout = layout_text(text, path, font_size, width - TEXT_MARGIN)
+
+    # Center the block, outline included
+    x = (width - layout.width) // 2 - layout.offset[0]
+    y = (height - layout.height) // 2 - layout.offset[1]
+
+    ImageDraw.Draw(img).multiline_text(
+        (x, y), layout.text, font=load_font(path, font_size), fill=(255, 255, 255), align='center',
+        stroke_width=STROKE_WIDTH, stroke_fill=(0, 0, 0)
+    )
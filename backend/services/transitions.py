@@ -0,0 +1,238 @@
+"""
+Scene Transitions
+Smart-rendered xfade/acrossfade transitions: only a short window around each cut is re-encoded,
+the rest of every scene is stream-copied
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from services import ffmpeg_scheduler
+from services.ffmpeg_scheduler import default_workers
+from services.segment_format import SegmentFormat, audio_args
+
+# Supported transition_type values ('none' = hard cut); names are FFmpeg xfade transitions
+TRANSITION_TYPES = [
+    'none', 'fade', 'dissolve', 'fadeblack', 'fadewhite',
+    'wipeleft', 'wiperight', 'wipeup', 'wipedown',
+    'slideleft', 'slideright', 'slideup', 'slidedown',
+    'circleopen', 'circleclose', 'radial', 'smoothleft', 'smoothright',
+]
+
+# A transition needs room for the incoming, the outgoing and a copied body: scene >= 3 x duration
+MIN_SCENE_TRANSITIONS = 3
+
+
+def scene_transition(scene):
+    """
+    Outgoing transition of a scene
+
+    Returns:
+        tuple: (transition_type, duration in seconds) or ('none', 0.0)
+    """
+    transition_type = scene.get('transition_type') or 'none'
+    duration = scene.get('transition_duration') or 0.0
+    if transition_type not in TRANSITION_TYPES or transition_type == 'none' or duration <= 0:
+        return 'none', 0.0
+    return transition_type, float(duration)
+
+
+def keyframe_times(duration, transition_in=0.0, transition_out=0.0):
+    """
+    Times where the transition windows start and end, so everything between them can be stream-copied
+
+    Args:
+        duration: Scene clip duration in seconds
+        transition_in: Duration of the transition into this scene
+        transition_out: Duration of the transition out of this scene
+
+    Returns:
+        list: Sorted keyframe times in seconds
+    """
+    times = []
+    if transition_in > 0:
+        times.append(transition_in)
+    if transition_out > 0 and duration - transition_out > 0:
+        times.append(duration - transition_out)
+    return sorted(set(times))
+
+
+def keyframe_args(times):
+    """FFmpeg output arguments that force keyframes at the given times"""
+    if not times:
+        return []
+    return ['-force_key_frames', ','.join(f"{t:.3f}" for t in times)]
+
+
+class TransitionRenderer:
+    """Turns scene clips + transitions into a list of segments for the stream-copy concat"""
+
+    def __init__(self, work_dir, quality_tier, max_workers=None):
+        """
+        Args:
+            work_dir: Job workspace for boundary and body segments
+            quality_tier: Quality tier dict (see render_quality) for the boundary encodes
+            max_workers: Parallel boundary encodes (default: SCENE_RENDER_WORKERS env or the FFMPEG_SLOTS count)
+        """
+        self.work_dir = work_dir
+        self.tier = quality_tier
+        if max_workers is None:
+            max_workers = int(os.getenv('SCENE_RENDER_WORKERS', default_workers()))
+        self.max_workers = max(1, max_workers)
+
+    @staticmethod
+    def _keyframes(video_path):
+        """Keyframe timestamps of a clip (only keyframes are decoded)"""
+        cmd = [
+            'ffprobe', '-v', 'error',
+            '-select_streams', 'v:0',
+            '-skip_frame', 'nokey',
+            '-show_entries', 'frame=pts_time',
+            '-of', 'csv=p=0',
+            str(video_path)
+        ]
+        result = ffmpeg_scheduler.run(cmd, capture_output=True, text=True, check=True)
+        times = []
+        for line in result.stdout.split():
+            try:
+                times.append(float(line.strip(',')))
+            except ValueError:
+                continue
+        return sorted(times) or [0.0]
+
+    def plan(self, clips, transitions):
+        """
+        Decide the cut points of every scene
+
+        Args:
+            clips: List of (video_path, duration) in timeline order
+            transitions: Outgoing (type, duration) per clip (the last one is ignored)
+
+        Returns:
+            list: Per clip dict with head (copy starts), tail (copy ends) and the outgoing transition
+        """
+        transitions = list(transitions[:len(clips) - 1]) + [('none', 0.0)]
+
+        # Hard cut where a neighbour is too short for the transition
+        for i, (transition_type, duration) in enumerate(transitions[:-1]):
+            if transition_type == 'none':
+                continue
+            if min(clips[i][1], clips[i + 1][1]) < MIN_SCENE_TRANSITIONS * duration:
+                print(f"   ✂️  Scene {i + 1}->{i + 2}: too short for a {duration}s {transition_type}, hard cut", file=sys.stderr, flush=True)
+                transitions[i] = ('none', 0.0)
+
+        plans = []
+        for i, (video_path, duration) in enumerate(clips):
+            transition_in = transitions[i - 1][1] if i > 0 else 0.0
+            transition_out = transitions[i][1]
+            keyframes = self._keyframes(video_path) if transition_in or transition_out else [0.0]
+
+            # Copy from the first keyframe after the incoming window to the last keyframe before the outgoing one
+            head = min((t for t in keyframes if t >= transition_in - 0.001), default=duration) if transition_in else 0.0
+            tail = max((t for t in keyframes if t <= duration - transition_out + 0.001), default=0.0) if transition_out else duration
+
+            plans.append({
+                'path': video_path,
+                'duration': duration,
+                'head': head,
+                'tail': tail,
+                'transition': transitions[i],
+            })
+
+        # Windows that overlap (no keyframe between them): drop the outgoing transition
+        for i, plan in enumerate(plans[:-1]):
+            if plan['transition'][0] != 'none' and plan['tail'] < plan['head']:
+                print(f"   ✂️  Scene {i + 1}->{i + 2}: no keyframe for the transition window, hard cut", file=sys.stderr, flush=True)
+                plan['transition'] = ('none', 0.0)
+                plan['tail'] = plan['duration']
+                plans[i + 1]['head'] = 0.0
+
+        return plans
+
+    def _cut_body(self, plan, idx):
+        """Stream-copy the video between head and tail (audio is re-encoded so it cuts sample-exact)"""
+        if plan['head'] <= 0 and plan['tail'] >= plan['duration']:
+            return plan['path']
+
+        body_path = self.work_dir / f"body_{idx}.mp4"
+        cmd = [
+            'ffmpeg', '-y',
+            '-ss', f"{plan['head']:.3f}",
+            '-to', f"{plan['tail']:.3f}",
+            '-i', str(plan['path']),
+            '-c:v', 'copy',
+            *SegmentFormat.mux_args(),
+            *audio_args(),
+            str(body_path)
+        ]
+        ffmpeg_scheduler.run(cmd, check=True, capture_output=True, text=True)
+        return body_path
+
+    def _encode_boundary(self, outgoing, incoming, idx):
+        """Re-encode outgoing's tail and incoming's head, joined by xfade + acrossfade"""
+        transition_type, duration = outgoing['transition']
+        tail_length = outgoing['duration'] - outgoing['tail']
+        boundary_path = self.work_dir / f"transition_{idx}.mp4"
+        fps = self.tier['fps']
+
+        filter_complex = (
+            f"[0:v]settb=AVTB,fps={fps},setpts=PTS-STARTPTS[va];"
+            f"[1:v]settb=AVTB,fps={fps},setpts=PTS-STARTPTS[vb];"
+            f"[va][vb]xfade=transition={transition_type}:duration={duration}:offset={tail_length - duration:.3f},setsar=1,format=yuv420p[v];"
+            f"[0:a]asetpts=PTS-STARTPTS[aa];"
+            f"[1:a]asetpts=PTS-STARTPTS[ab];"
+            f"[aa][ab]acrossfade=d={duration}[a]"
+        )
+        cmd = [
+            'ffmpeg', '-y',
+            '-ss', f"{outgoing['tail']:.3f}",
+            '-i', str(outgoing['path']),
+            '-t', f"{incoming['head']:.3f}",
+            '-i', str(incoming['path']),
+            '-filter_complex', filter_complex,
+            '-map', '[v]',
+            '-map', '[a]',
+            '-c:v', 'libx264',
+            '-preset', self.tier['preset'],
+            '-crf', str(self.tier['crf']),
+            '-pix_fmt', 'yuv420p',
+            *SegmentFormat.mux_args(),
+            *audio_args(),
+            str(boundary_path)
+        ]
+        ffmpeg_scheduler.run(cmd, check=True, capture_output=True, text=True)
+        return boundary_path
+
+    def render(self, clips, transitions):
+        """
+        Build the segment list for the concat
+
+        Args:
+            clips: List of (video_path, duration) in timeline order
+            transitions: Outgoing (type, duration) per clip
+
+        Returns:
+            tuple: (segment paths in order, per clip duration it contributes to the timeline)
+        """
+        plans = self.plan(clips, transitions)
+        boundaries = [i for i, plan in enumerate(plans[:-1]) if plan['transition'][0] != 'none']
+        if not boundaries:
+            return [path for path, _ in clips], [duration for _, duration in clips]
+
+        print(f"🎞️  Rendering {len(boundaries)} transitions (boundary windows only)", file=sys.stderr, flush=True)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            body_futures = [pool.submit(self._cut_body, plan, i) for i, plan in enumerate(plans)]
+            boundary_futures = {i: pool.submit(self._encode_boundary, plans[i], plans[i + 1], i) for i in boundaries}
+            bodies = [future.result() for future in body_futures]
+            boundary_paths = {i: future.result() for i, future in boundary_futures.items()}
+
+        segments = []
+        for i, body in enumerate(bodies):
+            # Scenes that are all transition (exactly 2 windows long) have no body left
+            if plans[i]['tail'] - plans[i]['head'] > 0.001:
+                segments.append(body)
+            if i in boundary_paths:
+                segments.append(boundary_paths[i])
+
+        # Each transition overlaps two scenes, so the outgoing scene loses that much timeline time
+        timeline = [plan['duration'] - plan['transition'][1] for plan in plans]
+        return segments, timeline
@@ -2,25 +2,42 @@
 Video Effects Module
 Generates FFmpeg filter chains for various video effects
 """
+import sys
+import math
+from services.effect_graph import EffectGraph, MAIN_LABEL
+from services.noise_plates import NoisePlates, noise_plates_enabled
+
 
 class VideoEffects:
     """Handles generation of FFmpeg video filter strings"""
 
+    # Scale of the pan-only crop window (it always shows 1/3.5 of the image)
+    PAN_FRAMING_SCALE = 3.5
+
+    # zoompan places its crop window on whole input pixels; at zoom z and supersample s one
+    # input pixel is z/s output pixels, so keep that step at or below this for smooth motion
+    ZOOMPAN_MAX_STEP = 0.5
+    ZOOMPAN_SUPERSAMPLE_MARGIN = 0.1
+
     @staticmethod
-    def build_filter_chain(scene, width, height, duration):
+    def build_effect_graph(scene, width, height, duration, fps=30, supersample=3.5, include_motion=True):
         """
-        Build complete FFmpeg filter chain for a scene
+        Build the effect graph (see effect_graph) for a scene
 
         Args:
             scene: Scene dict with effect parameters
             width: Video width
             height: Video height
             duration: Video duration in seconds
+            fps: Output frame rate
+            supersample: Upscale factor for zoompan motion (see render_quality tiers)
+            include_motion: False when zoom/pan frames come from another engine (see motion_renderer);
+                            speed and zoom/pan filters are then left out, the frames are already timed
 
         Returns:
-            str: FFmpeg filter chain string (or None if no effects)
+            EffectGraph: Effect stack in application order (empty if no effects)
         """
-        filters = []
+        graph = EffectGraph()
 
         # Get effect parameters with defaults
         effect_zoom = scene.get('effect_zoom', 'none')
@@ -47,128 +64,151 @@ class VideoEffects:
         effect_kaleidoscope = scene.get('effect_kaleidoscope', 0)
 
         # Apply speed effect first (affects timing)
-        if effect_speed != 1.0:
+        if effect_speed != 1.0 and include_motion:
             speed_filter = VideoEffects._speed_filter(effect_speed)
             if speed_filter:
-                filters.append(speed_filter)
+                graph.append(speed_filter)
 
         # Handle zoom and pan together (both use zoompan)
         # If both are present, we need to combine them into one zoompan filter
-        if effect_zoom != 'none' or effect_pan != 'none':
+        if (effect_zoom != 'none' or effect_pan != 'none') and include_motion:
             zoompan_filter = VideoEffects._combined_zoompan_filter(
-                effect_zoom, effect_pan, width, height, duration, effect_intensity
+                effect_zoom, effect_pan, width, height, duration, effect_intensity, fps, supersample
             )
             if zoompan_filter:
-                filters.append(zoompan_filter)
+                graph.append(zoompan_filter)
 
         # Apply motion effects (rotate, bounce, tilt)
         if effect_rotate != 'none':
             rotate_filter = VideoEffects._rotate_filter(effect_rotate, duration)
             if rotate_filter:
-                filters.append(rotate_filter)
+                graph.append(rotate_filter)
 
         if effect_bounce > 0:  # FIXED: Changed from == 1 to > 0
             bounce_filter = VideoEffects._bounce_filter(duration, effect_intensity)
             if bounce_filter:
-                filters.append(bounce_filter)
+                graph.append(bounce_filter)
 
         if effect_tilt_3d != 'none':
             tilt_filter = VideoEffects._tilt_3d_filter(effect_tilt_3d, duration, effect_intensity)
             if tilt_filter:
-                filters.append(tilt_filter)
+                graph.append(tilt_filter)
 
         # Apply shake effect (uses crop, so can be separate)
         if effect_shake > 0:  # FIXED: Changed from == 1 to > 0
             shake_filter = VideoEffects._shake_filter(effect_intensity)
             if shake_filter:
-                filters.append(shake_filter)
+                graph.append(shake_filter)
 
         # Apply color/visual effects
         if effect_saturation != 1.0:  # FIXED: Now FLOAT (was INTEGER before migration)
             print(f"🔍 DEBUG: Applying saturation filter: value={effect_saturation} (type={type(effect_saturation).__name__})", flush=True)
             saturation_filter = VideoEffects._saturation_filter(effect_saturation)
             if saturation_filter:
-                filters.append(saturation_filter)
+                graph.append(saturation_filter)
                 print(f"   FFmpeg saturation filter: {saturation_filter}", flush=True)
 
         if effect_color_temp != 'none':
             print(f"🔍 DEBUG: Applying color_temp filter: value={effect_color_temp} (type={type(effect_color_temp).__name__})", flush=True)
             color_temp_filter = VideoEffects._color_temp_filter(effect_color_temp, effect_intensity)
             if color_temp_filter:
-                filters.append(color_temp_filter)
+                graph.append(color_temp_filter)
                 print(f"   FFmpeg color_temp filter: {color_temp_filter}", flush=True)
 
         if effect_chromatic > 0:  # FIXED: Changed from == 1 to > 0
             chromatic_filter = VideoEffects._chromatic_aberration_filter(effect_intensity)
             if chromatic_filter:
-                filters.append(chromatic_filter)
+                graph.append(chromatic_filter)
 
         if effect_blur != 'none':
-            blur_filter = VideoEffects._blur_filter(effect_blur, effect_intensity)
+            blur_filter = VideoEffects._blur_filter(effect_blur, effect_intensity, fps)
             if blur_filter:
-                filters.append(blur_filter)
+                graph.append(blur_filter)
+
+        # Crops before grain/glitch change the frame size, so noise plates must be scaled to match
+        exact_size = not (effect_shake > 0 or effect_bounce > 0 or effect_chromatic > 0)
 
         if effect_glitch > 0:  # FIXED: Changed from == 1 to > 0
-            glitch_filter = VideoEffects._glitch_filter(effect_intensity)
-            if glitch_filter:
-                filters.append(glitch_filter)
+            if not VideoEffects._add_noise_plate(graph, 'uniform', 10, width, height, fps, exact_size):
+                graph.append(VideoEffects._glitch_filter(effect_intensity))
+            else:
+                graph.append("eq=contrast=1.2")
 
         if effect_vignette != 'none':
             print(f"🔍 DEBUG: Applying vignette filter: value={effect_vignette} (type={type(effect_vignette).__name__})", flush=True)
             vignette_filter = VideoEffects._vignette_filter(effect_vignette, effect_intensity)
             if vignette_filter:
-                filters.append(vignette_filter)
+                graph.append(vignette_filter)
                 print(f"   FFmpeg vignette filter: {vignette_filter}", flush=True)
 
         if effect_film_grain > 0:  # FIXED: Changed from == 1 to > 0
-            film_grain_filter = VideoEffects._film_grain_filter(effect_intensity)
-            if film_grain_filter:
-                filters.append(film_grain_filter)
+            grain_strength = int(20 + (effect_intensity * 40))
+            if not VideoEffects._add_noise_plate(graph, 'gaussian', grain_strength, width, height, fps, exact_size):
+                film_grain_filter = VideoEffects._film_grain_filter(effect_intensity)
+                if film_grain_filter:
+                    graph.append(film_grain_filter)
 
         if effect_light_leaks > 0:  # FIXED: Changed from == 1 to > 0
             light_leaks_filter = VideoEffects._light_leaks_filter(effect_intensity)
             if light_leaks_filter:
-                filters.append(light_leaks_filter)
+                graph.append(light_leaks_filter)
 
         if effect_lens_flare > 0:  # FIXED: Changed from == 1 to > 0
             lens_flare_filter = VideoEffects._lens_flare_filter(effect_intensity)
             if lens_flare_filter:
-                filters.append(lens_flare_filter)
+                graph.append(lens_flare_filter)
 
         if effect_kaleidoscope > 0:  # FIXED: Changed from == 1 to > 0
             kaleidoscope_filter = VideoEffects._kaleidoscope_filter()
             if kaleidoscope_filter:
-                filters.append(kaleidoscope_filter)
+                graph.append(kaleidoscope_filter)
 
         # Apply fade effect (should be last)
         if effect_fade != 'none':
             fade_filter = VideoEffects._fade_filter(effect_fade, duration)
             if fade_filter:
-                filters.append(fade_filter)
+                graph.append(fade_filter)
+
+        return graph
 
-        # Join all filters with comma
-        return ','.join(filters) if filters else None
+    @staticmethod
+    def build_filter_chain(scene, width, height, duration, fps=30, supersample=3.5, include_motion=True):
+        """
+        Build complete FFmpeg filter chain for a scene (unoptimized, see build_effect_graph)
+
+        Returns:
+            str: FFmpeg filter chain string (or None if no effects)
+        """
+        graph = VideoEffects.build_effect_graph(scene, width, height, duration, fps, supersample, include_motion)
+        return graph.to_chain()
 
     @staticmethod
-    def _combined_zoompan_filter(zoom_type, pan_type, width, height, duration, intensity):
+    def _combined_zoompan_filter(zoom_type, pan_type, width, height, duration, intensity, fps=30, supersample=3.5):
         """Combine zoom and pan using scale + crop for reliable movement"""
         # Protect against zero or negative duration
         if duration <= 0:
             duration = 0.1  # Minimum 0.1 seconds
-        frames = int(duration * 30)
+        # Round up: the motion filter is the only frame source, so it must cover the whole scene
+        frames = int(math.ceil(duration * fps))
         if frames <= 0:
             frames = 3  # Minimum 3 frames
         max_scale = 1.0 + (intensity * 0.5)
 
-        # Scale input to 3.5x size to give room for panning and zooming
-        # Using 3.5x provides maximum headroom while maintaining quality
-        scale_factor = 3.5
-        scaled_width = int(width * scale_factor)
-        scaled_height = int(height * scale_factor)
+        # The pan-only crop window shows a fixed 1/3.5 of the image, so it keeps the 3.5x scale
+        # zoompan crops relative to the input size, so it only needs the supersampling its zoom range
+        # requires, capped by the quality tier
+        if zoom_type and zoom_type != 'none':
+            scale_factor = VideoEffects._zoompan_supersample(zoom_type, intensity, supersample)
+        else:
+            scale_factor = VideoEffects.PAN_FRAMING_SCALE
+        scaled_width = int(width * scale_factor) // 2 * 2
+        scaled_height = int(height * scale_factor) // 2 * 2
 
         # Pan distance: 100% of output width for maximum movement at intensity 1.0
         # At intensity 0.5, this gives 50% movement (half the screen width)
-        pan_distance = int(width * intensity)
+        # Expressed in supersampled pixels relative to the 3.5x framing, so motion looks the same at any factor
+        pan_distance = int(width * intensity * scale_factor / VideoEffects.PAN_FRAMING_SCALE)
+        drift = 50 * scale_factor / VideoEffects.PAN_FRAMING_SCALE  # Ken Burns horizontal drift
 
         # CENTER POSITIONS (where crop window starts when centered)
         center_x = int((scaled_width - width) / 2)
@@ -202,7 +242,7 @@ class VideoEffects:
             elif pan_type == 'down':
                 y_expr = f"floor(iw/2-(ih/zoom/2)+on/{frames}*{pan_distance})"
 
-            return f"scale={scaled_width}:{scaled_height}:flags=lanczos,setsar=1,zoompan=z='{zoom_expr}':d={frames}:x='{x_expr}':y='{y_expr}':s={width}x{height}:fps=30"
+            return f"scale={scaled_width}:{scaled_height}:flags=lanczos,setsar=1,zoompan=z='{zoom_expr}':d={frames}:x='{x_expr}':y='{y_expr}':s={width}x{height}:fps={fps}"
 
         # If we have PAN ONLY (no zoom), use crop filter for reliable movement
         elif pan_type and pan_type != 'none':
@@ -228,8 +268,8 @@ class VideoEffects:
                 crop_x = f"'{center_x}'"
                 crop_y = f"'{center_y}'"
 
-            # Scale to 3.5x, then crop a moving window, then scale to output size
-            return f"scale={scaled_width}:{scaled_height}:flags=lanczos,setsar=1,crop={width}:{height}:{crop_x}:{crop_y},scale={width}:{height}:flags=lanczos"
+            # Scale the single input frame to 3.5x once, repeat it with loop, then crop a moving window
+            return f"scale={scaled_width}:{scaled_height}:flags=lanczos,setsar=1,{VideoEffects.still_loop_filter(fps)},crop={width}:{height}:{crop_x}:{crop_y},scale={width}:{height}:flags=lanczos"
 
         # If we have ZOOM ONLY, use zoompan
         elif zoom_type and zoom_type != 'none':
@@ -240,19 +280,53 @@ class VideoEffects:
             elif zoom_type == 'ken_burns':
                 zoom_expr = f"1+({max_scale}-1)*on/{frames}"
                 # Ken Burns has built-in horizontal drift
-                x_expr = f"floor(iw/2-(iw/zoom/2)+sin(on/{frames}*3.14159)*50)"
-                return f"scale={scaled_width}:{scaled_height}:flags=lanczos,setsar=1,zoompan=z='{zoom_expr}':d={frames}:x='{x_expr}':y='floor(ih/2-(ih/zoom/2))':s={width}x{height}:fps=30"
+                x_expr = f"floor(iw/2-(iw/zoom/2)+sin(on/{frames}*3.14159)*{drift})"
+                return f"scale={scaled_width}:{scaled_height}:flags=lanczos,setsar=1,zoompan=z='{zoom_expr}':d={frames}:x='{x_expr}':y='floor(ih/2-(ih/zoom/2))':s={width}x{height}:fps={fps}"
             elif zoom_type == 'pulse':
                 pulse_intensity = 0.1 + (intensity * 0.1)
                 zoom_expr = f"1+{pulse_intensity}*sin(on/{frames}*3.14159*4)"
             else:
                 zoom_expr = "1"
 
-            return f"scale={scaled_width}:{scaled_height}:flags=lanczos,setsar=1,zoompan=z='{zoom_expr}':d={frames}:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':s={width}x{height}:fps=30"
+            return f"scale={scaled_width}:{scaled_height}:flags=lanczos,setsar=1,zoompan=z='{zoom_expr}':d={frames}:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':s={width}x{height}:fps={fps}"
 
         # NO EFFECTS: just scale and return
         return f"scale={width}:{height}:flags=lanczos,setsar=1"
 
+    @staticmethod
+    def _zoompan_supersample(zoom_type, intensity, cap):
+        """
+        Smallest upscale factor that keeps zoompan motion sub-pixel smooth
+
+        Derived from the largest zoom the expression reaches; pan offsets are expressed
+        relative to the scaled size, so they do not need extra resolution.
+        """
+        if zoom_type == 'pulse':
+            max_zoom = 1.0 + 0.1 + (intensity * 0.1)
+        else:
+            max_zoom = 1.0 + (intensity * 0.5)
+        factor = max_zoom / VideoEffects.ZOOMPAN_MAX_STEP + VideoEffects.ZOOMPAN_SUPERSAMPLE_MARGIN
+        return round(min(cap, max(1.0, factor)), 2)
+
+    @staticmethod
+    def still_loop_filter(fps=30):
+        """Repeat a single input frame forever at the given frame rate (the encoder's -t ends it)"""
+        return f"loop=loop=-1:size=1:start=0,setpts=N/({fps}*TB)"
+
+    @staticmethod
+    def has_motion_source(scene):
+        """
+        Check if the scene's filter chain generates its own frames from a single input image
+
+        Zoom/pan chains upscale the still once and then emit every output frame themselves
+        (zoompan with d=frames, or loop + crop), so the image must be fed as ONE frame
+        instead of a looped input that would be decoded and upscaled per frame.
+        """
+        return (
+            scene.get('effect_zoom', 'none') != 'none' or
+            scene.get('effect_pan', 'none') != 'none'
+        )
+
     @staticmethod
     def _zoom_filter(zoom_type, width, height, duration, intensity):
         """Generate zoom filter"""
@@ -344,6 +418,24 @@ class VideoEffects:
         pts_multiplier = 1.0 / speed
         return f"setpts={pts_multiplier}*PTS"
 
+    @staticmethod
+    def atempo_filter(speed):
+        """Generate audio tempo filter, chaining atempo stages to stay within its 0.5-2.0 range"""
+        # Protect against division by zero
+        if speed <= 0:
+            speed = 1.0
+
+        stages = []
+        remaining = speed
+        while remaining > 2.0:
+            stages.append("atempo=2.0")
+            remaining /= 2.0
+        while remaining < 0.5:
+            stages.append("atempo=0.5")
+            remaining /= 0.5
+        stages.append(f"atempo={remaining}")
+        return ','.join(stages)
+
     @staticmethod
     def _shake_filter(intensity):
         """Generate shake/vibrate filter"""
@@ -418,6 +510,30 @@ class VideoEffects:
         grain_strength = int(20 + (intensity * 40))  # 20 to 60
         return f"noise=alls={grain_strength}:allf=t"
 
+    @staticmethod
+    def _add_noise_plate(graph, kind, strength, width, height, fps, exact_size=True):
+        """
+        Blend a cached noise loop over the stream instead of generating noise per frame
+
+        Returns:
+            bool: False if plates are disabled or unavailable (caller falls back to the noise filter)
+        """
+        if not noise_plates_enabled():
+            return False
+        try:
+            plate = NoisePlates().plate(kind, width, height, fps, strength)
+        except Exception as e:
+            print(f"⚠️ Noise plate failed, using noise filter: {e}", file=sys.stderr, flush=True)
+            return False
+
+        label = graph.add_input(['-stream_loop', '-1', '-i', str(plate)])
+        blend = "blend=all_mode=grainmerge:shortest=1"
+        if exact_size:
+            graph.append(f"[{MAIN_LABEL}][{label}]{blend}")
+        else:
+            graph.append(f"[{label}][{MAIN_LABEL}]scale2ref[plate][frame];[frame][plate]{blend}")
+        return True
+
     @staticmethod
     def _glitch_filter(intensity):
         """Generate glitch effect (digital artifacts)"""
@@ -439,7 +555,7 @@ class VideoEffects:
         return f"split=3[r][g][b];[r]lutrgb=g=0:b=0,crop=iw-{shift}:ih:0:0[r1];[g]lutrgb=r=0:b=0,crop=iw-{shift}:ih:{half_shift}:0[g1];[b]lutrgb=r=0:g=0,crop=iw-{shift}:ih:{shift}:0[b1];[r1][g1]blend=all_mode=addition[rg];[rg][b1]blend=all_mode=addition"
 
     @staticmethod
-    def _blur_filter(blur_type, intensity):
+    def _blur_filter(blur_type, intensity, fps=30):
         """Generate blur filter"""
         if blur_type == 'gaussian':
             # Gaussian blur
@@ -451,7 +567,7 @@ class VideoEffects:
             return f"boxblur={strength}:1"
         elif blur_type == 'radial':
             # Radial blur (zoom blur from center)
-            return "zoompan=z='zoom+0.002':d=1:fps=30"
+            return f"zoompan=z='zoom+0.002':d=1:fps={fps}"
         return None
 
     @staticmethod
@@ -545,27 +661,39 @@ class VideoEffects:
 
     @staticmethod
     def has_effects(scene):
-        """Check if scene has any effects enabled"""
+        """Check if scene has any effects enabled (same thresholds as build_filter_chain)"""
         return (
             scene.get('effect_zoom', 'none') != 'none' or
             scene.get('effect_pan', 'none') != 'none' or
             scene.get('effect_speed', 1.0) != 1.0 or
-            scene.get('effect_shake', 0) == 1 or
+            scene.get('effect_shake', 0) > 0 or
             scene.get('effect_fade', 'none') != 'none' or
             # New effects
             scene.get('effect_vignette', 'none') != 'none' or
             scene.get('effect_color_temp', 'none') != 'none' or
             scene.get('effect_saturation', 1.0) != 1.0 or
-            scene.get('effect_film_grain', 0) == 1 or
-            scene.get('effect_glitch', 0) == 1 or
-            scene.get('effect_chromatic', 0) == 1 or
+            scene.get('effect_film_grain', 0) > 0 or
+            scene.get('effect_glitch', 0) > 0 or
+            scene.get('effect_chromatic', 0) > 0 or
             scene.get('effect_blur', 'none') != 'none' or
             scene.get('effect_rotate', 'none') != 'none' or
-            scene.get('effect_bounce', 0) == 1 or
+            scene.get('effect_bounce', 0) > 0 or
+            scene.get('effect_tilt_3d', 'none') != 'none' or
+            scene.get('effect_light_leaks', 0) > 0 or
+            scene.get('effect_lens_flare', 0) > 0 or
+            scene.get('effect_kaleidoscope', 0) > 0
+        )
+
+    @staticmethod
+    def has_timed_effects(scene):
+        """Check if any effect is laid out over the clip duration (zoom/pan progress, rotate, bounce, tilt, fade)"""
+        return (
+            scene.get('effect_zoom', 'none') != 'none' or
+            scene.get('effect_pan', 'none') != 'none' or
+            scene.get('effect_rotate', 'none') != 'none' or
+            scene.get('effect_bounce', 0) > 0 or
             scene.get('effect_tilt_3d', 'none') != 'none' or
-            scene.get('effect_light_leaks', 0) == 1 or
-            scene.get('effect_lens_flare', 0) == 1 or
-            scene.get('effect_kaleidoscope', 0) == 1
+            scene.get('effect_fade', 'none') != 'none'
         )
 
     @staticmethod
@@ -0,0 +1,74 @@
+"""
+EffectGraph compiler passes: color op placement and eq/hue fusion
+"""
+import unittest
+
+from services.effect_graph import EffectGraph
+
+
+def compile_chain(chain, width=1080, height=1920, duration=5.0, still_input=False):
+    """Compiled -vf chain of a filter string (LUT baking off, so the result is plain filters)"""
+    return EffectGraph().append(chain).compile(width, height, duration, still_input=still_input, lut_min_ops=0).filter
+
+
+class EqFusionTest(unittest.TestCase):
+
+    def test_contrast_factors_multiply(self):
+        self.assertEqual(compile_chain('eq=contrast=1.1,eq=contrast=1.2'), 'eq=contrast=1.32')
+
+    def test_brightness_offsets_add(self):
+        self.assertEqual(compile_chain('eq=brightness=0.05,eq=brightness=0.1'), 'eq=brightness=0.15')
+
+    def test_hue_saturation_fuses_into_eq(self):
+        self.assertEqual(
+            compile_chain('eq=contrast=1.1,eq=contrast=1.2:brightness=0.05,hue=s=0.5'),
+            'eq=contrast=1.32:brightness=0.05:saturation=0.5'
+        )
+
+    def test_reordering_stages_are_not_fused(self):
+        # eq applies contrast before gamma, so gamma followed by contrast can't become one eq
+        self.assertEqual(compile_chain('eq=gamma=1.2,eq=contrast=1.1'), 'eq=gamma=1.2,eq=contrast=1.1')
+
+    def test_expression_arguments_are_not_fused(self):
+        chain = "eq=contrast=1.1,eq=brightness='0.1*sin(t)'"
+        self.assertEqual(compile_chain(chain), chain)
+
+
+class HueFusionTest(unittest.TestCase):
+
+    def test_rotations_add_and_saturations_multiply(self):
+        self.assertEqual(compile_chain('hue=h=10:s=1.1,hue=h=20:s=2'), 'hue=h=30:s=2.2')
+
+
+class ColorPlacementTest(unittest.TestCase):
+
+    def test_color_op_moves_before_still_loop(self):
+        self.assertEqual(
+            compile_chain('loop=loop=-1:size=1,eq=saturation=1.2', still_input=True),
+            'eq=saturation=1.2,loop=loop=-1:size=1'
+        )
+
+    def test_color_op_moves_after_downscale(self):
+        self.assertEqual(
+            compile_chain('scale=4320:7680,eq=contrast=1.2,scale=1080:1920', width=2160, height=3840),
+            'scale=4320:7680,scale=1080:1920,eq=contrast=1.2'
+        )
+
+    def test_color_op_stays_behind_fill_ops(self):
+        # rotate fills the corners with a color, which the eq must not alter
+        chain = "rotate='PI/6':c=black,eq=contrast=1.2"
+        self.assertEqual(compile_chain(chain), chain)
+
+
+class OutputSizeTest(unittest.TestCase):
+
+    def test_zoompan_output_size(self):
+        graph = EffectGraph().append("scale=2160:3840,setsar=1,zoompan=z='1+on/30':d=150:s=1080x1920:fps=30,eq=contrast=1.1")
+        self.assertEqual(graph.output_size(1080, 1920), (1080, 1920))
+
+    def test_expression_size_is_unknown(self):
+        self.assertIsNone(EffectGraph().append('crop=iw-20:ih-20:10:10').output_size(1080, 1920))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+FFmpegScheduler: thread allocation, command preparation and the slot limit
+"""
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from services.ffmpeg_scheduler import FFmpegScheduler
+
+
+class FFmpegSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lock_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.lock_dir, ignore_errors=True)
+
+    def scheduler(self, slots=2, cpu_budget=3, niceness=0, ionice=False):
+        return FFmpegScheduler(slots=slots, cpu_budget=cpu_budget, niceness=niceness, ionice=ionice,
+                               lock_dir=self.lock_dir)
+
+    def test_whole_budget_is_handed_out(self):
+        scheduler = self.scheduler(slots=2, cpu_budget=3)
+        self.assertEqual([scheduler.slot_threads(index) for index in range(2)], [2, 1])
+        scheduler = self.scheduler(slots=3, cpu_budget=8)
+        self.assertEqual(sum(scheduler.slot_threads(index) for index in range(3)), 8)
+
+    def test_every_slot_gets_a_thread(self):
+        scheduler = self.scheduler(slots=4, cpu_budget=2)
+        self.assertEqual([scheduler.slot_threads(index) for index in range(4)], [1, 1, 1, 1])
+
+    def test_prepare_adds_threads_before_the_output(self):
+        cmd = self.scheduler().prepare(['ffmpeg', '-y', '-i', 'in.mp4', '-c:v', 'libx264', 'out.mp4'], 0)
+        self.assertEqual(cmd, [
+            'ffmpeg', '-filter_threads', '2', '-filter_complex_threads', '2',
+            '-y', '-i', 'in.mp4', '-c:v', 'libx264', '-threads', '2', 'out.mp4'
+        ])
+
+    def test_prepare_keeps_explicit_threads(self):
+        cmd = ['ffmpeg', '-i', 'in.mp4', '-threads', '1', 'out.mp4']
+        self.assertEqual(self.scheduler().prepare(cmd, 0), cmd)
+
+    def test_prepare_leaves_ffprobe_alone(self):
+        cmd = ['ffprobe', '-v', 'error', 'in.mp4']
+        self.assertEqual(self.scheduler().prepare(cmd), cmd)
+
+    def test_prepare_stringifies_arguments(self):
+        cmd = self.scheduler().prepare(['ffprobe', '-show_entries', 'format=duration', tempfile.gettempdir()])
+        self.assertTrue(all(isinstance(arg, str) for arg in cmd))
+
+    def test_priority_prefix(self):
+        cmd = self.scheduler(niceness=10).prepare(['ffprobe', 'in.mp4'])
+        if shutil.which('nice'):
+            self.assertEqual(cmd[:3], ['nice', '-n', '10'])
+        self.assertEqual(cmd[-2:], ['ffprobe', 'in.mp4'])
+
+    def test_slots_limit_concurrency(self):
+        scheduler = self.scheduler(slots=2)
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def job():
+            with scheduler.slot('test'):
+                with lock:
+                    running.append(1)
+                    peak.append(len(running))
+                time.sleep(0.05)
+                with lock:
+                    running.pop()
+
+        threads = [threading.Thread(target=job) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max(peak), 2)
+
+    def test_stats_report_running_slots(self):
+        scheduler = self.scheduler(slots=2)
+        with scheduler.slot('encode'):
+            stats = scheduler.stats()
+        self.assertEqual(stats['slots'], 2)
+        self.assertEqual(stats['threads_per_slot'], [2, 1])
+        if stats['cross_process']:
+            self.assertEqual([entry['label'] for entry in stats['running']], ['encode'])
+        self.assertEqual(stats['queued'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
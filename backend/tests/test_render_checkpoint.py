@@ -0,0 +1,96 @@
+"""
+RenderCheckpoint: resume from recorded stages, torn manifests, concurrent records
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from services.render_checkpoint import RenderCheckpoint, MANIFEST_NAME
+
+
+class RenderCheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.clip = self.root / 'scene_0.mp4'
+        self.clip.write_bytes(b'clip')
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_key_is_stable_and_input_sensitive(self):
+        self.assertEqual(RenderCheckpoint.key('a', 1, {'x': 2}), RenderCheckpoint.key('a', 1, {'x': 2}))
+        self.assertNotEqual(RenderCheckpoint.key('a', 1), RenderCheckpoint.key('a', 2))
+
+    def test_resume_restores_recorded_stages(self):
+        key = RenderCheckpoint.key('scene', 0)
+        RenderCheckpoint('job', self.root).put('scene', key, self.clip, duration=4.2)
+        # The workspace clip is gone after the failed render, the checkpoint kept its own copy
+        self.clip.unlink()
+
+        resumed = RenderCheckpoint('job', self.root)
+        entry = resumed.get('scene', key)
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry['duration'], 4.2)
+        self.assertEqual(Path(entry['path']).read_bytes(), b'clip')
+        self.assertEqual(resumed.summary()['scene'], 1)
+
+    def test_missing_file_is_not_restored(self):
+        key = RenderCheckpoint.key('tts', 0)
+        checkpoint = RenderCheckpoint('job', self.root)
+        entry = checkpoint.put('tts', key, self.clip, copy=False)
+        os.remove(entry['path'])
+        self.assertIsNone(RenderCheckpoint('job', self.root).get('tts', key))
+
+    def test_entries_of_other_processes_are_picked_up(self):
+        reader = RenderCheckpoint('job', self.root)
+        writer = RenderCheckpoint('job', self.root)
+        key = RenderCheckpoint.key('frame', 3)
+        writer.put('frame', key, self.clip)
+        self.assertIsNotNone(reader.get('frame', key))
+
+    def test_torn_last_line_is_skipped_and_next_entry_survives(self):
+        first = RenderCheckpoint.key('scene', 1)
+        RenderCheckpoint('job', self.root).put('scene', first, self.clip)
+        with open(self.root / 'job' / MANIFEST_NAME, 'a') as f:
+            f.write('{"stage": "scene", "key": "torn')
+
+        checkpoint = RenderCheckpoint('job', self.root)
+        second = RenderCheckpoint.key('scene', 2)
+        checkpoint.put('scene', second, self.clip)
+
+        resumed = RenderCheckpoint('job', self.root)
+        self.assertIsNotNone(resumed.get('scene', first))
+        self.assertIsNotNone(resumed.get('scene', second))
+
+    def test_unknown_stage_is_rejected(self):
+        with self.assertRaises(ValueError):
+            RenderCheckpoint('job', self.root).put('upload', 'k', self.clip)
+
+    def test_concurrent_records_of_the_same_key(self):
+        checkpoint = RenderCheckpoint('job', self.root)
+        threads = [threading.Thread(target=checkpoint.put, args=('scene', f"k{n % 3}", self.clip), kwargs={'n': n})
+                   for n in range(30)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(RenderCheckpoint('job', self.root).summary()['scene'], 3)
+        # No temp links left behind, the source clip is untouched
+        self.assertFalse([name for name in os.listdir(checkpoint.path) if name.endswith('.tmp')])
+        self.assertEqual(self.clip.read_bytes(), b'clip')
+
+    def test_clear_after_complete_render(self):
+        checkpoint = RenderCheckpoint('job', self.root)
+        checkpoint.put('finish', 'k', self.clip)
+        checkpoint.clear()
+        self.assertFalse(checkpoint.path.exists())
+        self.assertIsNone(RenderCheckpoint('job', self.root).get('finish', 'k'))
+
+
+if __name__ == '__main__':
+    unittest.main()
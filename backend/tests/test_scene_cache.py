@@ -0,0 +1,66 @@
+"""
+SceneClipCache: fingerprints of AI image scenes, segment probe results of cached clips
+"""
+import hashlib
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from services.scene_cache import SceneClipCache
+
+
+class FingerprintTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.scene = {'id': 1, 'script': 'Hallo', 'background_type': 'keyword', 'background_value': 'ocean'}
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def key(self, scene):
+        return SceneClipCache.fingerprint(scene, 'nova', 1080, 1920, 'flux-dev')
+
+    def image(self, name, data=b'jpg'):
+        path = self.root / name
+        path.write_bytes(data)
+        return str(path)
+
+    def test_saved_back_generated_image_keeps_the_key(self):
+        name = hashlib.md5(b'ocean_1080_1920_flux-dev').hexdigest() + '.jpg'
+        saved = dict(self.scene, image_path=self.image(name))
+        self.assertEqual(self.key(saved), self.key(self.scene))
+
+    def test_other_image_changes_the_key(self):
+        pinned = dict(self.scene, image_path=self.image('regenerated.jpg'))
+        self.assertNotEqual(self.key(pinned), self.key(self.scene))
+
+    def test_image_path_of_other_backgrounds_is_ignored(self):
+        scene = dict(self.scene, background_type='solid', background_value='#000000')
+        self.assertEqual(self.key(dict(scene, image_path=self.image('old.jpg'))), self.key(scene))
+
+
+class SegmentInfoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.cache = SceneClipCache(self.root / 'cache', max_bytes=1024 * 1024)
+        self.segment = self.root / 'segment.mp4'
+        self.segment.write_bytes(b'clip')
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_probe_result_is_kept_until_the_clip_is_replaced(self):
+        clip = str(self.cache.put('k', self.segment, 2.0))
+        self.cache.record_segment_infos({clip: {'width': 1080}, str(self.segment): {'width': 1}})
+        self.assertEqual(self.cache.segment_infos([clip, str(self.segment)]), {clip: {'width': 1080}})
+        self.assertEqual(self.cache.get('k')[1], 2.0)
+
+        self.cache.put('k', self.segment, 2.5)
+        self.assertEqual(self.cache.segment_infos([clip]), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+"""
+SegmentFormat pre-concat checker: clips probed before are not probed again
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from services.segment_format import SegmentFormat, SEGMENT_TIMESCALE, AUDIO_SAMPLE_RATE, AUDIO_CHANNELS
+
+TIER = {'fps': 30, 'preset': 'veryfast', 'crf': 23}
+
+
+def compatible_info():
+    return {
+        'video_codec': 'h264', 'profile': 'High', 'width': 1080, 'height': 1920, 'pix_fmt': 'yuv420p',
+        'sar': '1:1', 'frame_rate': '30/1', 'time_base': f"1/{SEGMENT_TIMESCALE}", 'has_audio': True,
+        'starts_with_keyframe': True, 'audio_codec': 'aac', 'sample_rate': AUDIO_SAMPLE_RATE,
+        'channels': AUDIO_CHANNELS,
+    }
+
+
+class EnsureCompatibleTest(unittest.TestCase):
+
+    def test_known_segments_are_not_probed(self):
+        segment_format = SegmentFormat(1080, 1920, TIER)
+        paths = ['cached.mp4', 'fresh.mp4']
+        with mock.patch.object(SegmentFormat, 'probe', return_value=compatible_info()) as probe:
+            segments = segment_format.ensure_compatible(paths, Path(tempfile.gettempdir()),
+                                                        known={'cached.mp4': compatible_info()})
+        probe.assert_called_once_with('fresh.mp4')
+        self.assertEqual(segments, paths)
+        self.assertEqual(list(segment_format.probed), ['fresh.mp4'])
+
+    def test_missing_keyframe_is_a_mismatch(self):
+        info = dict(compatible_info(), starts_with_keyframe=False)
+        self.assertEqual(SegmentFormat(1080, 1920, TIER).mismatches(info, 'High'), ['keyframe'])
+
+
+if __name__ == '__main__':
+    unittest.main()
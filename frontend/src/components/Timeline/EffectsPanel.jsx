@@ -29,7 +29,10 @@ function EffectsPanel({ scene, isOpen, onToggle }) {
     effect_blur: scene.effect_blur || 'none',
     effect_light_leaks: scene.effect_light_leaks || 0,
     effect_lens_flare: scene.effect_lens_flare || 0,
-    effect_kaleidoscope: scene.effect_kaleidoscope || 0
+    effect_kaleidoscope: scene.effect_kaleidoscope || 0,
+    // Transition into the next scene
+    transition_type: scene.transition_type || 'none',
+    transition_duration: scene.transition_duration || 0.5
   })
 
   const [isSaving, setIsSaving] = useState(false)
@@ -56,7 +59,9 @@ function EffectsPanel({ scene, isOpen, onToggle }) {
       effect_blur: scene.effect_blur || 'none',
       effect_light_leaks: scene.effect_light_leaks || 0,
       effect_lens_flare: scene.effect_lens_flare || 0,
-      effect_kaleidoscope: scene.effect_kaleidoscope || 0
+      effect_kaleidoscope: scene.effect_kaleidoscope || 0,
+      transition_type: scene.transition_type || 'none',
+      transition_duration: scene.transition_duration || 0.5
     })
   }, [scene.id])
 
@@ -502,6 +507,48 @@ function EffectsPanel({ scene, isOpen, onToggle }) {
                     <option value="both">Fade In + Out</option>
                   </select>
                 </div>
+
+                {/* Transition to next scene */}
+                <div>
+                  <label className="block text-xs font-medium text-gray-400 mb-1">
+                    Transition to Next Scene
+                  </label>
+                  <select
+                    value={effects.transition_type}
+                    onChange={(e) => handleEffectChange('transition_type', e.target.value)}
+                    className="w-full bg-darker border border-gray-600 rounded px-2 py-1.5 text-sm focus:outline-none focus:ring-2 focus:ring-primary"
+                  >
+                    <option value="none">None (Hard Cut)</option>
+                    <option value="fade">Crossfade</option>
+                    <option value="dissolve">Dissolve</option>
+                    <option value="fadeblack">Fade Through Black</option>
+                    <option value="fadewhite">Fade Through White</option>
+                    <option value="wipeleft">Wipe Left</option>
+                    <option value="wiperight">Wipe Right</option>
+                    <option value="slideleft">Slide Left</option>
+                    <option value="slideright">Slide Right</option>
+                    <option value="circleopen">Circle Open</option>
+                    <option value="radial">Radial</option>
+                  </select>
+                </div>
+
+                {effects.transition_type !== 'none' && (
+                  <div>
+                    <label className="block text-xs font-medium text-gray-400 mb-1">
+                      Transition Duration: {effects.transition_duration}s
+                    </label>
+                    <select
+                      value={effects.transition_duration}
+                      onChange={(e) => handleEffectChange('transition_duration', parseFloat(e.target.value))}
+                      className="w-full bg-darker border border-gray-600 rounded px-2 py-1.5 text-sm focus:outline-none focus:ring-2 focus:ring-primary"
+                    >
+                      <option value="0.25">0.25s</option>
+                      <option value="0.5">0.5s</option>
+                      <option value="0.75">0.75s</option>
+                      <option value="1.0">1.0s</option>
+                    </select>
+                  </div>
+                )}
               </>
             )}
 
@@ -575,7 +622,9 @@ function EffectsPanel({ scene, isOpen, onToggle }) {
                     effect_blur: 'none',
                     effect_light_leaks: 0,
                     effect_lens_flare: 0,
-                    effect_kaleidoscope: 0
+                    effect_kaleidoscope: 0,
+                    transition_type: 'none',
+                    transition_duration: 0.5
                   }
                   setEffects(resetEffects)
                   updateScene(scene.id, resetEffects)
@@ -157,6 +157,13 @@ function VideoPreview({ previewData, seekToScene }) {
               width="100%"
               height="100%"
               playing={isPlaying}
+              config={previewData.captions_url ? {
+                file: {
+                  attributes: { crossOrigin: 'anonymous' },
+                  // Scene text drawn by the player (preview rendered without burned-in text)
+                  tracks: [{ kind: 'subtitles', src: `${previewData.captions_url}?t=${playerKey}`, srcLang: 'und', label: 'Script', default: true }]
+                }
+              } : undefined}
               onReady={() => {
                 console.log('✅ Player is ready!')
                 isPlayerReadyRef.current = true